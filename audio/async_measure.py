@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from audio.backend import AudioBackend
+from audio.measurement import SweepMeasurement
+from dsp.analyzer import analyze_measurement
+
+MeasurementEvent = Dict[str, Any]
+
+
+def _post(loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, item) -> None:
+    """오디오 스레드에서 이벤트 루프 큐로 항목을 넘긴다. 루프가 이미 닫혔으면 버린다."""
+    try:
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+    except RuntimeError:
+        pass
+
+
+async def measurement_events(
+    backend: AudioBackend | None = None,
+    duration: float = 7.0,
+    f_start: float = 20.0,
+    f_end: float = 1000.0,
+    fs: int = 48_000,
+    channels: int = 1,
+    blocksize: int = 1024,
+    timeout: Optional[float] = None,
+    analyze: bool = True,
+    executor: Optional[Executor] = None,
+    include_blocks: bool = False,
+    progress_interval: float = 0.1,
+) -> AsyncIterator[MeasurementEvent]:
+    """
+    스윕 측정을 asyncio에서 진행하면서 이벤트를 차례로 내보내는 async generator.
+
+    오디오 콜백은 녹음 블록을 미리 할당된 버퍼에 복사한 뒤
+    loop.call_soon_threadsafe로 asyncio.Queue에 알림만 넣으므로 이벤트 루프를 막지 않는다.
+    분석(analyze_measurement)은 executor에서 실행한다.
+
+    소비하는 쪽 태스크가 취소되거나 timeout(초, 분석 포함 전체)을 넘기면
+    오디오 스트림을 멈추고 CancelledError / asyncio.TimeoutError가 전파된다.
+
+    이벤트 형식:
+        {"type": "progress", "frames": int, "total": int, "fraction": float}
+        {"type": "block", "block": ndarray}            # include_blocks=True일 때만
+        {"type": "captured", "sweep", "recording", "fs", "meta"}
+        {"type": "analyzed", "analysis": dict | None}  # analyze=True일 때만
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    deadline = loop.time() + timeout if timeout is not None else None
+
+    measurement = SweepMeasurement(
+        backend,
+        duration=duration,
+        f_start=f_start,
+        f_end=f_end,
+        fs=fs,
+        channels=channels,
+        blocksize=blocksize,
+    )
+
+    step = max(int(progress_interval * fs), 1)
+    last_reported = [0]
+
+    def on_progress(frames: int, total: int) -> None:
+        if frames - last_reported[0] >= step or frames >= total:
+            last_reported[0] = frames
+            _post(loop, queue, ("progress", frames, total))
+
+    def on_block(block) -> None:
+        _post(loop, queue, ("block", block.copy()))
+
+    def on_done(error) -> None:
+        _post(loop, queue, ("done", error))
+
+    def remaining() -> Optional[float]:
+        if deadline is None:
+            return None
+        left = deadline - loop.time()
+        if left <= 0:
+            raise asyncio.TimeoutError("측정 시간이 초과되었습니다.")
+        return left
+
+    handle = measurement.start(
+        on_progress=on_progress,
+        on_block=on_block if include_blocks else None,
+        on_done=on_done,
+    )
+
+    try:
+        while True:
+            item = await asyncio.wait_for(queue.get(), remaining())
+            kind = item[0]
+
+            if kind == "progress":
+                _, frames, total = item
+                yield {
+                    "type": "progress",
+                    "frames": frames,
+                    "total": total,
+                    "fraction": frames / total if total else 1.0,
+                }
+            elif kind == "block":
+                yield {"type": "block", "block": item[1]}
+            elif kind == "done":
+                if item[1] is not None:
+                    raise item[1]
+                break
+
+        sweep, recording, fs, meta = measurement.result()
+        yield {
+            "type": "captured",
+            "sweep": sweep,
+            "recording": recording,
+            "fs": fs,
+            "meta": meta,
+        }
+
+        if analyze:
+            analysis = await asyncio.wait_for(
+                loop.run_in_executor(executor, analyze_measurement, recording, fs, meta),
+                remaining(),
+            )
+            yield {"type": "analyzed", "analysis": analysis}
+    finally:
+        handle.stop()
+
+
+async def measure_sweep_async(
+    backend: AudioBackend | None = None,
+    on_event: Optional[Callable[[MeasurementEvent], None]] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    measurement_events()를 끝까지 소비하고 최종 결과만 돌려주는 편의 함수.
+
+    Args:
+        backend: 사용할 오디오 백엔드
+        on_event: 진행 이벤트를 받을 콜백 (선택)
+        **kwargs: measurement_events()의 나머지 인자 (duration, timeout, analyze 등)
+
+    Returns:
+        sweep / recording / fs / meta / analysis 키를 가진 dict
+        (analyze=False면 analysis는 None)
+    """
+    result: Dict[str, Any] = {"analysis": None}
+
+    async for event in measurement_events(backend, **kwargs):
+        if on_event is not None:
+            on_event(event)
+
+        if event["type"] == "captured":
+            result.update(
+                sweep=event["sweep"],
+                recording=event["recording"],
+                fs=event["fs"],
+                meta=event["meta"],
+            )
+        elif event["type"] == "analyzed":
+            result["analysis"] = event["analysis"]
+
+    return result
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Optional, Tuple
+
+import numpy as np
+
+BlockCallback = Callable[[np.ndarray], None]
+DoneCallback = Callable[[Optional[BaseException]], None]
+
+
+class DuplexHandle:
+    """
+    start_duplex()가 반환하는 진행 중 스트림 핸들.
+
+    on_done 콜백은 정상 종료 시 None, 오류/중단 시 예외 객체와 함께 정확히 한 번 호출된다.
+    """
+
+    def __init__(self, on_done: Optional[DoneCallback] = None):
+        self.error: Optional[BaseException] = None
+        self._on_done = on_done
+        self._done = threading.Event()
+        self._stop_requested = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_requested.is_set()
+
+    def stop(self) -> None:
+        """스트림을 중단한다. 이미 끝났다면 아무 일도 하지 않는다."""
+        self._stop_requested.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """스트림이 끝날 때까지 기다린다. timeout 안에 끝나면 True."""
+        return self._done.wait(timeout)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._done.is_set():
+                return
+            self.error = error
+            self._done.set()
+        if self._on_done is not None:
+            self._on_done(error)
+
+
+class MeasurementCancelled(Exception):
+    """stop()으로 측정 스트림이 중간에 끊겼을 때 on_done으로 전달되는 예외."""
+
+
+class AudioBackend(ABC):
+    """
+    측정 코드가 사용하는 오디오 입출력 인터페이스.
+
+    start_duplex()는 signal을 재생하면서 blocksize 단위로 녹음 블록을
+    on_block(block)으로 넘겨준다. block은 (프레임 수, channels) float32 배열이며
+    콜백이 끝난 뒤 재사용될 수 있으므로 보관하려면 복사해야 한다.
+    on_block은 오디오 스레드에서 호출되므로 빨리 반환해야 한다.
+    """
+
+    @abstractmethod
+    def start_duplex(
+        self,
+        signal,
+        fs: int,
+        channels: int = 1,
+        blocksize: int = 1024,
+        on_block: Optional[BlockCallback] = None,
+        on_done: Optional[DoneCallback] = None,
+    ) -> DuplexHandle:
+        """재생/녹음을 시작하고 바로 DuplexHandle을 돌려준다."""
+
+    def playrec(self, signal, fs: int, channels: int = 1) -> np.ndarray:
+        """
+        signal을 재생하면서 같은 길이만큼 녹음한 (샘플 수, channels) float32 배열을 반환한다.
+        """
+        n = np.asarray(signal).shape[0]
+        recording = np.zeros((n, channels), dtype=np.float32)
+        pos = [0]
+
+        def on_block(block):
+            recording[pos[0] : pos[0] + block.shape[0]] = block
+            pos[0] += block.shape[0]
+
+        handle = self.start_duplex(signal, fs, channels=channels, on_block=on_block)
+        handle.wait()
+        if handle.error is not None:
+            raise handle.error
+        return recording
+
+
+class SoundDeviceBackend(AudioBackend):
+    """
+    sounddevice(PortAudio) 장치를 사용하는 실제 백엔드.
+
+    Args:
+        device: sounddevice 장치 지정 (None이면 기본 장치, (입력, 출력) 튜플 가능)
+        output_channel: 스윕을 내보낼 출력 채널 번호(0부터). 나머지 채널은 무음.
+    """
+
+    def __init__(self, device=None, output_channel: int = 0):
+        self.device = device
+        self.output_channel = output_channel
+
+    def start_duplex(
+        self,
+        signal,
+        fs: int,
+        channels: int = 1,
+        blocksize: int = 1024,
+        on_block: Optional[BlockCallback] = None,
+        on_done: Optional[DoneCallback] = None,
+    ) -> DuplexHandle:
+        import sounddevice as sd
+
+        sig = np.asarray(signal, dtype=np.float32).reshape(-1)
+        handle = DuplexHandle(on_done)
+        pos = [0]
+        out_ch = int(self.output_channel)
+
+        def callback(indata, outdata, frames, time_info, status):
+            if handle.stop_requested:
+                raise sd.CallbackAbort
+
+            start = pos[0]
+            n = min(frames, sig.size - start)
+            outdata[:] = 0
+            outdata[:n, out_ch] = sig[start : start + n]
+            if on_block is not None and n > 0:
+                on_block(indata[:n])
+            pos[0] += n
+
+            if pos[0] >= sig.size:
+                raise sd.CallbackStop
+
+        def finished():
+            if pos[0] < sig.size:
+                handle._finish(MeasurementCancelled("측정이 중단되었습니다."))
+            else:
+                handle._finish(None)
+            # 콜백 스레드 안에서는 스트림을 닫을 수 없으므로 별도 스레드에서 정리한다.
+            threading.Thread(target=stream.close, daemon=True).start()
+
+        try:
+            stream = sd.Stream(
+                samplerate=fs,
+                blocksize=blocksize,
+                device=self.device,
+                channels=(channels, out_ch + 1),
+                dtype="float32",
+                callback=callback,
+                finished_callback=finished,
+            )
+            stream.start()
+        except Exception as e:
+            handle._finish(e)
+            return handle
+
+        # 스트림 객체가 측정이 끝나기 전에 GC되지 않도록 핸들에 붙여 둔다.
+        handle.stream = stream
+        return handle
+
+
+def resonant_ir(
+    fs: int,
+    modes: Iterable[Tuple[float, float, float]],
+    length: float = 1.0,
+    delay: float = 0.002,
+) -> np.ndarray:
+    """
+    직접음 + 감쇠 정현파(룸 모드)의 합으로 이루어진 간단한 임펄스 응답을 만든다.
+
+    Args:
+        fs: 샘플레이트
+        modes: (주파수 Hz, Q, 진폭) 튜플 목록
+        length: 임펄스 응답 길이(초)
+        delay: 직접음 도달 지연(초)
+    """
+    n = int(length * fs)
+    t = np.arange(n) / fs
+    ir = np.zeros(n, dtype=np.float64)
+
+    d = int(delay * fs)
+    if d < n:
+        ir[d] = 1.0
+
+    for freq, q, amp in modes:
+        sigma = np.pi * freq / q
+        td = np.maximum(t - delay, 0.0)
+        ir += (t >= delay) * amp * (2.0 * sigma / fs) * np.exp(-sigma * td) * np.cos(
+            2.0 * np.pi * freq * td
+        )
+
+    return ir.astype(np.float32)
+
+
+class SimulatedBackend(AudioBackend):
+    """
+    실제 장치 없이 측정 경로를 흉내 내는 백엔드 (테스트/헤드리스 검증용).
+
+    재생 신호를 임펄스 응답 ir과 선형 컨볼루션하고 잡음을 더해 돌려준다.
+    ir 속성을 바꾸면 '서브우퍼 이동' 같은 방 상태 변화를 흉내 낼 수 있다.
+    realtime=True면 start_duplex가 실제 장치처럼 재생 속도에 맞춰 블록을 내보낸다.
+    """
+
+    def __init__(
+        self,
+        ir=None,
+        noise_db: float = -80.0,
+        gain: float = 1.0,
+        seed: Optional[int] = None,
+        realtime: bool = False,
+    ):
+        self.ir = np.asarray([1.0] if ir is None else ir, dtype=np.float32)
+        self.realtime = realtime
+        self.noise_db = noise_db
+        self.gain = gain
+        self._rng = np.random.default_rng(seed)
+
+    def _render(self, signal) -> np.ndarray:
+        x = np.asarray(signal, dtype=np.float32).reshape(-1)
+        n = x.size
+        n_fft = 1 << int(np.ceil(np.log2(max(n + self.ir.size - 1, 1))))
+        y = np.fft.irfft(np.fft.rfft(x, n_fft) * np.fft.rfft(self.ir, n_fft), n_fft)[:n]
+        y *= self.gain
+
+        if self.noise_db is not None:
+            y += 10.0 ** (self.noise_db / 20.0) * self._rng.standard_normal(n)
+
+        return y.astype(np.float32)
+
+    def start_duplex(
+        self,
+        signal,
+        fs: int,
+        channels: int = 1,
+        blocksize: int = 1024,
+        on_block: Optional[BlockCallback] = None,
+        on_done: Optional[DoneCallback] = None,
+    ) -> DuplexHandle:
+        handle = DuplexHandle(on_done)
+        y = self._render(signal)
+        block = np.empty((blocksize, channels), dtype=np.float32)
+
+        def worker():
+            started = time.monotonic()
+            try:
+                for i in range(0, y.size, blocksize):
+                    if handle.stop_requested:
+                        handle._finish(MeasurementCancelled("측정이 중단되었습니다."))
+                        return
+
+                    n = min(blocksize, y.size - i)
+                    block[:n] = y[i : i + n, np.newaxis]
+                    if on_block is not None:
+                        on_block(block[:n])
+
+                    if self.realtime:
+                        ahead = started + (i + n) / fs - time.monotonic()
+                        if ahead > 0:
+                            handle._stop_requested.wait(ahead)
+                handle._finish(None)
+            except Exception as e:
+                handle._finish(e)
+
+        threading.Thread(target=worker, name="SimulatedBackend", daemon=True).start()
+        return handle
+
+    def playrec(self, signal, fs: int, channels: int = 1) -> np.ndarray:
+        if self.realtime:
+            return super().playrec(signal, fs, channels=channels)
+
+        # 실시간 흉내가 필요 없으면 블록 단위로 나누지 않고 바로 돌려준다.
+        y = self._render(signal)
+        return np.repeat(y[:, np.newaxis], channels, axis=1)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from audio.sweep import generate_log_sweep
+from audio.wavfile import open_wav_memmap, pcm_to_float32, read_wav_info
+from dsp.biquad import BlockBiquadChain
+from dsp.eq import EqFilter, filters_to_sos
+
+
+class _LoopingSource:
+    """오디오 소스를 끝에서 처음으로 되감으며 고정 크기 블록으로 채워 주는 읽기 도우미."""
+
+    def __init__(self, source, fs: int):
+        self.info = None
+        if isinstance(source, (str, os.PathLike)):
+            self.info = read_wav_info(source)
+            if self.info["n_frames"] == 0:
+                raise ValueError(f"재생할 샘플이 없는 WAV 파일입니다: {source}")
+            self.fs = self.info["fs"]
+            self.data = open_wav_memmap(source, self.info)
+            bits = self.info["bits"]
+            # 정수 PCM은 블록마다 float32로 바꾸면서 곱할 스케일
+            self.scale = 1.0 if self.info["is_float"] else 1.0 / float(1 << (bits - 1))
+        else:
+            data = np.asarray(source, dtype=np.float32)
+            self.data = data[:, np.newaxis] if data.ndim == 1 else data
+            if self.data.shape[0] == 0:
+                # 빈 소스는 read_into의 되감기 루프가 끝나지 않으므로 미리 막는다.
+                raise ValueError("재생할 샘플이 없는 오디오 소스입니다.")
+            self.fs = fs
+            self.scale = 1.0
+        self.pos = 0
+
+    def read_into(self, buf: np.ndarray) -> None:
+        frames, channels = buf.shape
+        src_channels = self.data.shape[1]
+        n_total = self.data.shape[0]
+        filled = 0
+
+        while filled < frames:
+            n = min(frames - filled, n_total - self.pos)
+            chunk = self.data[self.pos : self.pos + n]
+            dst = buf[filled : filled + n]
+
+            if self.info is not None and self.info["bits"] == 24:
+                chunk = pcm_to_float32(chunk, self.info)
+                scale = 1.0
+            else:
+                scale = self.scale
+
+            if src_channels >= channels:
+                np.multiply(chunk[:, :channels], scale, out=dst, casting="unsafe")
+            else:
+                # 모노 등 채널이 부족하면 첫 채널을 나머지 출력 채널에 복제한다.
+                np.multiply(
+                    chunk[:, :src_channels],
+                    scale,
+                    out=dst[:, :src_channels],
+                    casting="unsafe",
+                )
+                dst[:, src_channels:] = dst[:, :1]
+
+            filled += n
+            self.pos += n
+            if self.pos >= n_total:
+                self.pos = 0
+
+
+class EqPreviewPlayer:
+    """
+    추천된 피킹 필터를 음악 파일이나 테스트 신호에 실시간으로 걸어서 들려주는 재생 엔진.
+
+    - sounddevice OutputStream 콜백 안에서 블록마다 소스 읽기 + BlockBiquadChain 처리만 한다.
+      입력 버퍼는 미리 할당해 두고 결과는 outdata에 바로 쓴다.
+    - set_filters()로 필터를 바꾸면 다음 블록에서 크로스페이드로 전환된다.
+    - set_bypass(True)면 원음을 그대로 들려준다(비교 청취용).
+
+    Args:
+        filters: 피킹 필터 목록 (dsp.eq 형식)
+        source: WAV 파일 경로 또는 (샘플 수[, 채널 수]) 배열. None이면 테스트 스윕을 반복 재생
+        fs: source가 배열/None일 때의 샘플레이트
+        blocksize: 콜백 블록 크기
+        channels: 출력 채널 수
+        gain_db: 필터 앞단 게인 (부스트 필터가 있을 때 클리핑 방지용)
+    """
+
+    def __init__(
+        self,
+        filters: Optional[List[EqFilter]] = None,
+        source=None,
+        fs: int = 48_000,
+        blocksize: int = 256,
+        channels: int = 2,
+        device=None,
+        gain_db: float = -6.0,
+    ):
+        if source is None:
+            source = generate_log_sweep(20.0, 1000.0, duration=10.0, fs=fs)
+
+        self.source = _LoopingSource(source, fs)
+        self.fs = self.source.fs
+        self.blocksize = int(blocksize)
+        self.channels = int(channels)
+        self.device = device
+        self.gain = np.float32(10.0 ** (gain_db / 20.0))
+        self.bypass = False
+
+        self.chain = BlockBiquadChain(
+            filters_to_sos(filters or [], self.fs),
+            blocksize=self.blocksize,
+            channels=self.channels,
+        )
+        self._in = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        self._stream = None
+
+    def set_filters(self, filters: List[EqFilter]) -> None:
+        """재생 중에도 호출할 수 있다. 계수 계산은 호출한 스레드에서 끝난다."""
+        self.chain.set_sos(filters_to_sos(filters, self.fs))
+
+    def set_bypass(self, bypass: bool) -> None:
+        self.bypass = bool(bypass)
+
+    def process_block(self, outdata: np.ndarray) -> None:
+        """다음 블록을 outdata((blocksize, channels) float32)에 채운다."""
+        self.source.read_into(self._in)
+        self._in *= self.gain
+
+        if self.bypass:
+            # 바이패스 중에도 필터 상태를 계속 갱신해야 다시 켤 때 튀지 않는다.
+            self.chain.process(self._in, outdata)
+            outdata[:] = self._in
+        else:
+            self.chain.process(self._in, outdata)
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        self.process_block(outdata)
+
+    def start(self) -> None:
+        import sounddevice as sd
+
+        if self._stream is not None:
+            return
+
+        self._stream = sd.OutputStream(
+            samplerate=self.fs,
+            blocksize=self.blocksize,
+            channels=self.channels,
+            dtype="float32",
+            device=self.device,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def stop(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    @property
+    def playing(self) -> bool:
+        return self._stream is not None
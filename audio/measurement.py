@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from audio.backend import AudioBackend, DuplexHandle, SoundDeviceBackend
+from audio.sweep import generate_log_sweep
+
+MeasurementResult = Tuple[np.ndarray, np.ndarray, int, Dict[str, Any]]
+ProgressCallback = Callable[[int, int], None]
+
+
+class SweepMeasurement:
+    """
+    로그 스윕 재생 + 녹음 한 번을 담당하는 측정 코어.
+
+    Qt 워커(SweepMeasureWorker), asyncio API(audio.async_measure), 모니터링 데몬이
+    모두 이 클래스를 사용한다. 녹음 버퍼는 시작할 때 한 번만 할당하고,
+    오디오 스레드에서 들어오는 블록을 그 자리에 바로 복사한다.
+    """
+
+    def __init__(
+        self,
+        backend: AudioBackend | None = None,
+        duration: float = 7.0,
+        f_start: float = 20.0,
+        f_end: float = 1000.0,
+        fs: int = 48_000,
+        channels: int = 1,
+        blocksize: int = 1024,
+        level_db: float = 0.0,
+    ):
+        self.backend = backend if backend is not None else SoundDeviceBackend()
+        self.duration = duration
+        self.f_start = f_start
+        self.f_end = f_end
+        self.fs = fs
+        self.channels = channels
+        self.blocksize = blocksize
+        self.level_db = level_db
+
+        self.sweep: Optional[np.ndarray] = None
+        self.recording: Optional[np.ndarray] = None
+        self.frames_done = 0
+        self._handle: Optional[DuplexHandle] = None
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "f_start": self.f_start,
+            "f_end": self.f_end,
+            "duration": self.duration,
+            "fs": self.fs,
+            "channels": self.channels,
+            "level_db": self.level_db,
+            "n_samples": int(self.sweep.shape[0]) if self.sweep is not None else 0,
+        }
+
+    def start(
+        self,
+        on_progress: Optional[ProgressCallback] = None,
+        on_block: Optional[Callable[[np.ndarray], None]] = None,
+        on_done: Optional[Callable[[Optional[BaseException]], None]] = None,
+    ) -> DuplexHandle:
+        """
+        측정을 시작하고 바로 반환한다.
+
+        Args:
+            on_progress: (녹음한 프레임 수, 전체 프레임 수)를 받는 콜백 (오디오 스레드)
+            on_block: 녹음 블록을 받는 콜백 (오디오 스레드, 보관하려면 복사 필요)
+            on_done: 종료 시 호출되는 콜백. 정상 종료면 None, 아니면 예외 객체
+        """
+        self.sweep = generate_log_sweep(
+            f_start=self.f_start,
+            f_end=self.f_end,
+            duration=self.duration,
+            fs=self.fs,
+        )
+        if self.level_db != 0.0:
+            self.sweep *= np.float32(10.0 ** (self.level_db / 20.0))
+        total = self.sweep.shape[0]
+        self.recording = np.zeros((total, self.channels), dtype=np.float32)
+        self.frames_done = 0
+
+        def handle_block(block):
+            start = self.frames_done
+            n = min(block.shape[0], total - start)
+            self.recording[start : start + n] = block[:n]
+            self.frames_done = start + n
+
+            if on_block is not None:
+                on_block(block[:n])
+            if on_progress is not None:
+                on_progress(self.frames_done, total)
+
+        self._handle = self.backend.start_duplex(
+            self.sweep,
+            self.fs,
+            channels=self.channels,
+            blocksize=self.blocksize,
+            on_block=handle_block,
+            on_done=on_done,
+        )
+        return self._handle
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.stop()
+
+    def result(self) -> MeasurementResult:
+        """(sweep, recording, fs, meta) 튜플. SweepMeasureWorker.finished와 같은 형태다."""
+        return self.sweep, self.recording, self.fs, self.meta
+
+    def run(self, on_progress: Optional[ProgressCallback] = None) -> MeasurementResult:
+        """측정을 시작하고 끝날 때까지 현재 스레드에서 기다린다."""
+        handle = self.start(on_progress=on_progress)
+        handle.wait()
+        if handle.error is not None:
+            raise handle.error
+        return self.result()
+
+
+def measure_sweep(
+    backend: AudioBackend | None = None,
+    duration: float = 7.0,
+    f_start: float = 20.0,
+    f_end: float = 1000.0,
+    fs: int = 48_000,
+    channels: int = 1,
+    level_db: float = 0.0,
+) -> MeasurementResult:
+    """
+    로그 스윕을 재생하면서 녹음하는 한 번의 측정을 수행한다.
+
+    Args:
+        backend: 사용할 오디오 백엔드 (기본: SoundDeviceBackend)
+        level_db: 스윕 출력 레벨 (dBFS, 0이면 최대 진폭)
+
+    Returns:
+        (sweep, recording, fs, meta) 튜플.
+        SweepMeasureWorker.finished 시그널과 같은 형태다.
+    """
+    measurement = SweepMeasurement(
+        backend,
+        duration=duration,
+        f_start=f_start,
+        f_end=f_end,
+        fs=fs,
+        channels=channels,
+        level_db=level_db,
+    )
+    return measurement.run()
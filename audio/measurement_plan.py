@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from audio.backend import AudioBackend, SoundDeviceBackend
+from audio.measurement import SweepMeasurement
+from dsp.analyzer import analyze_measurement
+from dsp.deconvolution import harmonic_distortion
+from dsp.logspectrum import average_spectra
+
+SpeakerReport = Dict[str, Any]
+
+
+class MeasurementStep:
+    """
+    측정 계획의 한 단계: 어떤 출력(장치/채널)으로 스윕을 내보내고 어떤 입력으로 받을지.
+
+    Args:
+        name: 결과 리포트에 표시할 이름 (예: "Front L", "Sub 2")
+        output_device: sounddevice 출력 장치 인덱스 (None이면 기본 장치)
+        output_channel: 출력 채널 번호(0부터)
+        input_device: sounddevice 입력 장치 인덱스 (None이면 기본 장치)
+        backend: 직접 지정할 AudioBackend (지정하면 위 장치 설정은 무시)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        output_device=None,
+        output_channel: int = 0,
+        input_device=None,
+        backend: AudioBackend | None = None,
+    ):
+        self.name = name
+        self.output_device = output_device
+        self.output_channel = output_channel
+        self.input_device = input_device
+        self.backend = backend
+
+    def make_backend(self) -> AudioBackend:
+        if self.backend is not None:
+            return self.backend
+        return SoundDeviceBackend(
+            device=(self.input_device, self.output_device),
+            output_channel=self.output_channel,
+        )
+
+
+def _analyze_capture(sweep, recording, fs, meta, with_distortion: bool) -> Dict[str, Any]:
+    started = time.perf_counter()
+    analysis = analyze_measurement(recording, fs, meta)
+
+    distortion = None
+    if with_distortion and analysis is not None:
+        distortion = harmonic_distortion(
+            sweep,
+            recording,
+            fs,
+            f_start=meta["f_start"],
+            f_end=meta["f_end"],
+            duration=meta["duration"],
+        )
+
+    return {
+        "analysis": analysis,
+        "distortion": distortion,
+        "analysis_time": time.perf_counter() - started,
+    }
+
+
+class MeasurementPlan:
+    """
+    여러 스피커(출력 장치/채널)를 차례로 측정하는 계획.
+
+    캡처는 순서대로 진행하고, 스피커 N의 분석은 작업 스레드에서 돌려서
+    스피커 N+1의 스윕이 재생되는 동안 함께 처리한다.
+    따라서 전체 소요 시간은 대략 (스윕 길이 합 + 마지막 한 번의 분석 시간)이 된다.
+    """
+
+    def __init__(
+        self,
+        steps: List[MeasurementStep],
+        duration: float = 7.0,
+        f_start: float = 20.0,
+        f_end: float = 1000.0,
+        fs: int = 48_000,
+        with_distortion: bool = False,
+        analysis_workers: int = 1,
+    ):
+        self.steps = steps
+        self.duration = duration
+        self.f_start = f_start
+        self.f_end = f_end
+        self.fs = fs
+        self.with_distortion = with_distortion
+        self.analysis_workers = max(int(analysis_workers), 1)
+
+    def run(
+        self,
+        on_captured: Optional[Callable[[int, MeasurementStep], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        모든 단계를 측정하고 결합된 리포트를 반환한다.
+
+        Args:
+            on_captured: (단계 번호, 단계) — 각 스피커의 캡처가 끝날 때마다 호출된다.
+
+        Returns:
+            다음 키를 가진 dict
+            - speakers: 단계별 SpeakerReport 목록
+              (name / output_device / output_channel / input_device /
+               meta / analysis / distortion / capture_time / analysis_time / error)
+            - average_spectrum: 분석에 성공한 스피커들의 평균 LogSpectrum (없으면 None)
+            - wall_time: 전체 소요 시간(초)
+            - capture_time: 캡처에 걸린 시간의 합(초)
+        """
+        started = time.perf_counter()
+        pending: List[Optional[Future]] = []
+        speakers: List[SpeakerReport] = []
+
+        with ThreadPoolExecutor(
+            max_workers=self.analysis_workers, thread_name_prefix="plan-analysis"
+        ) as executor:
+            for i, step in enumerate(self.steps):
+                report: SpeakerReport = {
+                    "name": step.name,
+                    "output_device": step.output_device,
+                    "output_channel": step.output_channel,
+                    "input_device": step.input_device,
+                    "meta": None,
+                    "analysis": None,
+                    "distortion": None,
+                    "capture_time": 0.0,
+                    "analysis_time": 0.0,
+                    "error": None,
+                }
+                speakers.append(report)
+
+                capture_started = time.perf_counter()
+                try:
+                    measurement = SweepMeasurement(
+                        step.make_backend(),
+                        duration=self.duration,
+                        f_start=self.f_start,
+                        f_end=self.f_end,
+                        fs=self.fs,
+                    )
+                    sweep, recording, fs, meta = measurement.run()
+                except Exception as e:
+                    report["error"] = str(e)
+                    pending.append(None)
+                    continue
+                finally:
+                    report["capture_time"] = time.perf_counter() - capture_started
+
+                report["meta"] = meta
+                if on_captured is not None:
+                    on_captured(i, step)
+
+                # 분석은 다음 스피커 캡처와 겹쳐서 진행된다.
+                pending.append(
+                    executor.submit(
+                        _analyze_capture, sweep, recording, fs, meta, self.with_distortion
+                    )
+                )
+
+            for report, future in zip(speakers, pending):
+                if future is None:
+                    continue
+                try:
+                    report.update(future.result())
+                except Exception as e:
+                    report["error"] = str(e)
+
+        spectra = [r["analysis"]["spectrum"] for r in speakers if r["analysis"] is not None]
+
+        return {
+            "speakers": speakers,
+            "average_spectrum": average_spectra(spectra) if spectra else None,
+            "wall_time": time.perf_counter() - started,
+            "capture_time": sum(r["capture_time"] for r in speakers),
+        }
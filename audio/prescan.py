@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from audio.backend import AudioBackend, SoundDeviceBackend
+from audio.sweep import generate_log_sweep
+
+PrescanResult = Dict[str, Any]
+
+
+def third_octave_edges(f_start: float, f_end: float, fs: int) -> np.ndarray:
+    """
+    [f_start, f_end] 안의 1/3 옥타브 대역 경계를 (대역 수, 2) 배열로 돌려준다.
+    양 끝 대역은 측정 범위에 맞춰 잘린다.
+    """
+    f_end = min(f_end, fs / 2.0)
+    k = np.arange(np.floor(3 * np.log2(f_start / 1000.0)), np.ceil(3 * np.log2(f_end / 1000.0)) + 1)
+    centers = 1000.0 * 2.0 ** (k / 3.0)
+    edges = np.stack([centers * 2.0 ** (-1 / 6), centers * 2.0 ** (1 / 6)], axis=1)
+    edges = np.clip(edges, f_start, f_end)
+    return edges[edges[:, 1] - edges[:, 0] > 0]
+
+
+def band_energies(x, fs: int, edges: np.ndarray) -> np.ndarray:
+    """
+    신호 x의 대역별 에너지(Σx²/fs 단위)를 한 번의 FFT와 누적합으로 구한다.
+    """
+    x = np.asarray(x, dtype=np.float64).reshape(-1)
+    n = x.size
+    if n == 0:
+        return np.zeros(edges.shape[0])
+
+    power = np.abs(np.fft.rfft(x)) ** 2 * (2.0 / (n * fs))
+    csum = np.concatenate(([0.0], np.cumsum(power)))
+    freqs = np.fft.rfftfreq(n, 1.0 / fs)
+    lo = np.searchsorted(freqs, edges[:, 0], side="left")
+    hi = np.searchsorted(freqs, edges[:, 1], side="right")
+    # 대역이 bin 간격보다 좁으면 가장 가까운 bin 하나를 쓴다.
+    hi = np.maximum(hi, np.minimum(lo + 1, freqs.size))
+    return csum[hi] - csum[lo]
+
+
+def run_prescan(
+    backend: AudioBackend | None = None,
+    fs: int = 48_000,
+    f_start: float = 20.0,
+    f_end: float = 1000.0,
+    target_snr_db: float = 50.0,
+    min_duration: float = 3.0,
+    max_duration: float = 10.0,
+    max_level_db: float = 0.0,
+    input_headroom_db: float = 6.0,
+    probe_level_db: float = -20.0,
+    noise_seconds: float = 0.25,
+    burst_seconds: float = 0.3,
+    tail_seconds: float = 0.15,
+) -> PrescanResult:
+    """
+    본 측정 전에 1초 미만의 짧은 사전 측정으로 스윕 레벨/범위/길이를 정한다.
+    (무음 → 낮은 레벨의 짧은 스윕 → 꼬리를 한 번에 재생/녹음해 1/3 옥타브 대역별 잡음과 응답을 잰다)
+
+    Args:
+        backend: 재생/녹음에 쓸 AudioBackend (기본값: SoundDeviceBackend)
+        target_snr_db: 고른 범위의 모든 대역이 넘어야 할 디컨볼루션 후 SNR (dB)
+        min_duration, max_duration: 본 스윕 길이의 하한/상한 (초)
+        max_level_db: 본 스윕 레벨 상한 (dBFS)
+        input_headroom_db: 입력 피크가 0 dBFS 아래로 남겨 둘 여유 (dB)
+
+    Returns:
+        다음 키를 가진 dict
+        - settings: SweepMeasurement에 그대로 넘길 수 있는 {"duration", "f_start", "f_end", "level_db"}
+        - noise_floor_db: 무음 구간 RMS (dBFS)
+        - probe_peak_db: 버스트 구간 입력 피크 (dBFS)
+        - clipped: 버스트가 입력에서 클리핑됐는지 여부
+        - band_freqs: 대역 중심 주파수 (Hz)
+        - band_snr_db: 고른 설정에서 예측한 대역별 SNR (dB)
+        - target_met: 고른 범위 전체가 목표 SNR을 만족하는지 여부
+        - scan_time: 사전 측정에 걸린 시간(초)
+    """
+    started = time.perf_counter()
+    backend = backend if backend is not None else SoundDeviceBackend()
+
+    n_noise = int(noise_seconds * fs)
+    n_tail = int(tail_seconds * fs)
+    probe_amp = 10.0 ** (probe_level_db / 20.0)
+    burst = generate_log_sweep(f_start, f_end, duration=burst_seconds, fs=fs) * probe_amp
+    signal = np.concatenate(
+        [np.zeros(n_noise, np.float32), burst, np.zeros(n_tail, np.float32)]
+    )
+
+    recording = np.asarray(backend.playrec(signal, fs, channels=1), dtype=np.float32)
+    recording = recording.reshape(recording.shape[0], -1)[:, 0]
+
+    noise = recording[:n_noise]
+    # 장치 지연만큼 버스트가 늦게 도착하므로 무음 이후 전체를 버스트 구간으로 본다.
+    response = recording[n_noise:]
+
+    edges = third_octave_edges(f_start, f_end, fs)
+    centers = np.sqrt(edges[:, 0] * edges[:, 1])
+    widths = edges[:, 1] - edges[:, 0]
+
+    noise_time = max(noise.size / fs, 1.0 / fs)
+    noise_density = band_energies(noise, fs, edges) / noise_time / widths
+    noise_density = np.maximum(noise_density, 1e-20)
+
+    # 버스트 구간에 섞인 잡음 에너지를 빼서 순수 신호 에너지를 추정한다.
+    signal_energy = band_energies(response, fs, edges) - noise_density * widths * (
+        response.size / fs
+    )
+    signal_energy = np.maximum(signal_energy, 1e-20)
+
+    noise_rms = float(np.sqrt(np.mean(noise.astype(np.float64) ** 2))) if noise.size else 0.0
+    peak = float(np.max(np.abs(response))) if response.size else 0.0
+    clipped = peak >= 0.999
+
+    # 1) 레벨: 선형 시스템이라 가정하고 입력 피크가 헤드룸 한계에 닿는 레벨을 구한다.
+    peak_limit = 10.0 ** (-input_headroom_db / 20.0)
+    level_db = max_level_db
+    if peak > 0:
+        level_db = min(level_db, probe_level_db + 20.0 * np.log10(peak_limit / peak))
+    if clipped:
+        # 클리핑된 피크는 실제보다 작게 보이므로 더 보수적으로 잡는다.
+        level_db = min(level_db, probe_level_db - input_headroom_db)
+    gain = (10.0 ** (level_db / 20.0) / probe_amp) ** 2
+
+    # 길이 1초, 전체 범위 기준 대역 SNR (선형). 디컨볼루션 SNR은 E/N0이고 로그 스윕이 한 대역에
+    # 머무는 시간은 T / ln(F2/F1)에 비례하므로
+    #   SNR_b(T, a) = E_b,probe · (a / a_probe)² · (T / ln(F2/F1)) / (T_probe / ln(f_end/f_start)) / N0_b
+    per_second = signal_energy * gain * np.log(f_end / f_start) / burst_seconds / noise_density
+    target = 10.0 ** (target_snr_db / 10.0)
+
+    # 2) 범위: 최대 길이로도 목표에 못 미치는 양 끝 대역을 잘라낸다.
+    usable = np.flatnonzero(per_second * max_duration >= target)
+    if usable.size:
+        lo_band, hi_band = usable[0], usable[-1]
+        new_start = f_start if lo_band == 0 else float(edges[lo_band, 0])
+        new_end = f_end if hi_band == len(edges) - 1 else float(edges[hi_band, 1])
+    else:
+        lo_band, hi_band = 0, len(edges) - 1
+        new_start, new_end = f_start, f_end
+
+    # 3) 길이: 범위가 좁아지면 대역당 머무는 시간이 늘어나는 만큼 반영한다.
+    # min_duration은 주파수 해상도 하한이다. bin 간격 1/T Hz에 비해 1/24 옥타브 스무딩 창은
+    # 약 0.029 f(20 Hz에서 0.58 Hz)라서 1.7초보다 짧으면 저역 창에 bin이 하나도 없다.
+    per_second *= np.log(f_end / f_start) / np.log(new_end / new_start)
+    worst = float(np.min(per_second[lo_band : hi_band + 1])) if len(edges) else target
+    duration = target / max(worst, 1e-30)
+    duration = float(np.clip(np.ceil(duration * 2.0) / 2.0, min_duration, max_duration))
+
+    band_snr = per_second * duration
+    in_range = band_snr[lo_band : hi_band + 1]
+
+    return {
+        "settings": {
+            "duration": duration,
+            "f_start": new_start,
+            "f_end": new_end,
+            "level_db": float(level_db),
+        },
+        "noise_floor_db": 20.0 * np.log10(max(noise_rms, 1e-10)),
+        "probe_peak_db": 20.0 * np.log10(max(peak, 1e-10)),
+        "clipped": clipped,
+        "band_freqs": centers,
+        "band_snr_db": 10.0 * np.log10(band_snr),
+        "target_met": bool(in_range.size and np.all(in_range >= target)),
+        "scan_time": time.perf_counter() - started,
+    }
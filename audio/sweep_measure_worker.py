@@ -2,20 +2,65 @@ from __future__ import annotations
 
 from typing import Optional
 
-import numpy as np
-import sounddevice as sd
 from PySide6.QtCore import QObject, Signal
 
-from audio.sweep import generate_log_sweep
+from audio.backend import AudioBackend, SoundDeviceBackend
+from audio.measurement import SweepMeasurement
+from audio.prescan import run_prescan
+from dsp.analyzer import analyze_measurement
+from dsp.deconvolution import harmonic_distortion
+from dsp.phase import phase_analysis
+
+
+def analyze_sweep_measurement(sweep, recording, fs, meta) -> Optional[dict]:
+    """
+    한 번의 스윕 측정에서 결과 페이지가 보여 줄 분석을 모두 계산한다.
+
+    analyze_measurement 결과 dict에 distortion(harmonic_distortion 결과 또는 None)과
+    phase(phase_analysis 결과 또는 None)를 더해 돌려준다. 측정 신호가 너무 짧으면 None.
+    무거운 계산이라 GUI 스레드가 아니라 워커 스레드에서 부른다.
+    """
+    analysis = analyze_measurement(recording, fs, meta, sweep=sweep)
+    if analysis is None:
+        return None
+
+    # 스윕의 고조파 응답이 시간적으로 분리되는 점을 이용한 왜곡 분석
+    analysis["distortion"] = None
+    if sweep is not None and "duration" in meta:
+        analysis["distortion"] = harmonic_distortion(
+            sweep,
+            recording,
+            fs,
+            f_start=meta.get("f_start", 20.0),
+            f_end=meta.get("f_end", 1000.0),
+            duration=meta["duration"],
+        )
+
+    # 위상/군지연 분석 (분석 단계에서 남겨 둔 복소 전달함수를 그대로 쓴다)
+    analysis["phase"] = None
+    if analysis["transfer"] is not None:
+        analysis["phase"] = phase_analysis(
+            *analysis["transfer"],
+            fs,
+            f_min=meta.get("f_start", 20.0),
+            f_max=meta.get("f_end", 1000.0),
+        )
+    return analysis
 
 class SweepMeasureWorker(QObject):
-    finished = Signal(object, object, int, dict)
+    # sweep, recording, fs, meta, analysis (analyze_sweep_measurement 결과, 너무 짧으면 None)
+    finished = Signal(object, object, int, dict, object)
     error = Signal(str)
+    progress = Signal(float)
+    configured = Signal(dict)
 
     def __init__(
         self,
         duration: float,
         parent: Optional[QObject] = None,
+        backend: Optional[AudioBackend] = None,
+        auto_configure: bool = False,
+        target_snr_db: float = 50.0,
     ) -> None:
         super().__init__(parent)
 
@@ -24,49 +69,65 @@ class SweepMeasureWorker(QObject):
         self.f_end = 1000.0
         self.fs = 48_000
         self.channels = 1
+        self.level_db = 0.0
+        self.backend = backend
+
+        # auto_configure면 측정 전에 사전 측정으로 길이/범위/레벨을 정한다.
+        # 이때 duration은 허용하는 최대 길이로 쓰인다.
+        self.auto_configure = auto_configure
+        self.target_snr_db = target_snr_db
+
+        self._measurement: Optional[SweepMeasurement] = None
 
     def run(self) -> None:
         """
         QThread.started에 연결해서 실행할 엔트리 포인트.
+        측정 자체는 SweepMeasurement 코어가 수행하고, 이 워커는 결과를 분석까지 마친 뒤
+        Qt 시그널로 옮긴다.
         에러 발생 시 error 시그널을 emit 하고 종료한다.
         """
         try:
-            # 1. 스윕 신호 생성
-            sweep = generate_log_sweep(
+            # 장치는 이미 PrepPage에서 기본 장치로 설정되었다고 가정
+            backend = self.backend if self.backend is not None else SoundDeviceBackend()
+
+            if self.auto_configure:
+                prescan = run_prescan(
+                    backend,
+                    fs=self.fs,
+                    f_start=self.f_start,
+                    f_end=self.f_end,
+                    target_snr_db=self.target_snr_db,
+                    max_duration=self.duration,
+                )
+                settings = prescan["settings"]
+                self.duration = settings["duration"]
+                self.f_start = settings["f_start"]
+                self.f_end = settings["f_end"]
+                self.level_db = settings["level_db"]
+                self.configured.emit(prescan)
+
+            self._measurement = SweepMeasurement(
+                backend,
+                duration=self.duration,
                 f_start=self.f_start,
                 f_end=self.f_end,
-                duration=self.duration,
                 fs=self.fs,
-            )
-
-            # 2. 재생 + 녹음 설정 (장치는 이미 PrepPage에서 설정되었다고 가정)
-            sd.default.samplerate = self.fs
-            sd.default.channels = self.channels
-
-            n_samples = sweep.shape[0]
-
-            # playrec은 입력/출력을 동시에 처리한다.
-            recording = sd.playrec(
-                sweep,
-                samplerate=self.fs,
                 channels=self.channels,
-                dtype="float32",
+                level_db=self.level_db,
+            )
+            sweep, recording, fs, meta = self._measurement.run(
+                on_progress=lambda done, total: self.progress.emit(done / total)
             )
-            sd.wait()
 
-            # 3. 메타데이터 구성
-            meta = {
-                "f_start": self.f_start,
-                "f_end": self.f_end,
-                "duration": self.duration,
-                "fs": self.fs,
-                "channels": self.channels,
-                "n_samples": int(n_samples),
-            }
+            analysis = analyze_sweep_measurement(sweep, recording, fs, meta)
 
-            # 4. 결과 emit
-            self.finished.emit(sweep, recording, self.fs, meta)
+            self.finished.emit(sweep, recording, fs, meta, analysis)
 
         except Exception as e:
             # UI가 표시하기 쉬운 문자열 에러 형태로 전달
-            self.error.emit(str(e))
\ No newline at end of file
+            self.error.emit(str(e))
+
+    def cancel(self) -> None:
+        """진행 중인 측정을 중단한다. (run은 error 시그널과 함께 끝난다)"""
+        if self._measurement is not None:
+            self._measurement.stop()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+import struct
+from typing import Any, Dict, Iterator
+
+import numpy as np
+
+WavInfo = Dict[str, Any]
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# RF64에서 실제 크기는 ds64 청크에 있다는 표시. 쓰기 도중 끊긴 WAV 헤더에도 자주 남아 있다.
+_SIZE_PLACEHOLDER = 0xFFFFFFFF
+
+
+def read_wav_info(path) -> WavInfo:
+    """
+    WAV(RIFF/RF64) 헤더만 읽어서 data 청크의 위치와 샘플 형식을 반환한다.
+    표준 wave 모듈과 달리 32bit float WAV와 4GB가 넘는 RF64도 지원한다.
+    헤더의 data 크기는 믿지 않고 실제 파일 크기에 맞춰 온전한 프레임까지만 쓴다
+    (녹음이 도중에 끊겨 크기가 채워지지 않은 파일도 열 수 있다).
+
+    Returns:
+        다음 키를 가진 dict
+        - fs: 샘플레이트 (int)
+        - channels: 채널 수 (int)
+        - bits: 샘플당 비트 수 (16 / 24 / 32 / 64)
+        - is_float: float 형식 여부 (bool)
+        - data_offset: 파일에서 data 청크가 시작하는 바이트 위치 (int)
+        - n_frames: 프레임(샘플) 수 (int)
+    """
+    fmt = None
+    data_offset = None
+    data_size = None
+    ds64_data_size = None
+
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff not in (b"RIFF", b"RF64") or wave_id != b"WAVE":
+            raise ValueError(f"WAV 파일이 아닙니다: {path}")
+
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+
+            if chunk_id == b"ds64":
+                # riffSize(8) / dataSize(8) / sampleCount(8) / ...
+                body = f.read(chunk_size)
+                ds64_data_size = struct.unpack("<QQQ", body[:24])[1]
+            elif chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                if fmt[0] == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    # SubFormat GUID의 앞 2바이트가 실제 포맷 코드다.
+                    sub_format = struct.unpack("<H", body[24:26])[0]
+                    fmt = (sub_format,) + fmt[1:]
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                data_size = chunk_size
+                if chunk_size == _SIZE_PLACEHOLDER and ds64_data_size is not None:
+                    data_size = ds64_data_size
+                break
+            else:
+                f.seek(chunk_size, 1)
+
+            if chunk_size % 2:
+                f.seek(1, 1)  # RIFF 청크는 짝수 바이트로 패딩된다.
+
+    if fmt is None or data_offset is None:
+        raise ValueError(f"fmt/data 청크를 찾을 수 없습니다: {path}")
+    data_size = min(data_size, max(file_size - data_offset, 0))
+
+    format_tag, channels, fs, _, block_align, bits = fmt
+    if format_tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_IEEE_FLOAT):
+        raise ValueError(f"지원하지 않는 WAV 포맷입니다: 0x{format_tag:04x}")
+
+    is_float = format_tag == _WAVE_FORMAT_IEEE_FLOAT
+    if (is_float and bits not in (32, 64)) or (not is_float and bits not in (16, 24, 32)):
+        raise ValueError(f"지원하지 않는 샘플 형식입니다: {bits}bit")
+
+    return {
+        "fs": int(fs),
+        "channels": int(channels),
+        "bits": int(bits),
+        "is_float": is_float,
+        "data_offset": int(data_offset),
+        "n_frames": int(data_size // block_align),
+    }
+
+
+def open_wav_memmap(path, info: WavInfo | None = None) -> np.memmap:
+    """
+    WAV data 청크를 (프레임 수, 채널 수[, 3]) 형태의 읽기 전용 memmap으로 연다.
+    24bit PCM은 바이트 단위 (..., 3) 배열로 열린다.
+    """
+    if info is None:
+        info = read_wav_info(path)
+
+    bits = info["bits"]
+    if info["is_float"]:
+        dtype = np.dtype("<f4" if bits == 32 else "<f8")
+        shape = (info["n_frames"], info["channels"])
+    elif bits == 24:
+        dtype = np.dtype(np.uint8)
+        shape = (info["n_frames"], info["channels"], 3)
+    else:
+        dtype = np.dtype("<i2" if bits == 16 else "<i4")
+        shape = (info["n_frames"], info["channels"])
+
+    return np.memmap(path, dtype=dtype, mode="r", offset=info["data_offset"], shape=shape)
+
+
+def pcm_to_float32(raw: np.ndarray, info: WavInfo) -> np.ndarray:
+    bits = info["bits"]
+    if info["is_float"]:
+        return raw.astype(np.float32)
+
+    if bits == 24:
+        b = raw.astype(np.int32)
+        value = b[..., 0] | (b[..., 1] << 8) | (b[..., 2] << 16)
+        value = np.where(value >= 1 << 23, value - (1 << 24), value)
+        return value.astype(np.float32) / float(1 << 23)
+
+    return raw.astype(np.float32) / float(1 << (bits - 1))
+
+
+def iter_wav_blocks(
+    path,
+    block_size: int = 1 << 16,
+    channel: int = 0,
+) -> Iterator[np.ndarray]:
+    """
+    WAV 파일을 memmap으로 열어 한 채널을 block_size 프레임씩 float32(-1~1)로 읽는다.
+    파일 전체를 메모리에 올리지 않으므로 수 GB 녹음도 일정한 메모리로 순회할 수 있다.
+    """
+    info = read_wav_info(path)
+    if not 0 <= channel < info["channels"]:
+        raise ValueError(f"채널 인덱스가 범위를 벗어났습니다: {channel}")
+
+    data = open_wav_memmap(path, info)
+    block_size = max(int(block_size), 1)
+
+    for i in range(0, info["n_frames"], block_size):
+        yield pcm_to_float32(data[i : i + block_size, channel], info)
+
+
+def write_wav(path, data, fs: int) -> None:
+    """
+    float 데이터를 32bit float WAV로 저장한다.
+
+    Args:
+        path: 저장할 파일 경로
+        data: (샘플 수,) 또는 (샘플 수, 채널 수) 배열
+        fs: 샘플레이트 (Hz)
+    """
+    x = np.asarray(data, dtype="<f4")
+    if x.ndim == 1:
+        x = x[:, np.newaxis]
+    if x.ndim != 2:
+        raise ValueError("data는 1차원 또는 2차원 배열이어야 합니다.")
+
+    n_frames, channels = x.shape
+    block_align = channels * 4
+    data_size = n_frames * block_align
+
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sI4s", b"RIFF", 36 + data_size, b"WAVE"))
+        f.write(
+            struct.pack(
+                "<4sIHHIIHH",
+                b"fmt ",
+                16,
+                _WAVE_FORMAT_IEEE_FLOAT,
+                channels,
+                int(fs),
+                int(fs) * block_align,
+                block_align,
+                32,
+            )
+        )
+        f.write(struct.pack("<4sI", b"data", data_size))
+        f.write(np.ascontiguousarray(x).tobytes())
@@ -1,42 +1,409 @@
+from __future__ import annotations
+
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Optional
+
 import numpy as np
 
-def compute_frequency_response(recording, fs, f_min: float = 20.0, f_max: float = 1000.0):
+from dsp.logspectrum import LogSpectrum
+from dsp.peaks import PeakHierarchy
+
+# numpy 2.0부터 np.fft.rfft가 out 인자를 지원한다.
+_RFFT_SUPPORTS_OUT = "out" in inspect.signature(np.fft.rfft).parameters
+
+# 긴 녹음을 나눠서 FFT할 때 시도할 분할 수(radix) 후보
+_SPLIT_RADICES = (2, 3, 4, 5, 6, 8, 10, 12, 15, 16, 20, 24, 25, 30, 32, 40, 48, 50, 60, 64)
+
+
+def rfft_into(x, out: np.ndarray, axis: int = -1) -> np.ndarray:
+    """np.fft.rfft(x, axis=axis) 결과를 out에 쓴다. numpy 2.0 이상에서는 임시 배열 없이 계산한다."""
+    if _RFFT_SUPPORTS_OUT:
+        np.fft.rfft(x, axis=axis, out=out)
+    else:
+        out[...] = np.fft.rfft(x, axis=axis)
+    return out
+
+
+def irfft_into(x, n: int, out: np.ndarray, axis: int = -1) -> np.ndarray:
+    """np.fft.irfft(x, n, axis=axis) 결과를 out에 쓴다. (rfft_into와 같은 방식)"""
+    if _RFFT_SUPPORTS_OUT:
+        np.fft.irfft(x, n=n, axis=axis, out=out)
+    else:
+        out[...] = np.fft.irfft(x, n=n, axis=axis)
+    return out
+
+
+def _hann_window(n: int, dtype) -> np.ndarray:
+    """
+    np.hanning(n)과 같은 값을 dtype 배열로 만든다.
+    긴 윈도우도 float64 임시 배열을 통째로 만들지 않도록 구간별로 계산한다.
+    """
+    out = np.empty(n, dtype=dtype)
+    if n == 1:
+        out[0] = 1.0
+        return out
+
+    chunk = 1 << 18
+    for i in range(0, n, chunk):
+        k = np.arange(i, min(i + chunk, n), dtype=np.float64)
+        out[i : i + k.size] = 0.5 - 0.5 * np.cos(2.0 * np.pi * k / (n - 1))
+    return out
+
+
+class AnalysisWorkspace:
+    """
+    compute_frequency_response에서 재사용하는 분석 작업 공간.
+
+    - 길이별 Hann 윈도우와 (길이, fs, 대역)별 주파수 그리드를 캐시한다.
+    - 윈도우 적용 신호 / 복소 스펙트럼 / 크기(dB) 버퍼를 미리 할당해 두고
+      더 긴 신호가 들어올 때만 키운다.
+    - 기본 dtype은 float32(스펙트럼은 complex64)로, float64 대비 메모리를 절반만 쓴다.
+    - max_fft_size보다 긴 신호는 r개의 decimated 부분열로 나눠 FFT한 뒤
+      필요한 대역의 bin만 twiddle로 합친다(radix-r 1단 분할).
+      numpy FFT가 내부에서 잡는 작업 메모리도 1/r로 줄어든다.
+
+    compute()가 돌려주는 배열은 내부 버퍼의 view이므로 다음 호출에서 덮어써진다.
+    결과를 오래 보관해야 한다면 copy()해서 사용한다.
+
+    max_retained_bytes를 주면 trim()이 캐시/버퍼 합계가 그보다 클 때 모두 비운다.
+    (긴 녹음 하나 때문에 커진 버퍼를 계속 붙잡고 있지 않도록)
+    """
+
+    def __init__(
+        self,
+        dtype=np.float32,
+        max_cached_lengths: int = 2,
+        max_fft_size: int = 1 << 20,
+        max_retained_bytes: int | None = None,
+    ):
+        self.dtype = np.dtype(dtype)
+        self.max_retained_bytes = max_retained_bytes
+        self.complex_dtype = np.result_type(self.dtype, np.complex64)
+        self.max_cached_lengths = max(int(max_cached_lengths), 1)
+        self.max_fft_size = max(int(max_fft_size), 8)
+
+        self._windows = OrderedDict()
+        self._bands = OrderedDict()
+        self._plans = OrderedDict()
+
+        self._windowed = np.empty(0, dtype=self.dtype)
+        self._spectrum = np.empty(0, dtype=self.complex_dtype)
+        self._gathered = np.empty(0, dtype=self.complex_dtype)
+        self._accum = np.empty(0, dtype=self.complex_dtype)
+        self._mag_db = np.empty(0, dtype=self.dtype)
+
+    @staticmethod
+    def _remember(cache, key, value, limit):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _grow(buf: np.ndarray, size: int) -> np.ndarray:
+        if buf.size < size:
+            return np.empty(size, dtype=buf.dtype)
+        return buf
+
+    def window(self, n: int) -> np.ndarray:
+        """길이 n의 Hann 윈도우(np.hanning과 동일)를 캐시에서 꺼내거나 만든다."""
+        win = self._windows.get(n)
+        if win is None:
+            win = _hann_window(n, self.dtype)
+            self._remember(self._windows, n, win, self.max_cached_lengths)
+        else:
+            self._windows.move_to_end(n)
+        return win
+
+    def band(self, n: int, fs, f_min: float, f_max: float):
+        """
+        길이 n 신호의 rfft bin 중 [f_min, f_max]에 들어가는 구간을 계산한다.
+
+        Returns:
+            start, stop: rfft 결과에서 잘라낼 bin 인덱스 구간
+            freqs: 해당 구간의 주파수 배열 (Hz)
+        """
+        key = (n, float(fs), float(f_min), float(f_max))
+        cached = self._bands.get(key)
+        if cached is not None:
+            self._bands.move_to_end(key)
+            return cached
+
+        # np.fft.rfftfreq와 같은 식으로 계산해야 경계 bin 판정이 기존과 일치한다.
+        val = 1.0 / (n * (1.0 / fs))
+        n_bins = n // 2 + 1
+        k_lo = min(max(int(np.floor(f_min / val)) - 1, 0), n_bins)
+        k_hi = min(max(int(np.ceil(f_max / val)) + 2, k_lo), n_bins)
+
+        candidates = np.arange(k_lo, k_hi) * val
+        inside = np.flatnonzero((candidates >= f_min) & (candidates <= f_max))
+
+        if inside.size == 0:
+            start = stop = k_lo
+        else:
+            start = k_lo + int(inside[0])
+            stop = k_lo + int(inside[-1]) + 1
+
+        freqs = candidates[start - k_lo : stop - k_lo]
+        freqs.setflags(write=False)
+
+        return self._remember(
+            self._bands, key, (start, stop, freqs), 4 * self.max_cached_lengths
+        )
+
+    def _split_radix(self, n: int) -> int:
+        if n <= self.max_fft_size:
+            return 1
+
+        best = 1
+        for r in _SPLIT_RADICES:
+            if n % r == 0:
+                best = r
+                if n // r <= self.max_fft_size:
+                    break
+        return best
+
+    def _split_plan(self, n: int, r: int, start: int, stop: int):
+        """
+        radix-r 분할 시 대역 bin k에 대해
+          X[k] = sum_q W_n^(q*k) * X_q[k mod L]   (L = n / r)
+        를 계산하기 위한 인덱스/켤레 여부/twiddle을 캐시한다.
+        """
+        key = (n, r, start, stop)
+        cached = self._plans.get(key)
+        if cached is not None:
+            self._plans.move_to_end(key)
+            return cached
+
+        L = n // r
+        k = np.arange(start, stop, dtype=np.int64)
+        j = k % L
+        conj = j > L // 2
+        j = np.where(conj, L - j, j)
+
+        twiddles = np.empty((r, k.size), dtype=self.complex_dtype)
+        for q in range(r):
+            phase = (-2.0 * np.pi / n) * ((q * k) % n)
+            twiddles[q] = np.exp(1j * phase)
+
+        return self._remember(
+            self._plans, key, (j, conj, twiddles), self.max_cached_lengths
+        )
+
+    def release(self) -> None:
+        """캐시와 버퍼를 모두 비운다. (긴 녹음을 분석한 뒤 메모리를 돌려줄 때)"""
+        self._windows.clear()
+        self._bands.clear()
+        self._plans.clear()
+        self._windowed = np.empty(0, dtype=self.dtype)
+        self._spectrum = np.empty(0, dtype=self.complex_dtype)
+        self._gathered = np.empty(0, dtype=self.complex_dtype)
+        self._accum = np.empty(0, dtype=self.complex_dtype)
+        self._mag_db = np.empty(0, dtype=self.dtype)
+
+    @property
+    def nbytes(self) -> int:
+        """캐시와 버퍼가 잡고 있는 메모리(바이트)."""
+        cached = sum(w.nbytes for w in self._windows.values())
+        cached += sum(freqs.nbytes for _, _, freqs in self._bands.values())
+        cached += sum(
+            j.nbytes + conj.nbytes + tw.nbytes for j, conj, tw in self._plans.values()
+        )
+        buffers = (self._windowed, self._spectrum, self._gathered, self._accum, self._mag_db)
+        return cached + sum(buf.nbytes for buf in buffers)
+
+    def trim(self) -> None:
+        """max_retained_bytes를 넘게 잡고 있으면 release()한다."""
+        if self.max_retained_bytes is not None and self.nbytes > self.max_retained_bytes:
+            self.release()
+
+    def _rfft(self, x_win: np.ndarray) -> np.ndarray:
+        L = x_win.size
+        if not _RFFT_SUPPORTS_OUT:
+            return np.fft.rfft(x_win)
+
+        self._spectrum = self._grow(self._spectrum, L // 2 + 1)
+        fft = self._spectrum[: L // 2 + 1]
+        np.fft.rfft(x_win, out=fft)
+        return fft
+
+    def _band_spectrum(self, x: np.ndarray, n: int, start: int, stop: int) -> np.ndarray:
+        """대역 [start, stop) bin의 복소 스펙트럼을 계산한다."""
+        window = self.window(n)
+        r = self._split_radix(n)
+        L = n // r
+
+        self._windowed = self._grow(self._windowed, L)
+        x_win = self._windowed[:L]
+
+        if r == 1:
+            np.multiply(x, window, out=x_win, casting="same_kind")
+            return self._rfft(x_win)[start:stop]
+
+        m = stop - start
+        j, conj, twiddles = self._split_plan(n, r, start, stop)
+
+        self._gathered = self._grow(self._gathered, m)
+        self._accum = self._grow(self._accum, m)
+        gathered = self._gathered[:m]
+        accum = self._accum[:m]
+        accum.fill(0)
+
+        for q in range(r):
+            np.multiply(x[q::r], window[q::r], out=x_win, casting="same_kind")
+            sub = self._rfft(x_win)
+
+            np.take(sub, j, out=gathered)
+            np.conjugate(gathered, out=gathered, where=conj)
+            gathered *= twiddles[q]
+            accum += gathered
+
+        return accum
+
+    def compute(
+        self,
+        recording,
+        fs,
+        f_min: float = 20.0,
+        f_max: float = 1000.0,
+        keep_complex: bool = False,
+    ):
+        """
+        compute_frequency_response와 같은 계산을 내부 버퍼 위에서 수행한다.
+
+        Returns:
+            freqs: 주파수 배열 (Hz, 읽기 전용 캐시)
+            mag_db: 각 주파수에 대한 크기(dB, 내부 버퍼의 view)
+            spectrum: keep_complex=True일 때만. 대역 안의 복소 스펙트럼(내부 버퍼의 view)
+        """
+        x = np.asarray(recording).squeeze()
+
+        if x.ndim != 1 or x.size < 8:
+            return (None, None, None) if keep_complex else (None, None)
+
+        n = x.size
+        start, stop, freqs = self.band(n, fs, f_min, f_max)
+        spectrum = self._band_spectrum(x, n, start, stop)
+
+        # 대역 밖 bin은 버리므로 크기/dB 변환은 대역 안에서만 수행한다.
+        self._mag_db = self._grow(self._mag_db, stop - start)
+        mag_db = self._mag_db[: stop - start]
+        np.abs(spectrum, out=mag_db, casting="same_kind")
+        np.maximum(mag_db, 1e-12, out=mag_db)
+        np.log10(mag_db, out=mag_db)
+        mag_db *= 20.0
+
+        if keep_complex:
+            return freqs, mag_db, spectrum
+        return freqs, mag_db
+
+
+_thread_local = threading.local()
+
+# 스레드별 기본 workspace가 호출 사이에 붙잡아 둘 수 있는 메모리 상한.
+# 10초 @ 48 kHz 녹음(윈도우 + 스펙트럼 + 대역 버퍼)은 들어가고, 그보다 긴 녹음 뒤에는 비운다.
+DEFAULT_WORKSPACE_RETAINED_BYTES = 8 << 20
+
+
+def _default_workspace() -> AnalysisWorkspace:
+    workspace = getattr(_thread_local, "workspace", None)
+    if workspace is None:
+        workspace = AnalysisWorkspace(max_retained_bytes=DEFAULT_WORKSPACE_RETAINED_BYTES)
+        _thread_local.workspace = workspace
+    return workspace
+
+
+def compute_frequency_response(
+    recording,
+    fs,
+    f_min: float = 20.0,
+    f_max: float = 1000.0,
+    workspace: AnalysisWorkspace | None = None,
+    keep_complex: bool = False,
+):
     """
     녹음된 신호로부터 주파수 응답을 계산한다.
 
     Args:
         recording: 1채널 녹음 데이터 (numpy 배열 또는 리스트)
         fs: 샘플레이트 (예: 48000)
+        workspace: 재사용할 AnalysisWorkspace.
+            지정하면 결과는 workspace 내부 버퍼의 view로 반환된다(다음 호출에서 덮어써짐).
+            지정하지 않으면 스레드별 기본 workspace를 쓰고, 결과는 복사본으로 반환된다.
+            기본 workspace는 DEFAULT_WORKSPACE_RETAINED_BYTES보다 많이 잡고 있으면
+            결과를 복사한 뒤 버퍼를 비운다.
+        keep_complex: True면 크기와 함께 같은 FFT의 복소 스펙트럼도 돌려준다.
+            (위상/군지연 분석용, dsp.phase 참고)
 
     Returns:
         freqs: 주파수 배열 (Hz)
-        mag_db: 각 주파수에 대한 크기(dB)
+        mag_db: 각 주파수에 대한 크기(dB, float32)
+        spectrum: keep_complex=True일 때만. 대역 안의 복소 스펙트럼(complex64)
     """
-    x = np.asarray(recording).astype(float).squeeze()
+    if workspace is not None:
+        return workspace.compute(
+            recording, fs, f_min=f_min, f_max=f_max, keep_complex=keep_complex
+        )
 
-    if x.ndim != 1 or x.size < 8:
-        return None, None
+    workspace = _default_workspace()
+    result = workspace.compute(
+        recording, fs, f_min=f_min, f_max=f_max, keep_complex=keep_complex
+    )
+    if result[0] is not None:
+        result = tuple(a.copy() for a in result)
 
-    window = np.hanning(x.size)
-    x_win = x * window
+    workspace.trim()
+    return result
 
-    fft = np.fft.rfft(x_win)
 
-    mag = np.abs(fft)
-    mag[mag == 0] = 1e-12 
+def fractional_octave_smooth(freqs, values, fraction: int = 24) -> np.ndarray:
+    """
+    1/fraction 옥타브 평균을 모든 bin에 대해 한 번에 계산한다.
+
+    각 중심 주파수 f_c의 구간 [f_c / 2^(1/(2N)), f_c * 2^(1/(2N))] 경계를
+    searchsorted로 찾고, 누적합의 차로 구간 평균을 구한다 (O(N log N)).
+    f_c <= 0 이거나 구간에 bin이 없으면 원래 값을 그대로 둔다.
+
+    Args:
+        freqs: 주파수 배열 (Hz). 오름차순이 아니면 정렬해서 계산한 뒤 되돌린다.
+        values: (..., len(freqs)) 배열. dB, 군지연 등 여러 곡선을 한 번에 넘길 수 있다.
+        fraction: N (옥타브 분수)
+
+    Returns:
+        values와 같은 모양/dtype의 스무딩된 배열
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    values = np.asarray(values)
+    if freqs.size == 0:
+        return values.copy()
 
-    mag_db = 20.0 * np.log10(mag)
+    order = None
+    if np.any(np.diff(freqs) < 0):
+        order = np.argsort(freqs, kind="stable")
+        freqs = freqs[order]
+        values = values[..., order]
 
-    freqs = np.fft.rfftfreq(x_win.size, d=1.0 / fs)
+    half_band_factor = 2.0 ** (1.0 / (2.0 * max(int(fraction), 1)))
+    lo = np.searchsorted(freqs, freqs / half_band_factor, side="left")
+    hi = np.searchsorted(freqs, freqs * half_band_factor, side="right")
+    count = hi - lo
+    keep = (freqs <= 0) | (count == 0)
 
-    mask = (freqs >= f_min) & (freqs <= f_max)
-    freqs_band = freqs[mask]
-    mag_db_band = mag_db[mask]
+    csum = np.zeros(values.shape[:-1] + (freqs.size + 1,), dtype=np.float64)
+    np.cumsum(values, axis=-1, dtype=np.float64, out=csum[..., 1:])
+    smoothed = (csum[..., hi] - csum[..., lo]) / np.maximum(count, 1)
+    smoothed = np.where(keep, values, smoothed).astype(values.dtype, copy=False)
 
-    return freqs_band, mag_db_band
+    if order is not None:
+        restored = np.empty_like(smoothed)
+        restored[..., order] = smoothed
+        smoothed = restored
+    return smoothed
 
 
-# 이동 평균 기반의 스무딩 함수 추가
 def smooth_response(freqs, mag_db, window_size: int = 24):
     """
     1/N 옥타브 방식으로 스무딩을 수행한다.
@@ -46,7 +413,7 @@ def smooth_response(freqs, mag_db, window_size: int = 24):
 
     각 중심 주파수 f_c에 대해
       [f_c / 2^(1/(2N)), f_c * 2^(1/(2N))]
-    범위에 포함되는 bin들의 dB 값을 평균낸다.
+    범위에 포함되는 bin들의 dB 값을 평균낸다. (fractional_octave_smooth)
 
     Returns:
         freqs: 기존 주파수 배열
@@ -61,27 +428,8 @@ def smooth_response(freqs, mag_db, window_size: int = 24):
     if freqs.size == 0:
         return freqs, mag_db
 
-    N = max(int(window_size), 1)
-    smoothed = np.empty_like(mag_db)
-
-    half_band_factor = 2.0 ** (1.0 / (2.0 * N))
+    return freqs, fractional_octave_smooth(freqs, mag_db, window_size)
 
-    for i, f_c in enumerate(freqs):
-        if f_c <= 0:
-            smoothed[i] = mag_db[i]
-            continue
-
-        f_low = f_c / half_band_factor
-        f_high = f_c * half_band_factor
-
-        mask = (freqs >= f_low) & (freqs <= f_high)
-
-        if not np.any(mask):
-            smoothed[i] = mag_db[i]
-        else:
-            smoothed[i] = float(np.mean(mag_db[mask]))
-
-    return freqs, smoothed
 
 def process_frequency_response(
     recording,
@@ -90,29 +438,38 @@ def process_frequency_response(
     f_max: float = 1000.0,
     window_size: int = 24,
     baseline_method: str = "median",
+    keep_complex: bool = False,
 ):
     """
-    FFT -> 대역 슬라이싱 -> 스무딩 -> 기준선 정규화를 한 번에 수행하는 헬퍼 함수.
+    FFT -> 대역 슬라이싱 -> 스무딩을 한 번에 수행하는 헬퍼 함수.
 
     Args:
         recording: 1채널 녹음 데이터
         fs: 샘플레이트
         f_min: 사용할 최소 주파수(Hz)
         f_max: 사용할 최대 주파수(Hz)
-        window_size: 스무딩 윈도우 크기
-        baseline_method: 'median' 또는 'mean'
+        window_size: 스무딩 옥타브 분수 N (1/N 옥타브)
+        baseline_method: 현재는 쓰지 않는다 (기존 호출과의 호환용).
+            부밍 탐지는 기준선 대신 로컬 평균 대비 ΔdB를 본다.
+        keep_complex: True면 스무딩 전 복소 스펙트럼(freqs와 같은 bin)도 함께 돌려준다.
 
     Returns:
         freqs: 주파수 배열 (f_min~f_max 구간)
-        mag_db_norm: baseline을 0dB로 정규화한 dB 배열
-        baseline: 기준선 값(dB)
+        mag_db_smooth: 스무딩된 dB 배열
+        spectrum: keep_complex=True일 때만. 스무딩 전 복소 스펙트럼
+        신호가 너무 짧으면 같은 개수의 None
     """
-    freqs, mag_db = compute_frequency_response(recording, fs)
+    result = compute_frequency_response(
+        recording, fs, f_min=f_min, f_max=f_max, keep_complex=keep_complex
+    )
+    freqs, mag_db = result[0], result[1]
     if freqs is None or mag_db is None:
-        return None, None, None
+        return (None, None, None) if keep_complex else (None, None)
 
     freqs_s, mag_db_smooth = smooth_response(freqs, mag_db, window_size=window_size)
 
+    if keep_complex:
+        return freqs_s, mag_db_smooth, result[2]
     return freqs_s, mag_db_smooth
 
 def detect_booming_bands(
@@ -130,6 +487,8 @@ def detect_booming_bands(
     - 원 신호와의 차이가 threshold_db 이상인 구간만 부밍 후보로 본다.
     - 연속된 구간을 하나의 대역으로 묶고, 각 대역의 피크 주파수/dB를 계산한다.
 
+    임계값을 바꿔 가며 여러 번 볼 때는 peak_hierarchy()를 한 번 만들어 재사용하면 된다.
+
     Args:
         freqs: 주파수 배열 (Hz)
         mag_db_norm: 정규화된 dB 배열 (baseline은 이미 제거된 상태여도 상관 없음)
@@ -148,77 +507,203 @@ def detect_booming_bands(
                 ...
             ]
     """
-    if freqs is None or mag_db_norm is None:
+    hierarchy = peak_hierarchy(freqs, mag_db_norm)
+    if hierarchy is None:
         return []
+    return hierarchy.bands(threshold_db, min_bandwidth_hz)
+
+
+# booming_delta_db의 로컬 평균 구간 (옥타브). 가운데 가드 구간은 피크 자신이 평균을 끌어올리지
+# 않도록 빼고, 측정 범위 양 끝은 스윕/분석 윈도우의 롤오프라 ΔdB를 계산하지 않는다.
+BASELINE_WINDOW_OCTAVES = 1.0
+BASELINE_GUARD_OCTAVES = 1.0 / 3.0
+EDGE_TRIM_OCTAVES = 1.0 / 6.0
+
+
+def booming_delta_db(freqs, mag_db_norm) -> np.ndarray:
+    """
+    detect_booming_bands가 임계값과 비교하는 ΔdB 곡선 (원 응답 - 로컬 평균).
+
+    로컬 평균은 각 주파수 양옆 BASELINE_WINDOW_OCTAVES 폭에서 가운데 BASELINE_GUARD_OCTAVES를
+    뺀 구간의 로그 주파수 가중 평균이라, 선형 bin과 로그 그리드(창 = points_per_octave의 고정 비율)에서
+    같은 값을 낸다. 양 끝 EDGE_TRIM_OCTAVES 구간은 NaN이다.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mag_db_norm = np.asarray(mag_db_norm, dtype=np.float64)
+    delta = np.full(mag_db_norm.shape, np.nan)
+    if freqs.size == 0:
+        return delta
+
+    edge = 2.0 ** EDGE_TRIM_OCTAVES
+    inside = (freqs > 0) & (freqs >= freqs[0] * edge) & (freqs <= freqs[-1] / edge)
+    if np.count_nonzero(inside) < 2:
+        return delta
+
+    f = freqs[inside]
+    x = mag_db_norm[inside]
+    # bin 하나가 덮는 log2 폭을 가중치로 쓴다 (선형 bin에서는 1/f에 비례)
+    weight = np.gradient(np.log2(f))
+    cw = np.concatenate([[0.0], np.cumsum(weight)])
+    cwx = np.concatenate([[0.0], np.cumsum(weight * x)])
+
+    def window_sums(octaves):
+        lo = np.searchsorted(f, f / 2.0 ** (octaves / 2.0), side="left")
+        hi = np.searchsorted(f, f * 2.0 ** (octaves / 2.0), side="right")
+        return cwx[hi] - cwx[lo], cw[hi] - cw[lo]
+
+    total, total_w = window_sums(BASELINE_WINDOW_OCTAVES)
+    guard, guard_w = window_sums(BASELINE_GUARD_OCTAVES)
+    ring_w = total_w - guard_w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        local_baseline = np.where(ring_w > 0, (total - guard) / ring_w, x)
+
+    delta[inside] = x - local_baseline
+    return delta
+
+
+def peak_hierarchy(freqs, mag_db_norm) -> Optional[PeakHierarchy]:
+    """
+    응답 곡선의 ΔdB 피크 계층을 만든다. 한 번 만들어 두면
+    hierarchy.bands(threshold_db, min_bandwidth_hz)로 어떤 임계값의 부밍 대역도 바로 얻는다.
+    입력이 비어 있으면 None.
+    """
+    if freqs is None or mag_db_norm is None:
+        return None
 
     freqs = np.asarray(freqs)
     mag_db_norm = np.asarray(mag_db_norm)
-
     if freqs.size == 0 or mag_db_norm.size == 0:
-        return []
+        return None
 
-    window_bins = max(5, int(len(freqs) * 0.1))
-    if window_bins % 2 == 0:
-        window_bins += 1  # 홀수로 맞추기
-
-    pad = window_bins // 2
-    padded = np.pad(mag_db_norm, (pad, pad), mode="edge")
-    kernel = np.ones(window_bins) / window_bins
-    local_baseline = np.convolve(padded, kernel, mode="valid")
-
-    delta_db = mag_db_norm - local_baseline
-
-    over = delta_db >= threshold_db
-
-    bands = []
-    in_band = False
-    start_idx = 0
-
-    for i, is_over in enumerate(over):
-        if is_over and not in_band:
-            # 새로운 부밍 대역 시작
-            in_band = True
-            start_idx = i
-        elif not is_over and in_band:
-            # 부밍 대역 종료
-            end_idx = i - 1
-            f_start = float(freqs[start_idx])
-            f_end = float(freqs[end_idx])
-
-            # 너무 좁은 대역은 노이즈로 간주
-            if f_end - f_start >= min_bandwidth_hz:
-                segment_delta = delta_db[start_idx : end_idx + 1]
-                peak_rel_idx = int(np.argmax(segment_delta))
-                peak_idx = start_idx + peak_rel_idx
-
-                bands.append(
-                    {
-                        "f_start": f_start,
-                        "f_end": f_end,
-                        "peak_freq": float(freqs[peak_idx]),
-                        "peak_gain_db": float(delta_db[peak_idx]),
-                    }
-                )
-            in_band = False
-
-    # 끝까지 부밍 상태로 끝난 경우 처리
-    if in_band:
-        end_idx = len(over) - 1
-        f_start = float(freqs[start_idx])
-        f_end = float(freqs[end_idx])
-
-        if f_end - f_start >= min_bandwidth_hz:
-            segment_delta = delta_db[start_idx : end_idx + 1]
-            peak_rel_idx = int(np.argmax(segment_delta))
-            peak_idx = start_idx + peak_rel_idx
-
-            bands.append(
-                {
-                    "f_start": f_start,
-                    "f_end": f_end,
-                    "peak_freq": float(freqs[peak_idx]),
-                    "peak_gain_db": float(delta_db[peak_idx]),
-                }
-            )
-
-    return bands
\ No newline at end of file
+    return PeakHierarchy(freqs, booming_delta_db(freqs, mag_db_norm))
+
+
+def transfer_spectrum(recording_spectrum, sweep_spectrum, regularization_db: float = -60.0):
+    """
+    같은 길이/윈도우로 계산한 녹음과 스윕의 스펙트럼으로 복소 전달함수를 구한다.
+
+        H = R · S* / (|S|² + ε),  ε = max|S|² · 10^(regularization_db / 10)
+
+    스윕 에너지가 거의 없는 bin에서 H가 발산하지 않도록 ε로 눌러 준다.
+    """
+    R = np.asarray(recording_spectrum, dtype=np.complex128)
+    S = np.asarray(sweep_spectrum, dtype=np.complex128)
+    power = S.real ** 2 + S.imag ** 2
+    eps = float(np.max(power, initial=0.0)) * 10.0 ** (regularization_db / 10.0)
+    return R * np.conj(S) / np.maximum(power + eps, 1e-30)
+
+
+def analyze_measurement(
+    recording,
+    fs,
+    meta=None,
+    window_size: int = 24,
+    threshold_db: float = 5.0,
+    min_bandwidth_hz: float = 5.0,
+    sweep=None,
+):
+    """
+    한 번의 스윕 측정 결과를 표준 분석 결과로 만든다.
+    (주파수 응답 → 스무딩 → 표준 로그 그리드 → 부밍 대역 탐지)
+
+    sweep을 넘기면 녹음 FFT의 복소 스펙트럼을 버리지 않고 스윕 스펙트럼으로 나눠
+    복소 전달함수를 함께 돌려준다. 녹음 FFT는 한 번만 계산한다.
+
+    Args:
+        recording: 1채널 녹음 데이터
+        fs: 샘플레이트
+        meta: SweepMeasureWorker가 함께 넘기는 메타데이터 dict (f_start/f_end 사용)
+        sweep: 선택 사항. 재생한 스윕 신호 (위상/군지연 분석용)
+
+    Returns:
+        측정 신호가 너무 짧으면 None, 아니면 다음 키를 가진 dict
+        - spectrum: LogSpectrum (1/96 옥타브 표준 그리드)
+        - freqs: spectrum에서 측정 범위 안의 주파수 배열 (Hz)
+        - mag_db: 위 주파수에 대한 스무딩된 dB 배열
+        - bands: detect_booming_bands 결과
+        - peaks: PeakHierarchy (다른 임계값의 부밍 대역을 다시 계산 없이 얻을 때 사용)
+        - transfer: sweep을 넘긴 경우 (선형 bin 주파수, 복소 전달함수), 아니면 None.
+          dsp.phase.phase_analysis에 그대로 넘길 수 있다.
+    """
+    meta = meta or {}
+    f_min = meta.get("f_start", 20.0)
+    f_max = meta.get("f_end", 1000.0)
+    result = process_frequency_response(
+        recording,
+        fs,
+        f_min=f_min,
+        f_max=f_max,
+        window_size=window_size,
+        baseline_method="median",
+        keep_complex=sweep is not None,
+    )
+    freqs, mag_db = result[0], result[1]
+    if freqs is None:
+        return None
+
+    transfer = None
+    if sweep is not None:
+        # 스윕을 녹음 길이에 맞춰야 두 스펙트럼의 bin이 같다.
+        n = np.asarray(recording).squeeze().size
+        sweep = np.asarray(sweep, dtype=np.float32).reshape(-1)[:n]
+        sweep = np.pad(sweep, (0, n - sweep.size))
+        _, _, sweep_spectrum = compute_frequency_response(
+            sweep, fs, f_min=f_min, f_max=f_max, keep_complex=True
+        )
+        transfer = (freqs, transfer_spectrum(result[2], sweep_spectrum))
+
+    # 선형 bin 곡선을 표준 로그 그리드(1/96 옥타브)로 옮겨서
+    # 이후 단계(부밍 탐지/EQ/그래프/저장)는 수백 개 점만 다루도록 한다.
+    spectrum = LogSpectrum.from_linear(freqs, mag_db)
+    freqs, mag_db = spectrum.as_arrays()
+
+    peaks = peak_hierarchy(freqs, mag_db)
+    bands = peaks.bands(threshold_db, min_bandwidth_hz) if peaks is not None else []
+
+    return {
+        "spectrum": spectrum,
+        "freqs": freqs,
+        "mag_db": mag_db,
+        "bands": bands,
+        "peaks": peaks,
+        "transfer": transfer,
+    }
+
+
+if __name__ == "__main__":
+    # 시뮬레이션 룸 모드로 로그 그리드와 선형 bin의 부밍 탐지가 같은 결과를 내는지 확인한다.
+    # (가장 큰 ΔdB 피크가 그리드 한 칸, 약 1 dB 안에서 일치해야 한다)
+    import sys
+
+    from audio.backend import SimulatedBackend, resonant_ir
+    from audio.measurement import SweepMeasurement
+
+    fs = 48_000
+    cases = {
+        "45 Hz Q8 + 110 Hz": [(45.0, 8.0, 1.0), (110.0, 10.0, 0.6)],
+        "60 Hz": [(60.0, 8.0, 1.0)],
+        "45 Hz x3": [(45.0, 8.0, 3.0)],
+    }
+    failed = False
+    for name, modes in cases.items():
+        backend = SimulatedBackend(resonant_ir(fs, modes), seed=0)
+        sweep, recording, fs, meta = SweepMeasurement(backend, duration=7.0, fs=fs).run()
+
+        freqs, mag_db = process_frequency_response(recording, fs, meta["f_start"], meta["f_end"])
+        spectrum = LogSpectrum.from_linear(freqs, mag_db)
+        grid, grid_db = spectrum.as_arrays()
+
+        linear_delta = booming_delta_db(freqs, mag_db)
+        grid_delta = booming_delta_db(grid, grid_db)
+        i, k = int(np.nanargmax(linear_delta)), int(np.nanargmax(grid_delta))
+
+        step = np.log2(grid[k] / freqs[i]) * spectrum.points_per_octave
+        diff = grid_delta[k] - linear_delta[i]
+        ok = abs(step) <= 1.0 and abs(diff) <= 1.0
+        failed |= not ok
+        print(
+            f"{name}: 선형 {freqs[i]:.1f} Hz +{linear_delta[i]:.1f} dB / "
+            f"그리드 {grid[k]:.1f} Hz +{grid_delta[k]:.1f} dB "
+            f"({step:+.2f}칸, {diff:+.2f} dB) {'OK' if ok else 'FAIL'}"
+        )
+    sys.exit(1 if failed else 0)
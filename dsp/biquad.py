@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+_IDENTITY_SOS = np.array([1.0, 0.0, 0.0, 1.0, 0.0, 0.0])
+
+
+def _cascade_state_space(sos: np.ndarray):
+    """
+    SOS 캐스케이드(Direct Form II Transposed)를 하나의 상태공간 (A, B, C, D)로 합친다.
+    섹션마다 상태가 2개라 전체 상태 수는 2 * 섹션 수다.
+    """
+    n_sec = sos.shape[0]
+    M = 2 * n_sec
+    A = np.zeros((M, M))
+    B = np.zeros(M)
+    C = np.zeros(M)
+    D = 1.0
+
+    for i, (b0, b1, b2, a0, a1, a2) in enumerate(sos):
+        b0, b1, b2, a1, a2 = b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0
+        k = 2 * i
+
+        # 섹션 i의 입력은 지금까지의 캐스케이드 출력 (C x + D u)
+        Ai = np.array([[-a1, 1.0], [-a2, 0.0]])
+        Bi = np.array([b1 - a1 * b0, b2 - a2 * b0])
+
+        A[k : k + 2, k : k + 2] = Ai
+        A[k : k + 2, :k] = np.outer(Bi, C[:k])
+        B[k : k + 2] = Bi * D
+
+        # 섹션 i의 출력: y = z1 + b0 * (입력)
+        C = b0 * C
+        C[k] = 1.0
+        D = b0 * D
+
+    return A, B, C, D
+
+
+def block_matrices(sos, blocksize: int, dtype=np.float32):
+    """
+    길이 blocksize 블록 단위 처리를 위한 행렬들을 미리 계산한다.
+
+        y      = T @ x + O @ s
+        s_next = P @ s + K @ x
+
+    T: (N, N) 임펄스 응답 Toeplitz (하삼각), O: (N, M) 초기 상태 → 출력,
+    P: (M, M) = A^N, K: (M, N) 입력 → 블록 끝 상태
+    """
+    sos = np.atleast_2d(np.asarray(sos, dtype=np.float64))
+    A, B, C, D = _cascade_state_space(sos)
+    N = int(blocksize)
+    M = A.shape[0]
+
+    O = np.empty((N, M))
+    AkB = np.empty((N, M))  # A^k B, k = 0..N-1
+    row = C.copy()
+    vec = B.copy()
+    for k in range(N):
+        O[k] = row
+        AkB[k] = vec
+        row = row @ A
+        vec = A @ vec
+    P = np.linalg.matrix_power(A, N)
+
+    h = np.empty(N)
+    h[0] = D
+    h[1:] = O[:-1] @ B  # h[k] = C A^(k-1) B
+
+    idx = np.arange(N)
+    lag = idx[:, np.newaxis] - idx[np.newaxis, :]
+    T = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.0)
+
+    K = AkB[::-1].T  # 열 m = A^(N-1-m) B
+
+    return tuple(np.ascontiguousarray(m, dtype=dtype) for m in (T, O, P, K))
+
+
+class BlockBiquadChain:
+    """
+    고정 크기 블록 단위로 동작하는 다채널 biquad(SOS) 캐스케이드 필터.
+
+    - 블록마다 샘플 루프 대신 미리 계산한 행렬 곱 4번으로 처리한다.
+      입력은 (blocksize, channels) 배열이며 모든 채널을 한 번에 처리한다.
+    - 필터 상태는 블록 사이에 유지되고, process()는 내부 버퍼만 사용해서
+      블록마다 새 배열을 할당하지 않는다.
+    - set_sos()로 계수를 바꾸면 다음 블록 하나 동안 이전/새 필터 출력을
+      선형 크로스페이드해서 클릭 없이 전환한다. 섹션 수는 max_sections로 고정하고
+      남는 자리는 통과(identity) 섹션으로 채우므로 상태를 그대로 이어받을 수 있다.
+    """
+
+    def __init__(
+        self,
+        sos=None,
+        blocksize: int = 256,
+        channels: int = 2,
+        max_sections: int = 8,
+    ):
+        self.blocksize = int(blocksize)
+        self.channels = int(channels)
+        self.max_sections = int(max_sections)
+
+        M = 2 * self.max_sections
+        N = self.blocksize
+        self._state = np.zeros((M, self.channels), dtype=np.float32)
+        self._state_tmp = np.zeros_like(self._state)
+        self._out_tmp = np.zeros((N, self.channels), dtype=np.float32)
+        self._in_copy = np.zeros((N, self.channels), dtype=np.float32)
+        self._old_out = np.zeros((N, self.channels), dtype=np.float32)
+        self._ramp = ((np.arange(N) + 1.0) / N).astype(np.float32)[:, np.newaxis]
+
+        self._lock = threading.Lock()
+        self._pending = None
+        self._matrices = self._build(np.empty((0, 6)) if sos is None else sos)
+
+    def _build(self, sos):
+        sos = np.atleast_2d(np.asarray(sos, dtype=np.float64)).reshape(-1, 6)
+        if sos.shape[0] > self.max_sections:
+            raise ValueError(f"섹션 수는 최대 {self.max_sections}개까지 지원합니다.")
+
+        padded = np.tile(_IDENTITY_SOS, (self.max_sections, 1))
+        padded[: sos.shape[0]] = sos
+        return block_matrices(padded, self.blocksize)
+
+    def set_sos(self, sos) -> None:
+        """
+        새 계수를 예약한다. (GUI 등 다른 스레드에서 호출해도 된다)
+        무거운 행렬 계산은 호출한 스레드에서 끝내고, 오디오 스레드는 참조만 바꾼다.
+        """
+        matrices = self._build(sos)
+        with self._lock:
+            self._pending = matrices
+
+    def reset(self) -> None:
+        self._state.fill(0.0)
+
+    def _run(self, matrices, x, out) -> None:
+        T, O, _, _ = matrices
+        np.matmul(T, x, out=out)
+        np.matmul(O, self._state, out=self._out_tmp)
+        out += self._out_tmp
+
+    def _advance(self, matrices, x) -> None:
+        _, _, P, K = matrices
+        np.matmul(P, self._state, out=self._state_tmp)
+        np.matmul(K, x, out=self._state)
+        self._state += self._state_tmp
+
+    def process(self, x, out=None) -> np.ndarray:
+        """
+        (blocksize, channels) float32 블록 하나를 필터링한다.
+
+        Args:
+            x: 입력 블록
+            out: 결과를 쓸 배열 (x와 같은 모양). 생략하면 x를 제자리에서 덮어쓴다.
+        """
+        if out is None:
+            out = x
+        if np.shares_memory(x, out):
+            # 제자리 처리: 입력을 먼저 보관해 둔다.
+            np.copyto(self._in_copy, x)
+            x = self._in_copy
+
+        pending = None
+        if self._pending is not None:
+            with self._lock:
+                pending, self._pending = self._pending, None
+
+        if pending is None:
+            self._run(self._matrices, x, out)
+            self._advance(self._matrices, x)
+            return out
+
+        # 계수 전환: 같은 상태에서 이전/새 필터 출력을 모두 계산해 크로스페이드
+        old_out = self._old_out
+        self._run(self._matrices, x, old_out)
+        self._run(pending, x, out)
+        out -= old_out
+        out *= self._ramp
+        out += old_out
+
+        self._advance(pending, x)
+        self._matrices = pending
+        return out
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import numpy as np
+
+from dsp.logspectrum import DEFAULT_POINTS_PER_OCTAVE, log_frequency_grid
+
+HarmonicResult = Dict[str, Any]
+
+
+def _next_fast_len(n: int) -> int:
+    """n 이상인 2^a * 3^b 형태의 FFT 길이를 찾는다."""
+    best = 1 << int(np.ceil(np.log2(max(n, 1))))
+    p3 = 1
+    while p3 < best:
+        p2 = p3
+        while p2 < n:
+            p2 *= 2
+        best = min(best, p2)
+        p3 *= 3
+    return best
+
+
+def sweep_rate(f_start: float, f_end: float, duration: float) -> float:
+    """
+    generate_log_sweep 스윕의 시간 상수 L(초).
+    순간 주파수가 f_start * exp(t / L)로 증가하므로 k차 고조파 응답은
+    선형 응답보다 L * ln(k)초 앞에 나타난다.
+    """
+    return duration / np.log(f_end / f_start)
+
+
+def deconvolve_sweep(sweep, recording, reg_db: float = -60.0) -> np.ndarray:
+    """
+    녹음을 스윕 스펙트럼으로 나눠(정규화된 나눗셈) 순환 임펄스 응답을 구한다.
+
+    FFT 길이는 녹음 + 스윕 길이 이상이라 선형 응답은 앞쪽에,
+    음의 시간에 나타나는 고조파 응답은 배열 끝쪽에 놓인다.
+
+    Args:
+        sweep: 재생한 스윕 신호
+        recording: 1채널 녹음 데이터
+        reg_db: 정규화 항의 크기 (스윕 최대 파워 대비 dB)
+
+    Returns:
+        float32 임펄스 응답 (길이 n_fft)
+    """
+    s = np.asarray(sweep, dtype=np.float32).squeeze()
+    r = np.asarray(recording, dtype=np.float32).squeeze()
+    if s.ndim != 1 or r.ndim != 1:
+        raise ValueError("sweep과 recording은 1채널 신호여야 합니다.")
+
+    n_fft = _next_fast_len(s.size + r.size)
+    S = np.fft.rfft(s, n_fft)
+    R = np.fft.rfft(r, n_fft)
+
+    power = S.real**2 + S.imag**2
+    eps = float(np.max(power)) * 10.0 ** (reg_db / 10.0)
+    H = R * np.conj(S) / (power + eps)
+
+    return np.fft.irfft(H, n_fft).astype(np.float32)
+
+
+def extract_harmonic_irs(
+    ir,
+    fs: int,
+    rate: float,
+    max_order: int = 5,
+    pre_fraction: float = 0.1,
+):
+    """
+    deconvolve_sweep 결과에서 1~max_order차 고조파 임펄스 응답을 잘라낸다.
+
+    모든 차수를 같은 길이로 자르며, 길이는 가장 가까운 두 고조파 사이 간격
+    L * ln(K / (K - 1))의 90%로 정한다. 앞/뒤는 반쪽 Hann으로 페이드한다.
+
+    Args:
+        ir: deconvolve_sweep이 반환한 순환 임펄스 응답
+        fs: 샘플레이트
+        rate: sweep_rate()로 구한 시간 상수 L(초)
+        max_order: 추출할 최대 고조파 차수
+        pre_fraction: 윈도우 중 고조파 도착 시점 앞쪽에 둘 비율
+
+    Returns:
+        segments: (max_order, 윈도우 길이) 배열. segments[k-1]이 k차 응답
+        pre: 각 윈도우에서 도착 시점까지의 샘플 수
+    """
+    ir = np.asarray(ir, dtype=np.float32)
+    n = ir.size
+    max_order = max(int(max_order), 1)
+
+    if max_order > 1:
+        gap = rate * np.log(max_order / (max_order - 1.0))
+    else:
+        gap = rate * np.log(2.0)
+    win_len = max(int(0.9 * gap * fs), 16)
+    pre = int(win_len * pre_fraction)
+
+    # 시스템 지연: 선형 응답 피크 위치(녹음 구간 안에서 찾는다)
+    peak = int(np.argmax(np.abs(ir[: n // 2])))
+
+    orders = np.arange(1, max_order + 1)
+    arrivals = peak - np.round(rate * np.log(orders) * fs).astype(np.int64)
+    idx = (arrivals[:, np.newaxis] - pre + np.arange(win_len)) % n
+    segments = ir[idx]
+
+    fade = np.ones(win_len, dtype=np.float32)
+    if pre > 0:
+        fade[:pre] = np.hanning(2 * pre)[:pre]
+    tail = max(win_len // 10, 1)
+    fade[-tail:] = np.hanning(2 * tail)[tail:]
+    segments *= fade
+
+    return segments, pre
+
+
+def harmonic_distortion(
+    sweep,
+    recording,
+    fs: int,
+    f_start: float,
+    f_end: float,
+    duration: float,
+    max_order: int = 5,
+    f_max: float = 300.0,
+    points_per_octave: int = DEFAULT_POINTS_PER_OCTAVE,
+) -> HarmonicResult:
+    """
+    지수 스윕 측정에서 2~max_order차 고조파를 분리해 주파수별 THD를 계산한다.
+
+    한 번의 디컨볼루션으로 모든 차수의 임펄스 응답을 얻고,
+    (차수, 윈도우 길이) 배열을 한 번의 배치 rfft로 변환한다.
+    k차 고조파의 크기는 그 응답 스펙트럼을 k * f0에서 읽은 값이며,
+    정규화된 나눗셈으로 디컨볼루션했으므로 별도의 차수별 보정은 필요 없다.
+
+    Args:
+        sweep: generate_log_sweep으로 만든 재생 신호
+        recording: 1채널 녹음 데이터
+        fs: 샘플레이트
+        f_start, f_end, duration: 스윕 설정값
+        max_order: 계산할 최대 고조파 차수
+        f_max: 결과를 낼 기본파 주파수 상한 (Hz)
+        points_per_octave: 결과 로그 그리드 해상도
+
+    Returns:
+        다음 키를 가진 dict
+        - freqs: 기본파 주파수 배열 (Hz, 표준 로그 그리드 중 [f_start, f_max])
+        - fundamental_db: 기본파 응답 크기 (dB)
+        - harmonics_db: (max_order - 1, len(freqs)) 2차~ 고조파 크기 (dB)
+          스윕 범위를 벗어나는 k * f0 위치는 NaN
+        - thd_percent: 주파수별 THD (%)
+    """
+    rate = sweep_rate(f_start, f_end, duration)
+    ir = deconvolve_sweep(sweep, recording)
+    segments, _ = extract_harmonic_irs(ir, fs, rate, max_order=max_order)
+
+    win_len = segments.shape[1]
+    spectra = np.abs(np.fft.rfft(segments, axis=1))
+    bin_freqs = np.fft.rfftfreq(win_len, d=1.0 / fs)
+
+    grid = log_frequency_grid(points_per_octave=points_per_octave)
+    freqs = grid[(grid >= f_start) & (grid <= min(f_max, f_end))]
+
+    orders = np.arange(1, segments.shape[0] + 1)[:, np.newaxis]
+    eval_freqs = orders * freqs
+    mags = np.stack(
+        [np.interp(eval_freqs[k], bin_freqs, spectra[k]) for k in range(orders.size)]
+    )
+    mags[eval_freqs > f_end] = np.nan
+
+    fundamental = np.maximum(mags[0], 1e-12)
+    harmonics = mags[1:]
+    harmonic_power = np.nansum(harmonics**2, axis=0)
+    thd = 100.0 * np.sqrt(harmonic_power) / fundamental
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        harmonics_db = 20.0 * np.log10(np.maximum(harmonics, 1e-12))
+
+    return {
+        "freqs": freqs,
+        "fundamental_db": (20.0 * np.log10(fundamental)).astype(np.float32),
+        "harmonics_db": harmonics_db.astype(np.float32),
+        "thd_percent": thd.astype(np.float32),
+    }
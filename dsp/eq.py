@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+
+EqFilter = Dict[str, Any]
+
+_FILTER_LINE = re.compile(
+    r"Peaking,\s*([-+]?\d+(?:\.\d+)?)\s*Hz,\s*([-+]?\d+(?:\.\d+)?)\s*dB,\s*Q\s*=\s*(\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+
+
+def suggest_peaking_filters(
+    booming_bands,
+    max_cut_db: float = 8.0,
+    q_min: float = 0.3,
+    q_max: float = 10.0,
+) -> List[EqFilter]:
+    """
+    부밍 대역마다 감쇄용 피킹 필터 하나를 추천한다.
+
+    Returns:
+        [{"type": "peaking", "freq": Hz, "gain_db": dB(음수), "q": Q}, ...]
+    """
+    filters = []
+    for band in booming_bands:
+        peak_freq = band["peak_freq"]
+        peak_gain = band["peak_gain_db"]
+
+        bandwidth = max(band["f_end"] - band["f_start"], 1.0)
+        Q = peak_freq / (bandwidth * 2.0)
+        Q = max(q_min, min(Q, q_max))
+
+        gain_cut = -min(peak_gain, max_cut_db)  # 너무 과하지 않게 최대 -8dB까지
+
+        filters.append({"type": "peaking", "freq": peak_freq, "gain_db": gain_cut, "q": Q})
+
+    return filters
+
+
+def format_filters(filters: List[EqFilter]) -> str:
+    """ResultPage에 표시하는 'Filter 1: Peaking, 70.0 Hz, -4.0 dB, Q=4.0' 형식 텍스트."""
+    return "\n".join(
+        f"Filter {i}: Peaking, {f['freq']:.1f} Hz, {f['gain_db']:.1f} dB, Q={f['q']:.1f}"
+        for i, f in enumerate(filters, start=1)
+    )
+
+
+def parse_eq_text(text: str) -> List[EqFilter]:
+    """format_filters() 형식의 텍스트에서 피킹 필터 목록을 읽는다. 형식이 맞지 않는 줄은 무시한다."""
+    filters = []
+    for match in _FILTER_LINE.finditer(text or ""):
+        freq, gain_db, q = (float(v) for v in match.groups())
+        if freq > 0 and q > 0:
+            filters.append({"type": "peaking", "freq": freq, "gain_db": gain_db, "q": q})
+    return filters
+
+
+def peaking_sos(freq: float, gain_db: float, q: float, fs: float) -> np.ndarray:
+    """
+    RBJ Audio EQ Cookbook 피킹 필터를 SOS 한 줄 [b0, b1, b2, 1, a1, a2]로 만든다.
+    """
+    A = 10.0 ** (gain_db / 40.0)
+    w0 = 2.0 * np.pi * freq / fs
+    alpha = np.sin(w0) / (2.0 * q)
+    cos_w0 = np.cos(w0)
+
+    b = np.array([1.0 + alpha * A, -2.0 * cos_w0, 1.0 - alpha * A])
+    a = np.array([1.0 + alpha / A, -2.0 * cos_w0, 1.0 - alpha / A])
+    return np.concatenate([b / a[0], a / a[0]])
+
+
+def filters_to_sos(filters: List[EqFilter], fs: float) -> np.ndarray:
+    """필터 목록을 (섹션 수, 6) SOS 배열로 바꾼다. 나이퀴스트 이상 필터는 건너뛴다."""
+    rows = [
+        peaking_sos(f["freq"], f["gain_db"], f["q"], fs)
+        for f in filters
+        if 0 < f["freq"] < fs / 2
+    ]
+    if not rows:
+        return np.empty((0, 6))
+    return np.vstack(rows)
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from audio.wavfile import write_wav
+from dsp.analyzer import irfft_into, rfft_into
+from dsp.logspectrum import DEFAULT_POINTS_PER_OCTAVE
+
+
+def correction_curve_db(
+    freqs,
+    mag_db,
+    booming_bands: List[Dict[str, Any]],
+    max_cut_db: float = 8.0,
+    baseline_octaves: float = 1.0,
+    taper_octaves: float = 1.0 / 6.0,
+    points_per_octave: int = DEFAULT_POINTS_PER_OCTAVE,
+):
+    """
+    측정 응답과 부밍 대역에서 보정 목표 곡선(dB, 0 이하)을 만든다.
+
+    응답을 로그 주파수 그리드로 옮긴 뒤 baseline_octaves 폭의 이동 평균을 기준선으로 잡고,
+    부밍 대역 안에서만 기준선을 넘는 만큼(최대 max_cut_db) 깎는다.
+    대역 경계는 taper_octaves 폭의 raised-cosine으로 부드럽게 이어서 FIR이 짧게 수렴하게 한다.
+
+    Returns:
+        (grid, correction_db): 로그 주파수 그리드(Hz)와 같은 길이의 보정량(dB)
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mag_db = np.asarray(mag_db, dtype=np.float64)
+    valid = (freqs > 0) & np.isfinite(mag_db)
+    freqs, mag_db = freqs[valid], mag_db[valid]
+    if freqs.size < 2:
+        return freqs, np.zeros_like(freqs)
+
+    n_points = int(np.ceil(np.log2(freqs[-1] / freqs[0]) * points_per_octave)) + 1
+    grid = freqs[0] * 2.0 ** (np.arange(n_points) / points_per_octave)
+    log_grid = np.log2(grid)
+    level = np.interp(log_grid, np.log2(freqs), mag_db)
+
+    # 로그 축 이동 평균 (끝에서는 창을 잘라서 평균)
+    half = max(int(round(baseline_octaves * points_per_octave / 2)), 1)
+    csum = np.concatenate(([0.0], np.cumsum(level)))
+    idx = np.arange(n_points)
+    lo = np.clip(idx - half, 0, n_points)
+    hi = np.clip(idx + half + 1, 0, n_points)
+    baseline = (csum[hi] - csum[lo]) / (hi - lo)
+
+    excess = np.clip(level - baseline, 0.0, max_cut_db)
+
+    weight = np.zeros(n_points)
+    for band in booming_bands:
+        start = np.log2(max(band["f_start"], 1e-3))
+        end = np.log2(max(band["f_end"], band["f_start"], 1e-3))
+        # 대역 안은 1, 바깥 taper_octaves 안에서는 cos²로 0까지 줄인다.
+        dist = np.maximum(start - log_grid, log_grid - end)
+        w = np.where(
+            dist <= 0,
+            1.0,
+            np.cos(0.5 * np.pi * np.clip(dist / taper_octaves, 0.0, 1.0)) ** 2,
+        )
+        np.maximum(weight, w, out=weight)
+
+    return grid, -excess * weight
+
+
+def _magnitude_on_bins(grid, correction_db, n_fft: int, fs: float) -> np.ndarray:
+    """로그 그리드 보정 곡선을 rfft bin 선형 크기로 옮긴다. 그리드 밖은 0 dB."""
+    bins = np.fft.rfftfreq(n_fft, 1.0 / fs)
+    db = np.zeros_like(bins)
+    if len(grid) >= 2:
+        inside = (bins >= grid[0]) & (bins <= grid[-1])
+        db[inside] = np.interp(np.log2(bins[inside]), np.log2(grid), correction_db)
+    return 10.0 ** (db / 20.0)
+
+
+def minimum_phase_spectrum(magnitude: np.ndarray) -> np.ndarray:
+    """
+    rfft bin 크기(길이 n_fft/2 + 1)에서 실수 켑스트럼으로 최소 위상 스펙트럼을 만든다.
+    """
+    n_fft = 2 * (magnitude.size - 1)
+    log_mag = np.log(np.maximum(magnitude, 1e-8))
+    cep = np.fft.irfft(log_mag, n_fft)
+
+    # 켑스트럼을 인과 쪽으로 접는다: c[0], 2 c[1..N/2-1], c[N/2], 나머지 0
+    folded = np.zeros(n_fft)
+    folded[0] = cep[0]
+    folded[1 : n_fft // 2] = 2.0 * cep[1 : n_fft // 2]
+    folded[n_fft // 2] = cep[n_fft // 2]
+    return np.exp(np.fft.rfft(folded))
+
+
+def design_correction_fir(
+    freqs,
+    mag_db,
+    booming_bands: List[Dict[str, Any]],
+    fs: int = 48_000,
+    n_taps: int = 16_384,
+    phase: str = "minimum",
+    transition_hz: float = 200.0,
+    max_cut_db: float = 8.0,
+    oversample: int = 4,
+) -> np.ndarray:
+    """
+    측정 응답과 부밍 대역으로 룸 보정 FIR을 설계한다.
+
+    Args:
+        freqs, mag_db: 측정 주파수 응답 (analyze_measurement의 freqs / mag_db 등)
+        booming_bands: detect_booming_bands 결과
+        fs: 샘플레이트
+        n_taps: FIR 길이
+        phase: "minimum" — 전체를 최소 위상으로 (지연 없음)
+               "mixed"   — transition_hz 아래는 최소 위상, 위는 선형 위상 (n_taps // 2 지연)
+        transition_hz: mixed 모드의 최소/선형 위상 전환 주파수
+        max_cut_db: 최대 감쇄량
+        oversample: 켑스트럼 계산용 FFT 길이 배수 (시간 영역 앨리어싱 억제)
+
+    Returns:
+        (n_taps,) float32 임펄스 응답
+    """
+    if phase not in ("minimum", "mixed"):
+        raise ValueError(f"알 수 없는 위상 모드입니다: {phase}")
+
+    grid, correction_db = correction_curve_db(freqs, mag_db, booming_bands, max_cut_db=max_cut_db)
+    n_fft = int(n_taps) * max(int(oversample), 1)
+    bins = np.fft.rfftfreq(n_fft, 1.0 / fs)
+
+    if phase == "minimum":
+        spectrum = minimum_phase_spectrum(_magnitude_on_bins(grid, correction_db, n_fft, fs))
+        delay = 0
+    else:
+        # 보정 곡선을 전환 주파수 근처(1/2 옥타브)에서 cos²로 나눠 저역/고역 두 필터로 만든다.
+        split = np.zeros_like(grid)
+        if len(grid):
+            x = np.clip(np.log2(grid / transition_hz) + 0.5, 0.0, 1.0)
+            split = np.cos(0.5 * np.pi * x) ** 2
+        low = minimum_phase_spectrum(_magnitude_on_bins(grid, correction_db * split, n_fft, fs))
+        high = _magnitude_on_bins(grid, correction_db * (1.0 - split), n_fft, fs)
+        delay = int(n_taps) // 2
+        spectrum = low * high * np.exp(-2j * np.pi * bins * delay / fs)
+
+    h = np.fft.irfft(spectrum, n_fft)[: int(n_taps)]
+
+    # 끝부분을 부드럽게 잘라 절단으로 생기는 리플을 줄인다.
+    fade = max((int(n_taps) - delay) // 8, 1)
+    h[-fade:] *= 0.5 * (1.0 + np.cos(np.pi * (np.arange(fade) + 1) / fade))
+    return h.astype(np.float32)
+
+
+def export_fir_wav(path, fir, fs: int) -> None:
+    """FIR 계수를 32bit float WAV로 저장한다 (컨볼루션 플러그인/DSP에 바로 불러올 수 있는 형식)."""
+    write_wav(path, fir, fs)
+
+
+class UniformPartitionedConvolver:
+    """
+    긴 FIR을 작은 블록 지연으로 실시간 적용하는 균일 분할 overlap-save 컨볼루션 엔진.
+
+    - FIR을 blocksize 길이 P개 조각으로 나눠 각 조각의 2B점 스펙트럼을 미리 계산한다.
+    - 입력 블록 스펙트럼은 주파수 영역 지연선(FDL)에 쌓고, 블록마다
+      Y = Σ_p X[n-p] · H[p] 를 한 번의 곱셈 + 합으로 구한 뒤 역 FFT 한 번으로 출력한다.
+    - FDL은 길이 2P로 두 번 써 두는 링 버퍼라 최신 → 과거 순서의 연속 뷰를 복사 없이 얻는다.
+    - 지연은 blocksize 샘플 하나뿐이고, process()는 미리 할당한 버퍼만 사용한다.
+
+    Args:
+        fir: (n_taps,) 또는 (n_taps, channels) FIR 계수. 1차원이면 모든 채널에 같은 FIR을 쓴다.
+        blocksize: 블록 크기 B
+        channels: 채널 수
+    """
+
+    def __init__(self, fir, blocksize: int = 256, channels: int = 1):
+        fir = np.asarray(fir, dtype=np.float32)
+        if fir.ndim == 1:
+            fir = fir[:, np.newaxis]
+        if fir.shape[1] not in (1, channels):
+            raise ValueError("FIR 채널 수가 channels와 맞지 않습니다.")
+
+        B = int(blocksize)
+        self.blocksize = B
+        self.channels = int(channels)
+        n_taps = fir.shape[0]
+        P = max(-(-n_taps // B), 1)
+        self.partitions = P
+
+        # 조각 p: fir[p*B:(p+1)*B]를 2B점으로 0 채움 → (P, FIR 채널, B+1)
+        padded = np.zeros((P, 2 * B, fir.shape[1]), dtype=np.float32)
+        blocks = np.zeros((P * B, fir.shape[1]), dtype=np.float32)
+        blocks[:n_taps] = fir
+        padded[:, :B] = blocks.reshape(P, B, -1)
+        self._H = np.fft.rfft(padded, axis=1).transpose(0, 2, 1).astype(np.complex64)
+
+        C = self.channels
+        self._fdl = np.zeros((2 * P, C, B + 1), dtype=np.complex64)
+        self._head = 0
+        self._buf = np.zeros((C, 2 * B), dtype=np.float32)
+        self._spec = np.zeros((C, B + 1), dtype=np.complex64)
+        self._prod = np.zeros((P, C, B + 1), dtype=np.complex64)
+        self._acc = np.zeros((C, B + 1), dtype=np.complex64)
+        self._time = np.zeros((C, 2 * B), dtype=np.float32)
+
+    def reset(self) -> None:
+        self._fdl.fill(0)
+        self._buf.fill(0)
+        self._head = 0
+
+    def process(self, x, out=None) -> np.ndarray:
+        """
+        (blocksize, channels) float32 블록 하나를 컨볼루션한다.
+
+        Args:
+            x: 입력 블록
+            out: 결과를 쓸 배열 (x와 같은 모양). 생략하면 x를 제자리에서 덮어쓴다.
+        """
+        B, P = self.blocksize, self.partitions
+        if out is None:
+            out = x
+
+        # 입력 버퍼를 한 블록 밀고 새 블록을 뒤에 넣는다 (overlap-save)
+        buf = self._buf
+        buf[:, :B] = buf[:, B:]
+        buf[:, B:] = x.T
+
+        # 새 스펙트럼을 FDL 맨 앞(head)과 그 거울 위치(head + P)에 쓴다.
+        self._head = (self._head - 1) % P
+        head = self._head
+        rfft_into(buf, self._spec)
+        self._fdl[head] = self._spec
+        self._fdl[head + P] = self._spec
+
+        # fdl[head : head + P]는 최신(p=0)부터 과거 순서
+        np.multiply(self._fdl[head : head + P], self._H, out=self._prod)
+        np.sum(self._prod, axis=0, out=self._acc)
+
+        irfft_into(self._acc, 2 * B, self._time)
+
+        # 앞쪽 B개는 순환 앨리어싱이 섞인 부분이라 버리고 뒤쪽 B개만 쓴다.
+        out[:] = self._time[:, B:].T
+        return out
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import struct
+from functools import lru_cache
+from typing import Any, Dict
+
+import numpy as np
+
+DEFAULT_F_MIN = 10.0
+DEFAULT_F_MAX = 1000.0
+DEFAULT_POINTS_PER_OCTAVE = 96
+
+# magic(4) / version(1) / reserved(1) / points_per_octave(2) / f_min(4) / f_max(4) / n(4)
+_HEADER = struct.Struct("<4sBBHffI")
+_MAGIC = b"BSLS"
+_VERSION = 1
+
+
+@lru_cache(maxsize=16)
+def _cached_grid(f_min: float, f_max: float, points_per_octave: int) -> np.ndarray:
+    n = int(np.floor(points_per_octave * np.log2(f_max / f_min) + 1e-9)) + 1
+    grid = f_min * 2.0 ** (np.arange(n) / points_per_octave)
+    grid.setflags(write=False)
+    return grid
+
+
+def log_frequency_grid(
+    f_min: float = DEFAULT_F_MIN,
+    f_max: float = DEFAULT_F_MAX,
+    points_per_octave: int = DEFAULT_POINTS_PER_OCTAVE,
+) -> np.ndarray:
+    """
+    f_min부터 1/points_per_octave 옥타브 간격의 고정 로그 주파수 그리드를 반환한다.
+    (기본값: 10Hz~1kHz, 1/96 옥타브 → 638개 점, 읽기 전용 캐시)
+    """
+    if f_min <= 0 or f_max <= f_min:
+        raise ValueError("0 < f_min < f_max 이어야 합니다.")
+    return _cached_grid(float(np.float32(f_min)), float(np.float32(f_max)), int(points_per_octave))
+
+
+def resample_to_log_grid(freqs, mag_db, grid, points_per_octave: int) -> np.ndarray:
+    """
+    선형 bin 주파수 응답을 로그 그리드로 옮긴다.
+
+    각 그리드 점 f_k에 대해 [f_k / 2^(1/(2N)), f_k * 2^(1/(2N))] 구간에 들어가는
+    bin들의 dB 평균을 구한다(N = points_per_octave). 구간에 bin이 하나도 없는
+    저역에서는 로그 주파수 축 선형 보간으로 채우고, 측정 범위 밖은 NaN으로 둔다.
+
+    Args:
+        freqs: 오름차순 주파수 배열 (Hz)
+        mag_db: (..., len(freqs)) dB 배열. 여러 곡선을 한 번에 넘길 수 있다.
+        grid: 로그 주파수 그리드 (Hz)
+
+    Returns:
+        (..., len(grid)) float32 배열
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mag_db = np.asarray(mag_db, dtype=np.float64)
+    grid = np.asarray(grid, dtype=np.float64)
+
+    out_shape = mag_db.shape[:-1] + grid.shape
+    if freqs.size == 0:
+        return np.full(out_shape, np.nan, dtype=np.float32)
+
+    half_band = 2.0 ** (1.0 / (2.0 * points_per_octave))
+    lo = np.searchsorted(freqs, grid / half_band, side="left")
+    hi = np.searchsorted(freqs, grid * half_band, side="right")
+    count = hi - lo
+
+    csum = np.concatenate(
+        [np.zeros(mag_db.shape[:-1] + (1,)), np.cumsum(mag_db, axis=-1)], axis=-1
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (csum[..., hi] - csum[..., lo]) / count
+
+    empty = count == 0
+    if np.any(empty):
+        log_f = np.log(np.maximum(freqs, 1e-12))
+        log_g = np.log(grid[empty])
+        flat = mag_db.reshape(-1, freqs.size)
+        filled = np.stack([np.interp(log_g, log_f, row) for row in flat])
+        out[..., empty] = filled.reshape(mag_db.shape[:-1] + (log_g.size,))
+
+    outside = (grid < freqs[0]) | (grid > freqs[-1])
+    out[..., outside] = np.nan
+
+    return out.astype(np.float32)
+
+
+class LogSpectrum:
+    """
+    고정 로그 주파수 그리드 위의 주파수 응답(dB).
+
+    측정 길이/샘플레이트와 상관없이 같은 그리드를 쓰므로 보간 없이 바로
+    비교/평균/저장할 수 있다. 값은 float32, 측정 범위 밖은 NaN.
+    to_bytes()는 16바이트 헤더 + float32 값 배열 형태의 압축된 표현을 만든다.
+    """
+
+    def __init__(
+        self,
+        values,
+        f_min: float = DEFAULT_F_MIN,
+        f_max: float = DEFAULT_F_MAX,
+        points_per_octave: int = DEFAULT_POINTS_PER_OCTAVE,
+    ):
+        self.f_min = float(np.float32(f_min))
+        self.f_max = float(np.float32(f_max))
+        self.points_per_octave = int(points_per_octave)
+        self.values = np.asarray(values, dtype=np.float32)
+
+        if self.values.shape != self.freqs.shape:
+            raise ValueError(
+                f"값 개수({self.values.size})가 그리드 크기({self.freqs.size})와 다릅니다."
+            )
+
+    @property
+    def freqs(self) -> np.ndarray:
+        return log_frequency_grid(self.f_min, self.f_max, self.points_per_octave)
+
+    @classmethod
+    def from_linear(
+        cls,
+        freqs,
+        mag_db,
+        f_min: float = DEFAULT_F_MIN,
+        f_max: float = DEFAULT_F_MAX,
+        points_per_octave: int = DEFAULT_POINTS_PER_OCTAVE,
+    ) -> "LogSpectrum":
+        """compute_frequency_response / smooth_response 결과를 표준 그리드로 옮긴다."""
+        grid = log_frequency_grid(f_min, f_max, points_per_octave)
+        values = resample_to_log_grid(freqs, mag_db, grid, points_per_octave)
+        return cls(values, f_min, f_max, points_per_octave)
+
+    def to_linear(self, freqs) -> np.ndarray:
+        """임의의 주파수 배열로 (로그 주파수 축 선형 보간) 되돌린다. 범위 밖은 NaN."""
+        freqs = np.asarray(freqs, dtype=np.float64)
+        grid, values = self.as_arrays()
+        if grid.size == 0:
+            return np.full(freqs.shape, np.nan)
+
+        out = np.interp(np.log(np.maximum(freqs, 1e-12)), np.log(grid), values)
+        out[(freqs < grid[0]) | (freqs > grid[-1])] = np.nan
+        return out
+
+    def as_arrays(self):
+        """NaN이 아닌 점만 골라 (freqs, mag_db) 배열로 반환한다."""
+        valid = np.isfinite(self.values)
+        return self.freqs[valid], self.values[valid]
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, 0, self.points_per_octave, self.f_min, self.f_max, self.values.size
+        )
+        return header + self.values.astype("<f4").tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LogSpectrum":
+        magic, version, _, ppo, f_min, f_max, n = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("LogSpectrum 형식이 아닙니다.")
+        values = np.frombuffer(data, dtype="<f4", count=n, offset=_HEADER.size)
+        return cls(values.copy(), f_min, f_max, ppo)
+
+    def _aligned(self, target):
+        if isinstance(target, LogSpectrum):
+            if (target.f_min, target.f_max, target.points_per_octave) == (
+                self.f_min,
+                self.f_max,
+                self.points_per_octave,
+            ):
+                return target.values.astype(np.float64)
+            return target.to_linear(self.freqs)
+
+        target_freqs, target_db = target
+        target_freqs = np.asarray(target_freqs, dtype=np.float64)
+        target_db = np.asarray(target_db, dtype=np.float64)
+        order = np.argsort(target_freqs)
+        target_freqs = target_freqs[order]
+
+        values = np.interp(np.log(self.freqs), np.log(target_freqs), target_db[order])
+        values[(self.freqs < target_freqs[0]) | (self.freqs > target_freqs[-1])] = np.nan
+        return values
+
+    def compare(self, target, align_level: bool = True) -> Dict[str, Any]:
+        """
+        목표 곡선과 비교한다.
+
+        Args:
+            target: LogSpectrum 또는 (freqs, dB) 형태의 목표 곡선(하우스 커브 등).
+                (freqs, dB)는 몇 개의 꼭짓점만 있어도 되며 로그 주파수 축으로 보간한다.
+            align_level: True면 평균 레벨 차이를 먼저 제거하고 비교한다.
+
+        Returns:
+            다음 키를 가진 dict
+            - deviation_db: 그리드 점별 (측정 - 목표) dB 배열 (비교 불가 점은 NaN)
+            - offset_db: 제거한 평균 레벨 차이
+            - rms_db: 편차의 RMS
+            - max_db: 가장 크게 튀어 오른 편차
+            - min_db: 가장 크게 꺼진 편차
+        """
+        deviation = self.values.astype(np.float64) - self._aligned(target)
+        valid = np.isfinite(deviation)
+        if not np.any(valid):
+            return {
+                "deviation_db": deviation,
+                "offset_db": 0.0,
+                "rms_db": float("nan"),
+                "max_db": float("nan"),
+                "min_db": float("nan"),
+            }
+
+        offset = float(np.mean(deviation[valid])) if align_level else 0.0
+        deviation -= offset
+        d = deviation[valid]
+        return {
+            "deviation_db": deviation,
+            "offset_db": offset,
+            "rms_db": float(np.sqrt(np.mean(d * d))),
+            "max_db": float(np.max(d)),
+            "min_db": float(np.min(d)),
+        }
+
+    def distance(self, other: "LogSpectrum") -> float:
+        """평균 레벨을 맞춘 뒤의 RMS dB 차이. 두 곡선이 얼마나 다른지 빠르게 볼 때 쓴다."""
+        return self.compare(other, align_level=True)["rms_db"]
+
+
+def average_spectra(spectra) -> LogSpectrum:
+    """같은 그리드의 LogSpectrum 여러 개를 dB 평균한다(NaN은 제외)."""
+    spectra = list(spectra)
+    if not spectra:
+        raise ValueError("평균할 곡선이 없습니다.")
+
+    first = spectra[0]
+    stacked = np.vstack([s.values for s in spectra]).astype(np.float64)
+    valid = np.isfinite(stacked)
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, stacked, 0.0).sum(axis=0) / counts
+
+    return LogSpectrum(mean, first.f_min, first.f_max, first.points_per_octave)
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from audio.wavfile import iter_wav_blocks, read_wav_info
+from dsp.analyzer import (
+    AnalysisWorkspace,
+    detect_booming_bands,
+    rfft_into,
+    smooth_response,
+)
+
+LongTermResult = Dict[str, Any]
+
+
+class _SegmentAccumulator:
+    """
+    프레임별 파워를 segment_samples 길이 구간별 평균으로 모은다.
+    프레임은 시작 샘플 위치(프레임 번호 * hop)로 구간에 배정하므로
+    구간 시각은 hop 단위로 반올림되지 않고 k * segment_samples / fs가 된다.
+    """
+
+    def __init__(self, m: int, hop: int, segment_samples: int):
+        self.hop = hop
+        self.segment_samples = segment_samples
+        self.sum = np.zeros(m, dtype=np.float64)
+        self.frames = 0
+        self.index: Optional[int] = None
+        self.means: List[np.ndarray] = []
+        self.indices: List[int] = []
+
+    def copy(self) -> "_SegmentAccumulator":
+        other = _SegmentAccumulator(self.sum.size, self.hop, self.segment_samples)
+        other.sum[:] = self.sum
+        other.frames = self.frames
+        other.index = self.index
+        other.means = list(self.means)
+        other.indices = list(self.indices)
+        return other
+
+    def add(self, power: np.ndarray, first_frame: int) -> None:
+        if power.shape[0] == 0:
+            return
+        frame_index = np.arange(first_frame, first_frame + power.shape[0], dtype=np.int64)
+        segment = frame_index * self.hop // self.segment_samples
+        bounds = np.flatnonzero(np.diff(segment)) + 1
+
+        for rows, k in zip(np.split(power, bounds), segment[np.r_[0, bounds]]):
+            if k != self.index:
+                self.close()
+                self.index = int(k)
+            self.sum += rows.sum(axis=0, dtype=np.float64)
+            self.frames += rows.shape[0]
+
+    def close(self) -> None:
+        if self.frames > 0:
+            self.means.append((self.sum / self.frames).astype(np.float32))
+            self.indices.append(self.index)
+        self.sum[:] = 0.0
+        self.frames = 0
+        self.index = None
+
+
+class WelchAccumulator:
+    """
+    블록 단위로 들어오는 오디오에서 Welch 방식 평균 스펙트럼을 누적한다.
+
+    - nperseg 길이 프레임을 hop(= nperseg * (1 - overlap)) 간격으로 잘라
+      frames_per_batch개씩 한 번에 rfft한다.
+    - 입력 블록 크기와 상관없이 내부 버퍼 크기는 고정이라 메모리 사용량이 일정하다.
+    - max_hold=True면 프레임별 최대 파워도 함께 유지한다.
+    - segment_seconds를 지정하면 그 길이마다 구간 평균 스펙트럼을 따로 남긴다.
+    - result()는 상태를 바꾸지 않으므로 스트림 중간에 불러도 이후 누적에 영향이 없다.
+      입력이 끝나면 finish()로 남은 프레임과 마지막 구간을 확정한다.
+    """
+
+    def __init__(
+        self,
+        fs: int,
+        nperseg: int | None = None,
+        overlap: float = 0.5,
+        f_min: float = 20.0,
+        f_max: float = 1000.0,
+        max_hold: bool = False,
+        segment_seconds: float | None = None,
+        frames_per_batch: int = 8,
+    ):
+        if not 0.0 <= overlap < 1.0:
+            raise ValueError("overlap은 0 이상 1 미만이어야 합니다.")
+
+        self.fs = int(fs)
+        if nperseg is None:
+            # 1Hz보다 촘촘한 해상도가 나오는 2의 거듭제곱 길이
+            nperseg = 1 << int(np.ceil(np.log2(self.fs)))
+        self.nperseg = int(nperseg)
+        self.hop = max(int(round(self.nperseg * (1.0 - overlap))), 1)
+        self.max_hold = max_hold
+        self.frames_per_batch = max(int(frames_per_batch), 1)
+
+        self._workspace = AnalysisWorkspace(max_cached_lengths=1)
+        self._window = self._workspace.window(self.nperseg)
+        self._start, self._stop, self.freqs = self._workspace.band(
+            self.nperseg, self.fs, f_min, f_max
+        )
+
+        # 밀도(PSD) 스케일: 단측 스펙트럼이므로 2배, 윈도우 에너지로 정규화
+        self._scale = 2.0 / (self.fs * float(np.sum(self._window.astype(np.float64) ** 2)))
+
+        m = self._stop - self._start
+        capacity = (self.frames_per_batch - 1) * self.hop + self.nperseg
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._fill = 0
+        self._frames = np.empty((self.frames_per_batch, self.nperseg), dtype=np.float32)
+        self._spec = np.empty(
+            (self.frames_per_batch, self.nperseg // 2 + 1), dtype=np.complex64
+        )
+        self._power = np.empty((self.frames_per_batch, m), dtype=np.float32)
+
+        self._sum = np.zeros(m, dtype=np.float64)
+        self._max = np.zeros(m, dtype=np.float32) if max_hold else None
+        self.n_frames = 0
+        self.n_samples = 0
+
+        if segment_seconds is not None:
+            self._segments = _SegmentAccumulator(
+                m, self.hop, max(int(round(segment_seconds * self.fs)), 1)
+            )
+        else:
+            self._segments = None
+
+    def update(self, block) -> None:
+        """새 오디오 블록(1채널)을 누적한다. 블록 크기는 자유롭다."""
+        x = np.asarray(block, dtype=np.float32).reshape(-1)
+        self.n_samples += x.size
+
+        pos = 0
+        while pos < x.size:
+            take = min(self._buf.size - self._fill, x.size - pos)
+            self._buf[self._fill : self._fill + take] = x[pos : pos + take]
+            self._fill += take
+            pos += take
+
+            if self._fill == self._buf.size:
+                self._process(self.frames_per_batch)
+
+    def _frame_power(self, n_frames: int) -> np.ndarray:
+        """버퍼 앞쪽 n_frames개 프레임의 대역 파워 (작업 버퍼의 view, 상태는 바꾸지 않음)."""
+        frames = self._frames[:n_frames]
+        strided = np.lib.stride_tricks.sliding_window_view(self._buf, self.nperseg)
+        np.multiply(strided[: n_frames * self.hop : self.hop], self._window, out=frames)
+
+        spec = self._spec[:n_frames]
+        rfft_into(frames, spec, axis=1)
+
+        power = self._power[:n_frames]
+        np.abs(spec[:, self._start : self._stop], out=power)
+        np.square(power, out=power)
+        power *= self._scale
+        return power
+
+    def _pending_frames(self) -> int:
+        """버퍼에 남은 샘플로 만들 수 있는 완전한 프레임 수."""
+        if self._fill < self.nperseg:
+            return 0
+        return (self._fill - self.nperseg) // self.hop + 1
+
+    def _process(self, n_frames: int) -> None:
+        power = self._frame_power(n_frames)
+
+        self._sum += power.sum(axis=0, dtype=np.float64)
+        if self._max is not None:
+            np.maximum(self._max, power.max(axis=0), out=self._max)
+        if self._segments is not None:
+            self._segments.add(power, self.n_frames)
+        self.n_frames += n_frames
+
+        # 다음 배치의 첫 프레임은 n_frames * hop 위치에서 시작한다.
+        consumed = n_frames * self.hop
+        remain = self._fill - consumed
+        self._buf[:remain] = self._buf[consumed : self._fill]
+        self._fill = remain
+
+    def finish(self) -> None:
+        """
+        입력이 끝났을 때 호출한다. 버퍼에 남은 완전한 프레임을 처리하고 마지막 구간을 닫는다.
+        """
+        pending = self._pending_frames()
+        if pending:
+            self._process(pending)
+        if self._segments is not None:
+            self._segments.close()
+
+    def result(self) -> Optional[LongTermResult]:
+        """
+        지금까지 누적한 결과를 반환한다. 한 프레임도 채우지 못했다면 None.
+
+        버퍼에 남은 완전한 프레임과 아직 열려 있는 구간까지 포함해 계산하지만
+        누적 상태는 바꾸지 않는다. (finish() 후 result()와 같은 값)
+
+        Returns:
+            다음 키를 가진 dict
+            - freqs: 주파수 배열 (Hz)
+            - mag_db: Welch 평균 스펙트럼 (dB re 1/Hz, float32)
+            - max_hold_db: 프레임별 최대값 스펙트럼 (max_hold=False면 None)
+            - segment_times: 각 구간의 시작 시각 (초, segment_seconds의 배수)
+            - segment_db: (구간 수, 주파수 수) 구간 평균 스펙트럼 (dB)
+            - fs, n_samples, n_frames
+        """
+        pending = self._pending_frames()
+        n_frames = self.n_frames + pending
+        if n_frames == 0:
+            return None
+
+        power = self._frame_power(pending)
+        total = self._sum + power.sum(axis=0, dtype=np.float64)
+        mag_db = _power_to_db(total / n_frames)
+
+        max_hold_db = None
+        if self._max is not None:
+            peak = np.maximum(self._max, power.max(axis=0)) if pending else self._max
+            max_hold_db = _power_to_db(peak)
+
+        segment_db = np.empty((0, self.freqs.size), dtype=np.float32)
+        segment_times = np.empty(0, dtype=np.float64)
+        if self._segments is not None:
+            segments = self._segments.copy()
+            segments.add(power, self.n_frames)
+            segments.close()
+            if segments.means:
+                segment_db = _power_to_db(np.vstack(segments.means))
+                segment_times = (
+                    np.asarray(segments.indices, dtype=np.float64)
+                    * segments.segment_samples
+                    / self.fs
+                )
+
+        return {
+            "freqs": np.array(self.freqs),
+            "mag_db": mag_db,
+            "max_hold_db": max_hold_db,
+            "segment_times": segment_times,
+            "segment_db": segment_db,
+            "fs": self.fs,
+            "n_samples": self.n_samples,
+            "n_frames": n_frames,
+        }
+
+
+def _power_to_db(power) -> np.ndarray:
+    p = np.maximum(np.asarray(power, dtype=np.float64), 1e-24)
+    return (10.0 * np.log10(p)).astype(np.float32)
+
+
+def _iter_blocks(source, block_size: int, channel: int) -> Iterator[np.ndarray]:
+    if isinstance(source, np.ndarray):
+        data = source if source.ndim == 1 else source[:, channel]
+        for i in range(0, data.shape[0], block_size):
+            yield data[i : i + block_size]
+    else:
+        for block in source:
+            block = np.asarray(block)
+            yield block if block.ndim == 1 else block[:, channel]
+
+
+def analyze_long_recording(
+    source,
+    fs: int | None = None,
+    nperseg: int | None = None,
+    overlap: float = 0.5,
+    f_min: float = 20.0,
+    f_max: float = 1000.0,
+    max_hold: bool = False,
+    segment_seconds: float | None = None,
+    block_size: int = 1 << 16,
+    channel: int = 0,
+) -> Optional[LongTermResult]:
+    """
+    수 시간 길이의 녹음을 메모리에 통째로 올리지 않고 블록 단위로 분석한다.
+
+    Args:
+        source: 다음 중 하나
+            - WAV 파일 경로 (memmap으로 읽음, fs는 헤더에서 가져옴)
+            - .npy 파일 경로 (mmap_mode='r'로 읽음)
+            - numpy 배열 / np.memmap (1채널 또는 (샘플 수, 채널 수))
+            - 오디오 블록을 내보내는 iterable
+        fs: 샘플레이트 (WAV 파일이 아니면 필수)
+        nperseg: Welch 프레임 길이 (기본: fs 이상인 2의 거듭제곱)
+        overlap: 프레임 겹침 비율
+        f_min, f_max: 결과에 남길 주파수 대역 (Hz)
+        max_hold: 최대값 유지 스펙트럼을 함께 계산할지 여부
+        segment_seconds: 지정하면 이 길이마다 구간 평균 스펙트럼을 남긴다.
+        block_size: 한 번에 읽을 샘플 수
+        channel: 다채널 입력에서 분석할 채널
+
+    Returns:
+        WelchAccumulator.result()와 같은 dict. 분석할 샘플이 부족하면 None.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if path.lower().endswith(".npy"):
+            source = np.load(path, mmap_mode="r")
+        else:
+            fs = read_wav_info(path)["fs"]
+            source = iter_wav_blocks(path, block_size=block_size, channel=channel)
+
+    if fs is None:
+        raise ValueError("WAV 파일이 아닌 입력은 fs를 지정해야 합니다.")
+
+    acc = WelchAccumulator(
+        fs,
+        nperseg=nperseg,
+        overlap=overlap,
+        f_min=f_min,
+        f_max=f_max,
+        max_hold=max_hold,
+        segment_seconds=segment_seconds,
+    )
+    for block in _iter_blocks(source, block_size, channel):
+        acc.update(block)
+
+    acc.finish()
+    return acc.result()
+
+
+def booming_bands_over_time(
+    result: LongTermResult,
+    window_size: int = 24,
+    threshold_db: float = 5.0,
+    min_bandwidth_hz: float = 5.0,
+) -> List[Dict[str, Any]]:
+    """
+    analyze_long_recording(segment_seconds=...) 결과의 구간별 스펙트럼에
+    smooth_response + detect_booming_bands를 적용해 시간에 따른 부밍 변화를 본다.
+
+    Returns:
+        [{"time": 구간 시작 시각(초), "bands": detect_booming_bands 결과}, ...]
+    """
+    timeline = []
+    for t, mag_db in zip(result["segment_times"], result["segment_db"]):
+        freqs_s, mag_db_smooth = smooth_response(
+            result["freqs"], mag_db, window_size=window_size
+        )
+        bands = detect_booming_bands(
+            freqs_s,
+            mag_db_smooth,
+            threshold_db=threshold_db,
+            min_bandwidth_hz=min_bandwidth_hz,
+        )
+        timeline.append({"time": float(t), "bands": bands})
+
+    return timeline
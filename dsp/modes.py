@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from dsp.deconvolution import deconvolve_sweep
+
+RoomMode = Dict[str, Any]
+
+
+def _solve_columns(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """열 크기를 맞춘 뒤 복소 최소제곱을 푼다 (조건수 개선용)."""
+    scale = np.linalg.norm(A, axis=0)
+    scale[scale == 0] = 1.0
+    x = np.linalg.lstsq(A / scale, b, rcond=None)[0]
+    return x / scale
+
+
+def vector_fit(
+    freqs,
+    H,
+    poles,
+    n_iter: int = 8,
+    weight=None,
+):
+    """
+    복소 전달함수 H(f)를 유리함수로 근사한다 (Vector Fitting, 극점 재배치 반복).
+
+        H(s) ≈ Σ_k r_k / (s - a_k) + d + e·s,   s = j2πf
+
+    매 반복마다 모든 후보 극점에 대한 기저 1/(s - a_k)를 (주파수 수, 극점 수) 행렬로
+    한 번에 만들고, σ(s)H(s) ≈ p(s) 선형 최소제곱 한 번으로 σ의 영점(새 극점)을 구한다.
+    불안정한 극점(실수부 > 0)은 허수축에 대해 뒤집는다.
+
+    Args:
+        freqs: 주파수 (Hz)
+        H: freqs에서의 복소 응답
+        poles: 초기 극점 (rad/s, 복소)
+        n_iter: 극점 재배치 반복 횟수
+        weight: 주파수별 최소제곱 가중치 (생략하면 1)
+
+    Returns:
+        (poles, residues, d, e)
+    """
+    s = 2j * np.pi * np.asarray(freqs, dtype=np.float64)
+    H = np.asarray(H, dtype=np.complex128)
+    a = np.asarray(poles, dtype=np.complex128).copy()
+    w = np.ones(s.size) if weight is None else np.asarray(weight, dtype=np.float64)
+    N = a.size
+    ones = np.ones((s.size, 1), dtype=np.complex128)
+
+    for _ in range(n_iter):
+        Phi = 1.0 / (s[:, np.newaxis] - a[np.newaxis, :])
+        A = np.hstack([Phi, ones, s[:, np.newaxis], -H[:, np.newaxis] * Phi])
+        x = _solve_columns(A * w[:, np.newaxis], H * w)
+        c_sigma = x[N + 2 :]
+
+        # σ(s) = 1 + Σ c̃_k/(s - a_k)의 영점 = eig(diag(a) - 1·c̃ᵀ)
+        a = np.linalg.eigvals(np.diag(a) - np.outer(np.ones(N), c_sigma))
+        a = -np.abs(a.real) + 1j * a.imag
+
+    Phi = 1.0 / (s[:, np.newaxis] - a[np.newaxis, :])
+    A = np.hstack([Phi, ones, s[:, np.newaxis]])
+    x = _solve_columns(A * w[:, np.newaxis], H * w)
+    return a, x[:N], x[N], x[N + 1]
+
+
+def transfer_function_from_sweep(
+    sweep,
+    recording,
+    fs: int,
+    f_min: float = 20.0,
+    f_max: float = 300.0,
+    ir_seconds: float = 2.0,
+    pre_seconds: float = 0.001,
+):
+    """
+    스윕 디컨볼루션으로 [f_min, f_max] 구간의 복소 전달함수를 구한다.
+
+    임펄스 응답의 직접음 피크 pre_seconds 앞에서 잘라 시스템 지연을 제거하고,
+    ir_seconds 길이 끝부분 10%를 반쪽 Hann으로 줄인 뒤 FFT한다.
+
+    Returns:
+        (freqs, H)
+    """
+    ir = deconvolve_sweep(sweep, recording)
+    n = ir.size
+    peak = int(np.argmax(np.abs(ir[: n // 2])))
+    start = max(peak - int(pre_seconds * fs), 0)
+
+    length = min(int(ir_seconds * fs), n - start)
+    seg = ir[start : start + length].astype(np.float64)
+    tail = max(length // 10, 1)
+    seg[-tail:] *= np.hanning(2 * tail)[tail:]
+
+    spectrum = np.fft.rfft(seg)
+    freqs = np.fft.rfftfreq(length, 1.0 / fs)
+    band = (freqs >= f_min) & (freqs <= f_max)
+    return freqs[band], spectrum[band]
+
+
+def fit_room_modes(
+    freqs,
+    H,
+    n_modes: int = 10,
+    f_min: Optional[float] = None,
+    f_max: Optional[float] = None,
+    n_iter: int = 8,
+    oversample: float = 2.0,
+) -> List[RoomMode]:
+    """
+    복소 전달함수에 감쇠 공진(룸 모드)의 합을 맞춰 모드 파라미터를 구한다.
+
+    n_modes * oversample개의 후보 극점을 [f_min, f_max]에 로그 간격으로 깔고
+    vector_fit으로 한꺼번에 재배치한 뒤, 범위 안에서 기여(피크 크기)가 큰 n_modes개를 고른다.
+
+    극점 p = -σ + jω_d 에서
+        freq = |p| / 2π,  Q = |p| / 2σ,  T60 = 6.91 / σ (= ln(1000) / σ)
+    잔차 r에 대해 amplitude = |r| / σ는 공진 주파수에서 모드 하나가 만드는 응답 크기다.
+
+    Returns:
+        주파수 오름차순 모드 목록
+        [{"freq": Hz, "q": Q, "t60": 초, "sigma": 1/s, "amplitude": 선형 크기,
+          "amplitude_db": 대역 내 평균 크기 대비 dB}, ...]
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    H = np.asarray(H, dtype=np.complex128)
+    if freqs.size < 4 or n_modes <= 0:
+        return []
+
+    f_lo = freqs[0] if f_min is None else f_min
+    f_hi = freqs[-1] if f_max is None else f_max
+
+    n_poles = max(int(round(n_modes * oversample)), 1)
+    w0 = 2.0 * np.pi * np.geomspace(max(f_lo, 1e-3), f_hi, n_poles)
+    initial = -w0 / 100.0 + 1j * w0
+
+    poles, residues, _, _ = vector_fit(freqs, H, initial, n_iter=n_iter)
+
+    sigma = -poles.real
+    mag = np.abs(poles)
+    mode_freq = mag / (2.0 * np.pi)
+    keep = (poles.imag > 0) & (sigma > 0) & (mode_freq >= f_lo) & (mode_freq <= f_hi)
+    if not np.any(keep):
+        return []
+
+    idx = np.flatnonzero(keep)
+    amplitude = np.abs(residues[idx]) / sigma[idx]
+    idx = idx[np.argsort(amplitude)[::-1][:n_modes]]
+    idx = idx[np.argsort(mode_freq[idx])]
+
+    reference = float(np.mean(np.abs(H))) or 1.0
+
+    modes = []
+    for k in idx:
+        amp = float(np.abs(residues[k]) / sigma[k])
+        modes.append(
+            {
+                "freq": float(mode_freq[k]),
+                "q": float(mag[k] / (2.0 * sigma[k])),
+                "t60": float(np.log(1000.0) / sigma[k]),
+                "sigma": float(sigma[k]),
+                "amplitude": amp,
+                "amplitude_db": float(20.0 * np.log10(max(amp, 1e-12) / reference)),
+            }
+        )
+    return modes
+
+
+def estimate_room_modes(
+    sweep,
+    recording,
+    fs: int,
+    n_modes: int = 10,
+    f_min: float = 20.0,
+    f_max: float = 300.0,
+    booming_bands=None,
+    ir_seconds: float = 2.0,
+) -> List[RoomMode]:
+    """
+    스윕 측정에서 f_max 이하 룸 모드 n_modes개의 주파수/Q/진폭/감쇠를 추정한다.
+
+    booming_bands(detect_booming_bands 결과)를 넘기면 각 모드에
+    그 모드 주파수를 포함하는 대역 번호("band", 없으면 None)를 붙인다.
+    """
+    freqs, H = transfer_function_from_sweep(
+        sweep, recording, fs, f_min=f_min, f_max=f_max, ir_seconds=ir_seconds
+    )
+    modes = fit_room_modes(freqs, H, n_modes=n_modes, f_min=f_min, f_max=f_max)
+
+    if booming_bands is not None:
+        for mode in modes:
+            mode["band"] = next(
+                (
+                    i
+                    for i, band in enumerate(booming_bands)
+                    if band["f_start"] <= mode["freq"] <= band["f_end"]
+                ),
+                None,
+            )
+    return modes
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from dsp.analyzer import compute_frequency_response, transfer_spectrum
+
+MultiSubResult = Dict[str, Any]
+
+# 후보 평가 한 묶음의 (후보 수 × 위치 수 × 주파수 수) 상한. complex64 기준 약 32 MB.
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def transfer_matrix(sweep, recordings, fs: int, f_min: float = 20.0, f_max: float = 200.0):
+    """
+    서브우퍼별 / 청취 위치별 스윕 녹음을 복소 전달함수 배열로 만든다.
+
+    Args:
+        sweep: 재생한 스윕 신호
+        recordings: recordings[s][p] = 서브 s만 재생했을 때 위치 p의 녹음
+        fs: 샘플레이트
+
+    Returns:
+        (freqs, H)  H: (서브 수, 위치 수, 주파수 수) complex128
+    """
+    sweep = np.asarray(sweep, dtype=np.float32).reshape(-1)
+    freqs, H, sweep_spectra = None, [], {}
+
+    for per_sub in recordings:
+        row = []
+        for rec in per_sub:
+            rec = np.asarray(rec).reshape(-1)
+            n = rec.size
+            if n not in sweep_spectra:
+                s = np.pad(sweep[:n], (0, max(n - sweep.size, 0)))
+                sweep_spectra[n] = compute_frequency_response(
+                    s, fs, f_min=f_min, f_max=f_max, keep_complex=True
+                )[2]
+            f, _, spectrum = compute_frequency_response(
+                rec, fs, f_min=f_min, f_max=f_max, keep_complex=True
+            )
+            if freqs is None:
+                freqs = f
+            elif f.size != freqs.size:
+                raise ValueError("모든 녹음의 길이가 같아야 합니다.")
+            row.append(transfer_spectrum(spectrum, sweep_spectra[n]))
+        H.append(row)
+
+    return freqs, np.asarray(H, dtype=np.complex128)
+
+
+def _log_bins(freqs: np.ndarray, f_min: float, f_max: float, points_per_octave: int) -> np.ndarray:
+    """[f_min, f_max]의 로그 간격 점마다 가장 가까운 bin 인덱스 (중복 제거)."""
+    inside = np.flatnonzero((freqs >= f_min) & (freqs <= f_max))
+    if inside.size == 0:
+        raise ValueError("최적화 대역 안에 주파수 bin이 없습니다.")
+    lo, hi = freqs[inside[0]], freqs[inside[-1]]
+    n = max(int(np.ceil(points_per_octave * np.log2(hi / max(lo, 1e-6)))) + 1, 2)
+    grid = np.geomspace(max(lo, 1e-6), hi, n)
+    idx = np.clip(np.searchsorted(freqs, grid), 1, freqs.size - 1)
+    idx -= (grid - freqs[idx - 1]) < (freqs[idx] - grid)
+    return np.unique(np.clip(idx, inside[0], inside[-1]))
+
+
+def _band_weights(freqs: np.ndarray, booming_bands) -> np.ndarray:
+    """부밍 에너지를 셀 주파수 가중치. 대역 목록이 없으면 전 구간을 본다."""
+    if not booming_bands:
+        return np.ones(freqs.size)
+    w = np.zeros(freqs.size)
+    for band in booming_bands:
+        w[(freqs >= band["f_start"]) & (freqs <= band["f_end"])] = 1.0
+    return w if np.any(w) else np.ones(freqs.size)
+
+
+def _contributions(omega, H, delays, gains_db, polarity):
+    """
+    서브 하나의 후보 설정별 기여 a(f)·H_s(p, f)를 (후보 수, 위치 수, 주파수 수)로 만든다.
+    a(f) = polarity · 10^(gain/20) · e^(-jωd)
+    """
+    amp = polarity * 10.0 ** (gains_db / 20.0)
+    a = amp[:, np.newaxis] * np.exp(-1j * np.outer(delays, omega))
+    return (a[:, np.newaxis, :] * H[np.newaxis]).astype(np.complex64)
+
+
+def _score(Y: np.ndarray, weights: np.ndarray, booming_weight: float):
+    """
+    합성 응답 Y (후보, 위치, 주파수)의 점수를 후보별로 계산한다.
+
+    - seat: 주파수별 위치 간 dB 분산의 평균 (dB²)
+    - boom: 위치 평균 응답이 대역 평균보다 솟은 양의 제곱 평균 (dB², weights 구간)
+    """
+    power = np.square(Y.real)
+    power += np.square(Y.imag)
+    np.maximum(power, 1e-12, out=power)
+    level = 10.0 * np.log10(power)
+
+    # 위치 축 분산 = E[L²] - E[L]² (np.var보다 임시 배열이 적다)
+    n_pos = level.shape[1]
+    mean_level = level.sum(axis=1) / n_pos
+    seat = np.mean(np.einsum("cpf,cpf->cf", level, level) / n_pos - mean_level ** 2, axis=1)
+
+    mean_db = 10.0 * np.log10(np.mean(power, axis=1))
+    excess = np.maximum(mean_db - np.mean(mean_db, axis=1, keepdims=True), 0.0)
+    boom = (excess ** 2) @ weights / weights.sum()
+
+    return seat + booming_weight * boom, seat, boom
+
+
+def _evaluate(base, tables, weights, booming_weight):
+    """
+    서브 1..S-1의 후보 표에서 나올 수 있는 모든 조합을 묶음 단위로 합성해 점수를 낸다.
+    조합 번호 c의 서브별 후보 인덱스는 np.unravel_index(c, 표 크기들)이다.
+
+    마지막 서브를 뺀 조합의 부분합만 gather로 만들고, 마지막 서브의 후보 전체는
+    브로드캐스팅 덧셈 한 번으로 붙인다. 한 묶음의 합성/점수 계산은 배열 연산 몇 번으로 끝난다.
+    """
+    sizes = tuple(table.shape[0] for table in tables)
+    last = tables[-1]
+    n_last = sizes[-1]
+    n_outer = int(np.prod(sizes[:-1]))
+    chunk = max(_CHUNK_ELEMENTS // max(base.size * n_last, 1), 1)
+
+    scores = np.empty(n_outer * n_last)
+    for start in range(0, n_outer, chunk):
+        stop = min(start + chunk, n_outer)
+        idx = np.unravel_index(np.arange(start, stop), sizes[:-1]) if sizes[:-1] else ()
+        partial = np.broadcast_to(base, (stop - start,) + base.shape)
+        for table, i in zip(tables[:-1], idx):
+            partial = partial + table[i]
+
+        Y = (partial[:, np.newaxis] + last[np.newaxis]).reshape((-1,) + base.shape)
+        scores[start * n_last : stop * n_last] = _score(Y, weights, booming_weight)[0]
+    return scores
+
+
+def _reject_gain_spread(scores, grids, sizes, gain_range_db: float) -> np.ndarray:
+    """
+    기준 서브(0 dB)를 포함한 게인 폭(최대 - 최소)이 gain_range_db를 넘는 조합의 점수를 inf로 만든다.
+    게인은 서브마다 ±gain_range_db에서 찾으므로 이 제한이 없으면 폭이 그 두 배까지 벌어진다.
+    """
+    idx = np.unravel_index(np.arange(scores.size), sizes)
+    gains = np.stack([g[i, 1] for g, i in zip(grids, idx)])
+    spread = np.maximum(gains.max(axis=0), 0.0) - np.minimum(gains.min(axis=0), 0.0)
+    scores[spread > gain_range_db + 1e-9] = np.inf
+    return scores
+
+
+def _pick(grids, sizes, c: int) -> np.ndarray:
+    """조합 번호 c에 해당하는 서브별 (지연, 게인, 극성) 행을 모은다."""
+    return np.stack([g[i] for g, i in zip(grids, np.unravel_index(c, sizes))])
+
+
+def _candidates(delay, gain, polarity, delay_span, delay_step, gain_span, gain_step, gain_range_db):
+    """한 서브의 (지연, 게인) 격자를 현재 값 주변에 만든다. 극성은 고정."""
+    d = delay + np.arange(-delay_span, delay_span + 1) * delay_step
+    g = np.clip(gain + np.arange(-gain_span, gain_span + 1) * gain_step, -gain_range_db, gain_range_db)
+    dd, gg = np.meshgrid(d, np.unique(g), indexing="ij")
+    return dd.reshape(-1), gg.reshape(-1), np.full(dd.size, float(polarity))
+
+
+def optimize_subwoofers(
+    freqs,
+    H,
+    f_min: float = 20.0,
+    f_max: float = 200.0,
+    booming_bands=None,
+    max_delay_ms: float = 10.0,
+    gain_range_db: float = 6.0,
+    booming_weight: float = 1.0,
+    points_per_octave: int = 24,
+    coarse_delay_ms: float = 2.0,
+    coarse_gain_db: float = 6.0,
+    refine_levels: int = 6,
+    top_k: int = 8,
+) -> MultiSubResult:
+    """
+    서브우퍼 여러 대의 지연/게인/극성을 정해 청취 위치 간 편차와 부밍 에너지를 줄인다.
+
+    첫 번째 서브를 기준(지연 0, 게인 0 dB, 정극성)으로 두고 나머지 서브의 설정 조합을 찾는다.
+    평가는 주파수를 [f_min, f_max]의 1/points_per_octave 옥타브 점으로 줄인 뒤 한다.
+
+    1. 거친 탐색: 서브마다 ±max_delay_ms를 coarse_delay_ms, ±gain_range_db를 coarse_gain_db
+       간격으로 나누고 극성 두 가지를 더한 격자의 모든 조합을 평가한다.
+       서브 간 게인 차이(기준 서브 포함)가 gain_range_db를 넘는 조합은 버린다.
+       서브별 후보 기여 a·H_s를 표로 미리 만들어 두므로 조합 하나는 표 조회와 덧셈뿐이다.
+    2. 세밀 탐색: 상위 top_k 조합 각각에서 서브마다 (지연, 게인) ±1 간격의 3×3 격자
+       조합을 평가해 가장 좋은 곳으로 옮기고, 간격을 절반으로 줄이기를 refine_levels번 한다.
+       극성은 거친 탐색에서 정한 값으로 고정한다.
+
+    4대 × 8위치, 기본 설정에서 후보 30만여 개를 몇 초 안에 평가한다.
+
+    점수 = 위치 간 dB 분산 평균 + booming_weight × 부밍 에너지 (_score 참고).
+    지연/게인에 공통으로 더해지는 값은 점수에 영향이 없으므로 결과는
+    가장 작은 지연이 0 ms, 가장 큰 게인이 0 dB가 되도록 옮겨서 돌려준다.
+    게인 차이를 제한했으므로 돌려주는 게인은 모두 [-gain_range_db, 0] 안에 있다.
+
+    Args:
+        freqs: 주파수 배열 (Hz)
+        H: (서브 수, 위치 수, 주파수 수) 복소 응답 (transfer_matrix 결과 등)
+        booming_bands: detect_booming_bands 결과. 주면 그 대역에서만 부밍 에너지를 센다.
+
+    Returns:
+        다음 키를 가진 dict
+        - delays_ms, gains_db, polarity: 서브별 설정 (polarity는 +1 / -1)
+        - score, seat_variance_db2, booming_db2: 고른 설정의 점수
+        - baseline: 모든 서브를 같은 설정(0 ms, 0 dB, +)으로 둔 경우의 점수 dict
+        - freqs, response_db: 평가 주파수와 위치별 합성 응답 (위치 수, 주파수 수)
+        - evaluated: 평가한 후보 수
+        - search_time: 탐색에 걸린 시간(초)
+    """
+    started = time.perf_counter()
+    freqs = np.asarray(freqs, dtype=np.float64)
+    H = np.asarray(H, dtype=np.complex128)
+    if H.ndim != 3 or H.shape[2] != freqs.size:
+        raise ValueError("H는 (서브 수, 위치 수, len(freqs)) 모양이어야 합니다.")
+
+    bins = _log_bins(freqs, f_min, f_max, points_per_octave)
+    f = freqs[bins]
+    H = H[:, :, bins]
+    omega = 2.0 * np.pi * f
+    weights = _band_weights(f, booming_bands)
+    n_subs = H.shape[0]
+
+    base = H[0].astype(np.complex64)
+    settings = np.zeros((n_subs, 3))  # (지연 초, 게인 dB, 극성)
+    settings[:, 2] = 1.0
+    evaluated = 0
+
+    if n_subs > 1:
+        # 1) 거친 탐색: 서브별 격자 × 극성의 모든 조합
+        span = int(round(max_delay_ms / coarse_delay_ms))
+        gspan = int(round(gain_range_db / coarse_gain_db))
+        grids = [
+            np.concatenate(
+                [
+                    np.stack(
+                        _candidates(
+                            0.0, 0.0, pol, span, coarse_delay_ms * 1e-3,
+                            gspan, coarse_gain_db, gain_range_db,
+                        ),
+                        axis=1,
+                    )
+                    for pol in (1.0, -1.0)
+                ]
+            )
+            for _ in range(1, n_subs)
+        ]
+        tables = [
+            _contributions(omega, H[s], *grids[s - 1].T) for s in range(1, n_subs)
+        ]
+        sizes = tuple(g.shape[0] for g in grids)
+        scores = _reject_gain_spread(
+            _evaluate(base, tables, weights, booming_weight), grids, sizes, gain_range_db
+        )
+        evaluated += scores.size
+
+        # 모든 서브 0 dB 조합은 항상 허용되므로 유한한 점수가 하나 이상 있다.
+        order = np.argsort(scores)[:top_k]
+        seeds = [_pick(grids, sizes, c) for c in order[np.isfinite(scores[order])]]
+        best_score, best = float(np.min(scores)), seeds[0]
+
+        # 2) 세밀 탐색: 상위 조합 주변에서 간격을 절반씩 줄인다.
+        delay_step, gain_step = coarse_delay_ms * 1e-3 / 2.0, coarse_gain_db / 2.0
+        for _ in range(max(int(refine_levels), 0)):
+            next_seeds = []
+            for seed in seeds:
+                local = [
+                    np.stack(
+                        _candidates(d, g, p, 1, delay_step, 1, gain_step, gain_range_db), axis=1
+                    )
+                    for d, g, p in seed
+                ]
+                tables = [_contributions(omega, H[s], *local[s - 1].T) for s in range(1, n_subs)]
+                sizes = tuple(g.shape[0] for g in local)
+                scores = _reject_gain_spread(
+                    _evaluate(base, tables, weights, booming_weight), local, sizes, gain_range_db
+                )
+                evaluated += scores.size
+
+                c = int(np.argmin(scores))
+                next_seeds.append((float(scores[c]), _pick(local, sizes, c)))
+
+            next_seeds.sort(key=lambda item: item[0])
+            if next_seeds[0][0] <= best_score:
+                best_score, best = next_seeds[0]
+            seeds = [s for _, s in next_seeds[: max(top_k // 2, 1)]]
+            delay_step, gain_step = delay_step / 2.0, gain_step / 2.0
+
+        settings[1:] = best
+
+    Y = apply_settings(f, H, settings[:, 0] * 1e3, settings[:, 1], settings[:, 2])
+    score, seat, boom = _score(Y[np.newaxis], weights, booming_weight)
+    base_score, base_seat, base_boom = _score(H.sum(axis=0)[np.newaxis], weights, booming_weight)
+
+    delays_ms = settings[:, 0] * 1e3
+    gains_db = settings[:, 1]
+    return {
+        "delays_ms": (delays_ms - delays_ms.min()).tolist(),
+        "gains_db": (gains_db - gains_db.max()).tolist(),
+        "polarity": [int(p) for p in settings[:, 2]],
+        "score": float(score[0]),
+        "seat_variance_db2": float(seat[0]),
+        "booming_db2": float(boom[0]),
+        "baseline": {
+            "score": float(base_score[0]),
+            "seat_variance_db2": float(base_seat[0]),
+            "booming_db2": float(base_boom[0]),
+        },
+        "freqs": f,
+        "response_db": 20.0 * np.log10(np.maximum(np.abs(Y), 1e-12)),
+        "evaluated": int(evaluated),
+        "search_time": time.perf_counter() - started,
+    }
+
+
+def apply_settings(
+    freqs,
+    H,
+    delays_ms: Sequence[float],
+    gains_db: Sequence[float],
+    polarity: Sequence[float],
+) -> np.ndarray:
+    """서브별 지연/게인/극성을 적용한 위치별 합성 응답 (위치 수, 주파수 수)."""
+    omega = 2.0 * np.pi * np.asarray(freqs, dtype=np.float64)
+    delays = np.asarray(delays_ms, dtype=np.float64) * 1e-3
+    amp = np.asarray(polarity, dtype=np.float64) * 10.0 ** (np.asarray(gains_db) / 20.0)
+    a = amp[:, np.newaxis] * np.exp(-1j * delays[:, np.newaxis] * omega)
+    return np.einsum("sf,spf->pf", a, np.asarray(H))
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+BoomingBand = Dict[str, Any]
+
+
+class PeakHierarchy:
+    """
+    ΔdB 곡선의 모든 피크를 임계값과 무관한 병합 트리(persistence)로 한 번에 정리해 둔다.
+
+    임계값 t에서의 부밍 대역은 {Δ ≥ t}의 연결 구간들이다. 값이 큰 점부터 차례로 켜면서
+    이웃 구간을 합치면(1차원 union-find) 각 피크가 생기는 값(birth = 피크 ΔdB)과
+    더 높은 피크 구간에 흡수되는 값(death = 안장점 ΔdB)을 O(N log N)에 얻는다.
+    임계값 t에서 살아 있는 피크는 birth ≥ t > death인 피크이고, 피크 하나가 대역 하나다.
+
+    점을 하나 켤 때마다 정확히 한 구간이 넓어지므로, (그 구간의 피크, 단계, 새 구간)을
+    기록해 두면 임계값 t에서 피크의 대역은 "Δ ≥ t인 점 K개를 켠 시점까지 그 피크의 마지막 기록"이다.
+    따라서 bands()는 K를 찾는 이진 탐색 한 번과 피크별 기록 조회(searchsorted) 한 번으로 끝난다.
+
+    같은 값의 피크가 여럿이면 왼쪽(낮은 주파수) 피크가 살아남으므로,
+    결과는 detect_booming_bands의 구간 순회(첫 번째 argmax)와 같다.
+    """
+
+    def __init__(self, freqs, delta_db):
+        self.freqs = np.asarray(freqs, dtype=np.float64)
+        delta = np.asarray(delta_db, dtype=np.float64)
+        # NaN은 어떤 임계값도 넘지 못하는 점으로 취급한다.
+        self.delta = np.where(np.isfinite(delta), delta, -np.inf)
+        self._build(self.delta.size)
+
+    def _build(self, n: int) -> None:
+        delta = self.delta
+        order = np.lexsort((np.arange(n), -delta))  # 값 내림차순, 같으면 인덱스 오름차순
+        order = order[np.isfinite(delta[order])]
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(order.size)
+
+        active = np.zeros(n, dtype=bool)
+        left_end = np.zeros(n, dtype=np.int64)   # 구간 오른쪽 끝 → 왼쪽 끝
+        right_end = np.zeros(n, dtype=np.int64)  # 구간 왼쪽 끝 → 오른쪽 끝
+        peak_at = np.zeros(n, dtype=np.int64)    # 구간 양 끝 → 구간의 피크(가장 먼저 켜진 점)
+
+        peaks, deaths = [], {}
+        events = np.empty((order.size, 3), dtype=np.int64)  # (피크, 구간 왼쪽 끝, 오른쪽 끝)
+
+        for step, i in enumerate(order.tolist()):
+            active[i] = True
+            a = left_end[i - 1] if i > 0 and active[i - 1] else i
+            b = right_end[i + 1] if i < n - 1 and active[i + 1] else i
+
+            if a == i and b == i:
+                elder = i
+                peaks.append(i)
+            elif a == i:
+                elder = peak_at[b]
+            elif b == i:
+                elder = peak_at[a]
+            else:
+                p_left, p_right = peak_at[a], peak_at[b]
+                elder, younger = (
+                    (p_left, p_right) if rank[p_left] < rank[p_right] else (p_right, p_left)
+                )
+                deaths[younger] = delta[i]
+
+            right_end[a], left_end[b] = b, a
+            peak_at[a] = peak_at[b] = elder
+            events[step] = (elder, a, b)
+
+        self.peak_index = np.array(peaks, dtype=np.int64)
+        self.birth = delta[self.peak_index]
+        self.death = np.array([deaths.get(p, -np.inf) for p in peaks], dtype=np.float64)
+
+        # 기록을 (피크 번호, 단계) 순으로 정렬해서 피크별 조회를 searchsorted 한 번으로 만든다.
+        slot = np.full(n, -1, dtype=np.int64)
+        slot[self.peak_index] = np.arange(self.peak_index.size)
+        self._slot = slot
+        keys = slot[events[:, 0]] * max(order.size, 1) + np.arange(order.size)
+        ev_order = np.argsort(keys, kind="stable")
+        self._event_keys = keys[ev_order]
+        self._event_lo = events[ev_order, 1]
+        self._event_hi = events[ev_order, 2]
+        self._sorted_desc = -delta[order]  # 오름차순 (-Δ)
+        self._n_steps = max(order.size, 1)
+
+    def _extents(self, peaks: np.ndarray, threshold: float):
+        """피크마다 Δ ≥ threshold가 이어지는 가장 왼쪽/오른쪽 인덱스를 한꺼번에 구한다."""
+        k = int(np.searchsorted(self._sorted_desc, -threshold, side="right"))  # Δ ≥ t인 점 수
+        query = self._slot[peaks] * self._n_steps + (k - 1)
+        idx = np.searchsorted(self._event_keys, query, side="right") - 1
+        return self._event_lo[idx], self._event_hi[idx]
+
+    def bands(self, threshold_db: float = 5.0, min_bandwidth_hz: float = 5.0) -> List[BoomingBand]:
+        """detect_booming_bands와 같은 형식의 부밍 대역 목록 (주파수 오름차순)."""
+        alive = (self.birth >= threshold_db) & (self.death < threshold_db)
+        peaks = self.peak_index[alive]
+        if peaks.size == 0:
+            return []
+
+        lo, hi = self._extents(peaks, threshold_db)
+        f_start, f_end = self.freqs[lo], self.freqs[hi]
+        keep = f_end - f_start >= min_bandwidth_hz
+        order = np.argsort(lo[keep])
+
+        peaks, f_start, f_end = peaks[keep][order], f_start[keep][order], f_end[keep][order]
+        return [
+            {
+                "f_start": float(fs),
+                "f_end": float(fe),
+                "peak_freq": float(self.freqs[p]),
+                "peak_gain_db": float(self.delta[p]),
+            }
+            for fs, fe, p in zip(f_start, f_end, peaks)
+        ]
+
+    def band_counts(self, thresholds) -> np.ndarray:
+        """여러 임계값에서의 대역 수(최소 대역폭 조건 없이). 민감도 곡선을 그릴 때 쓴다."""
+        t = np.asarray(thresholds, dtype=np.float64)[:, np.newaxis]
+        return np.sum((self.birth >= t) & (self.death < t), axis=1)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import numpy as np
+
+from dsp.analyzer import fractional_octave_smooth
+from dsp.fir import minimum_phase_spectrum
+
+PhaseAnalysis = Dict[str, Any]
+
+
+def unwrap_phase(H) -> np.ndarray:
+    """복소 응답의 위상을 마지막 축을 따라 한 번에 펼친다 (rad)."""
+    return np.unwrap(np.angle(np.asarray(H)), axis=-1)
+
+
+def group_delay(freqs, phase) -> np.ndarray:
+    """펼친 위상에서 군지연 τ(f) = -dφ/dω 를 구한다 (초). phase는 (..., len(freqs))."""
+    omega = 2.0 * np.pi * np.asarray(freqs, dtype=np.float64)
+    return -np.gradient(np.asarray(phase, dtype=np.float64), omega, axis=-1)
+
+
+def minimum_phase(freqs, H, fs, f_min=None, f_max=None) -> np.ndarray:
+    """
+    |H|와 같은 크기를 가진 최소 위상 응답의 위상(rad)을 freqs에서 구한다.
+
+    freqs는 rfft bin처럼 등간격이어야 한다. [f_min, f_max] 밖은 그 양 끝 크기로 채워
+    0 ~ fs/2 전체 bin을 만든 뒤 실수 켑스트럼(minimum_phase_spectrum)으로 계산한다.
+    스윕 양 끝처럼 크기를 믿을 수 없는 bin을 f_min/f_max로 빼 두면
+    그 구간의 롤오프가 대역 안 최소 위상에 섞이지 않는다.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mag = np.abs(np.asarray(H))
+    if freqs.size < 2:
+        return np.zeros(freqs.shape)
+
+    lo = 0 if f_min is None else int(np.searchsorted(freqs, f_min, side="left"))
+    hi = freqs.size if f_max is None else int(np.searchsorted(freqs, f_max, side="right"))
+    lo = min(lo, freqs.size - 1)
+    hi = max(hi, lo + 1)
+
+    df = freqs[1] - freqs[0]
+    n_bins = int(round(fs / 2.0 / df)) + 1
+    k0 = min(int(round(freqs[0] / df)), n_bins - 1)
+    k1 = min(k0 + freqs.size, n_bins)
+
+    full = np.empty(n_bins)
+    full[:k0] = mag[lo]
+    full[k0:k1] = mag[np.clip(np.arange(k1 - k0), lo, hi - 1)]
+    full[k1:] = mag[hi - 1]
+
+    phase = np.unwrap(np.angle(minimum_phase_spectrum(full)))[k0:k1]
+    return np.pad(phase, (0, freqs.size - phase.size), mode="edge")
+
+
+def phase_analysis(
+    freqs,
+    H,
+    fs,
+    f_min: float = 20.0,
+    f_max: float = 300.0,
+    fraction: int = 12,
+) -> PhaseAnalysis:
+    """
+    복소 전달함수에서 위상/군지연/초과 위상(excess phase)을 구한다.
+
+    전체 위상 = 최소 위상(크기에서 결정됨) + 초과 위상(순수 지연 + 전역 통과 성분)이다.
+    초과 군지연이 대역 전체에서 평평하면(= 지연뿐이면) 공진의 군지연 돌출은 최소 위상이라
+    최소 위상 EQ로 크기와 함께 바로잡힌다. 초과 군지연에 돌출이 남는 대역은 EQ로 고칠 수 없다.
+
+    모든 계산은 입력 대역 전체에서 배열 단위로 한 뒤 [f_min, f_max]만 잘라낸다.
+    최소 위상은 앞뒤로 한 옥타브씩 여유를 둔 구간의 크기만 써서 구한다
+    (스윕 양 끝의 윈도우/잘림 롤오프가 섞이지 않도록).
+    군지연 곡선은 smooth_response와 같은 1/fraction 옥타브 평균으로 다듬는다.
+    시스템 지연(latency)은 초과 군지연의 중앙값으로 추정해 군지연/초과 위상에서 뺀다.
+
+    Args:
+        freqs: 등간격 주파수 배열 (Hz), 예: analyze_measurement(...)["transfer"][0]
+        H: freqs에서의 복소 전달함수
+        fs: 샘플레이트
+        f_min, f_max: 결과로 돌려줄 대역 (Hz)
+        fraction: 군지연 스무딩 옥타브 분수 N
+
+    Returns:
+        다음 키를 가진 dict (freqs 외 배열은 모두 freqs와 같은 길이)
+        - freqs: 주파수 (Hz)
+        - phase: 펼친 위상 (rad)
+        - group_delay_ms: 군지연에서 시스템 지연을 뺀 값 (ms)
+        - min_phase_group_delay_ms: 최소 위상 성분의 군지연 (ms)
+        - excess_group_delay_ms: 초과 군지연에서 시스템 지연을 뺀 값 (ms)
+        - excess_phase: 시스템 지연을 뺀 초과 위상 (rad)
+        - latency_ms: 추정한 시스템 지연 (ms)
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    H = np.asarray(H, dtype=np.complex128)
+
+    phase = unwrap_phase(H)
+    min_phase = minimum_phase(freqs, H, fs, f_min=f_min / 2.0, f_max=f_max * 2.0)
+    delays = group_delay(freqs, np.stack([phase, min_phase]))
+    delays = np.concatenate([delays, delays[:1] - delays[1:]])  # 전체, 최소 위상, 초과
+
+    band = (freqs >= f_min) & (freqs <= f_max)
+    if not np.any(band):
+        band = np.ones(freqs.shape, dtype=bool)
+
+    latency = float(np.median(delays[2, band])) if freqs.size else 0.0
+    delays[[0, 2]] -= latency
+    delays = fractional_octave_smooth(freqs, delays, fraction)[:, band]
+
+    excess = (phase - min_phase + 2.0 * np.pi * freqs * latency)[band]
+    excess -= 2.0 * np.pi * np.round(excess[0] / (2.0 * np.pi)) if excess.size else 0.0
+
+    return {
+        "freqs": freqs[band],
+        "phase": phase[band],
+        "group_delay_ms": delays[0] * 1000.0,
+        "min_phase_group_delay_ms": delays[1] * 1000.0,
+        "excess_group_delay_ms": delays[2] * 1000.0,
+        "excess_phase": excess,
+        "latency_ms": latency * 1000.0,
+    }
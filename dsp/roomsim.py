@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+SPEED_OF_SOUND = 343.0
+
+RoomModeInfo = Dict[str, Any]
+
+
+def _key(values, digits: int = 6):
+    """float 목록을 캐시 키로 쓸 수 있게 반올림된 튜플로 만든다."""
+    return tuple(round(float(v), digits) for v in values)
+
+
+@lru_cache(maxsize=64)
+def _image_geometry(dims, source, mic, fs: int, length: float, c: float):
+    """
+    직육면체 방의 이미지 음원을 한꺼번에 열거한다 (Allen & Berkley).
+
+    축마다 (q ∈ {0, 1}, n ∈ [-N, N]) 조합의 이미지 좌표와 두 벽 반사 횟수 |n - q|, |n|을
+    1차원 배열로 만든 뒤 브로드캐스팅으로 세 축을 합치고, length초 안에 도착하는 이미지만 남긴다.
+
+    Returns:
+        (samples, inv_dist, counts)
+        samples: 이미지별 도착 샘플 위치
+        inv_dist: 1 / d, 직접음 기준으로 정규화
+        counts: (6, 이미지 수) 벽별 반사 횟수 [x0, x1, y0, y1, z0, z1]
+    """
+    radius = c * length
+    coords, walls = [], []
+    for L, s, m in zip(dims, source, mic):
+        n_max = int(np.ceil(radius / (2.0 * L))) + 1
+        n = np.arange(-n_max, n_max + 1)
+        q = np.array([0, 1])[:, np.newaxis]
+        coords.append((((1 - 2 * q) * s + 2 * n * L) - m).reshape(-1).astype(np.float32))
+        walls.append((np.abs(n - q).reshape(-1), np.broadcast_to(np.abs(n), (2, n.size)).reshape(-1)))
+
+    dx, dy, dz = coords
+    dist2 = (
+        dx[:, np.newaxis, np.newaxis] ** 2
+        + dy[np.newaxis, :, np.newaxis] ** 2
+        + dz[np.newaxis, np.newaxis, :] ** 2
+    )
+    ix, iy, iz = np.nonzero(dist2 < radius * radius)
+    dist = np.sqrt(dist2[ix, iy, iz])
+    samples = np.round(dist * (fs / c)).astype(np.int64)
+
+    counts = np.stack(
+        [
+            walls[0][0][ix], walls[0][1][ix],
+            walls[1][0][iy], walls[1][1][iy],
+            walls[2][0][iz], walls[2][1][iz],
+        ]
+    ).astype(np.float32)
+
+    dist = np.maximum(dist, 1e-3)
+    inv_dist = np.min(dist) / dist
+    return samples, inv_dist, counts
+
+
+def simulate_room_ir(
+    dims: Sequence[float],
+    absorption,
+    source: Sequence[float],
+    mic: Sequence[float],
+    fs: int = 48_000,
+    length: float = 0.5,
+    c: float = SPEED_OF_SOUND,
+) -> np.ndarray:
+    """
+    직육면체 방의 저역용 임펄스 응답을 이미지 음원법으로 만든다.
+
+    이미지 위치/거리/반사 횟수는 방 형상(dims, source, mic, fs, length, c)을 키로 캐시되므로,
+    같은 방에서 흡음만 바꿔 가며 여러 번 계산할 때는 진폭 계산과 합산만 다시 한다.
+    진폭은 (1/d) · Π β_w^(반사 횟수)이며 β_w = √(1 - α_w)를 로그 영역 행렬 곱 한 번으로 구한다.
+
+    각 이미지는 가장 가까운 샘플에 놓는다 (48 kHz에서 지연 오차 10 µs 이하로 저역 분석에는 충분).
+    직접음 크기가 1이 되도록 정규화하므로 resonant_ir과 같은 방식으로
+    SimulatedBackend(ir=...)나 compute_frequency_response에 바로 넘길 수 있다.
+
+    Args:
+        dims: 방 크기 (Lx, Ly, Lz) m
+        absorption: 흡음률. 스칼라, 벽 6개 [x0, x1, y0, y1, z0, z1], 또는 (방 수, 6) 배치
+        source, mic: 음원/마이크 위치 (m)
+        fs: 샘플레이트
+        length: 임펄스 응답 길이(초)
+        c: 음속 (m/s)
+
+    Returns:
+        (n,) float32 임펄스 응답. absorption이 (B, 6)이면 (B, n)
+    """
+    samples, inv_dist, counts = _image_geometry(
+        _key(dims), _key(source), _key(mic), int(fs), float(length), float(c)
+    )
+
+    alpha = np.asarray(absorption, dtype=np.float64)
+    batched = alpha.ndim == 2
+    alpha = np.broadcast_to(alpha, alpha.shape[:-1] + (6,) if alpha.ndim else (6,))
+    alpha = np.atleast_2d(alpha)
+
+    log_beta = 0.5 * np.log(np.clip(1.0 - alpha, 1e-12, 1.0)).astype(np.float32)
+    amp = np.exp(log_beta @ counts)
+    amp *= inv_dist
+
+    # 방마다 샘플 위치를 b * n만큼 밀어서 bincount 한 번으로 모든 방을 합친다.
+    n = int(round(length * fs))
+    B = alpha.shape[0]
+    index = (np.minimum(samples, n - 1) + n * np.arange(B)[:, np.newaxis]).reshape(-1)
+    ir = np.bincount(index, weights=amp.reshape(-1), minlength=B * n)
+    ir = ir.reshape(B, n).astype(np.float32)
+
+    return ir if batched else ir[0]
+
+
+def room_mode_frequencies(
+    dims: Sequence[float],
+    f_max: float = 300.0,
+    c: float = SPEED_OF_SOUND,
+) -> List[RoomModeInfo]:
+    """
+    직육면체 방의 해석적 모드 주파수 f = (c/2)·√((nx/Lx)² + (ny/Ly)² + (nz/Lz)²)를
+    f_max 이하에서 모두 구한다.
+
+    Returns:
+        주파수 오름차순 [{"freq": Hz, "order": (nx, ny, nz), "kind": "axial" | "tangential" | "oblique"}, ...]
+    """
+    Lx, Ly, Lz = (float(v) for v in dims)
+    limits = [int(np.floor(2.0 * f_max * L / c)) for L in (Lx, Ly, Lz)]
+    nx, ny, nz = np.meshgrid(*(np.arange(m + 1) for m in limits), indexing="ij")
+    nx, ny, nz = nx.reshape(-1), ny.reshape(-1), nz.reshape(-1)
+
+    freq = 0.5 * c * np.sqrt((nx / Lx) ** 2 + (ny / Ly) ** 2 + (nz / Lz) ** 2)
+    valid = (freq > 0) & (freq <= f_max)
+    order = np.argsort(freq[valid], kind="stable")
+
+    kinds = {1: "axial", 2: "tangential", 3: "oblique"}
+    nonzero = (nx > 0).astype(int) + (ny > 0) + (nz > 0)
+
+    return [
+        {
+            "freq": float(freq[valid][i]),
+            "order": (int(nx[valid][i]), int(ny[valid][i]), int(nz[valid][i])),
+            "kind": kinds[int(nonzero[valid][i])],
+        }
+        for i in order
+    ]
+
+
+def random_rooms(n: int, seed=None) -> List[Dict[str, Any]]:
+    """
+    일반적인 거실/청음실 범위의 무작위 방 설정 n개를 만든다 (탐지 검증/벤치마크용).
+
+    Returns:
+        [{"dims", "absorption", "source", "mic"}, ...] — simulate_room_ir(**room)에 바로 넘길 수 있다.
+    """
+    rng = np.random.default_rng(seed)
+    rooms = []
+    for _ in range(n):
+        dims = rng.uniform([3.0, 2.5, 2.3], [8.0, 6.0, 3.2])
+        # 스피커는 앞벽 근처, 청취 위치는 방 중간쯤
+        source = dims * rng.uniform([0.05, 0.1, 0.1], [0.3, 0.9, 0.5])
+        mic = dims * rng.uniform([0.5, 0.3, 0.3], [0.8, 0.7, 0.5])
+        rooms.append(
+            {
+                "dims": tuple(dims),
+                "absorption": rng.uniform(0.05, 0.4, size=6),
+                "source": tuple(source),
+                "mic": tuple(mic),
+            }
+        )
+    return rooms
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from audio.backend import AudioBackend, SimulatedBackend, SoundDeviceBackend, resonant_ir
+from audio.measurement import measure_sweep
+from dsp.analyzer import analyze_measurement
+from dsp.logspectrum import LogSpectrum
+from monitor.scheduler import Scheduler
+from storage.history import MeasurementHistory
+
+MonitorEvent = Dict[str, Any]
+
+
+class MonitoredRoom:
+    """
+    주기적으로 재측정할 방(설치 위치) 하나의 설정.
+
+    Args:
+        name: 방 이름 (기준 곡선 파일 이름으로도 쓰인다)
+        backend: 이 방의 스피커/마이크에 연결된 AudioBackend
+        interval: 측정 주기(초)
+        duration: 스윕 길이(초)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: AudioBackend,
+        interval: float = 3600.0,
+        duration: float = 7.0,
+        f_start: float = 20.0,
+        f_end: float = 1000.0,
+        fs: int = 48_000,
+    ):
+        self.name = name
+        self.backend = backend
+        self.interval = interval
+        self.duration = duration
+        self.f_start = f_start
+        self.f_end = f_end
+        self.fs = fs
+
+
+def _print_event(event: MonitorEvent) -> None:
+    details = ", ".join(f"{k}={v}" for k, v in event.items() if k not in ("type", "room", "time"))
+    print(f"[EVENT] {event['room']}: {event['type']} ({details})")
+
+
+def _octaves_apart(f1: float, f2: float) -> float:
+    return abs(float(np.log2(f1 / f2)))
+
+
+def compare_bands(
+    reference: List[Dict[str, Any]],
+    current: List[Dict[str, Any]],
+    match_octaves: float = 1.0 / 3.0,
+    shift_octaves: float = 1.0 / 12.0,
+    gain_change_db: float = 3.0,
+) -> List[MonitorEvent]:
+    """
+    기준 측정과 새 측정의 부밍 대역을 피크 주파수로 짝지어 변화를 찾는다.
+
+    Returns:
+        band_appeared / band_disappeared / band_shifted 이벤트(dict) 목록
+    """
+    events = []
+    unmatched = list(range(len(reference)))
+
+    for band in current:
+        best = None
+        best_dist = match_octaves
+        for i in unmatched:
+            dist = _octaves_apart(band["peak_freq"], reference[i]["peak_freq"])
+            if dist <= best_dist:
+                best, best_dist = i, dist
+
+        if best is None:
+            events.append(
+                {
+                    "type": "band_appeared",
+                    "peak_freq": round(band["peak_freq"], 1),
+                    "peak_gain_db": round(band["peak_gain_db"], 1),
+                }
+            )
+            continue
+
+        unmatched.remove(best)
+        ref = reference[best]
+        gain_delta = band["peak_gain_db"] - ref["peak_gain_db"]
+        if best_dist >= shift_octaves or abs(gain_delta) >= gain_change_db:
+            events.append(
+                {
+                    "type": "band_shifted",
+                    "from_freq": round(ref["peak_freq"], 1),
+                    "to_freq": round(band["peak_freq"], 1),
+                    "gain_delta_db": round(gain_delta, 1),
+                }
+            )
+
+    for i in unmatched:
+        events.append(
+            {
+                "type": "band_disappeared",
+                "peak_freq": round(reference[i]["peak_freq"], 1),
+                "peak_gain_db": round(reference[i]["peak_gain_db"], 1),
+            }
+        )
+
+    return events
+
+
+class MonitorDaemon:
+    """
+    GUI 없이 방들을 주기적으로 재측정하고 기준 곡선과 비교하는 모니터링 서비스.
+
+    - 첫 측정 결과(또는 reference_dir에 저장된 곡선)를 기준으로 삼는다.
+    - 새 측정은 표준 로그 그리드(LogSpectrum) 위에서 레벨을 맞춘 RMS dB 거리로
+      기준과 비교하고, drift_threshold_db를 넘으면 'drift' 이벤트를 낸다.
+    - 부밍 대역이 새로 생기거나 사라지거나 이동하면 해당 이벤트를 낸다.
+    - 측정 사이에는 Scheduler가 잠들어 있으므로 CPU를 거의 쓰지 않는다.
+    """
+
+    def __init__(
+        self,
+        rooms: List[MonitoredRoom],
+        reference_dir: str,
+        on_event: Optional[Callable[[MonitorEvent], None]] = None,
+        drift_threshold_db: float = 1.5,
+        history: Optional[MeasurementHistory] = None,
+    ):
+        self.rooms = rooms
+        self.reference_dir = reference_dir
+        self.on_event = on_event or _print_event
+        self.drift_threshold_db = drift_threshold_db
+        self.history = history
+        self.scheduler = Scheduler(on_error=self._on_job_error)
+
+        os.makedirs(reference_dir, exist_ok=True)
+
+    def _reference_paths(self, room: MonitoredRoom):
+        base = os.path.join(self.reference_dir, room.name)
+        return base + ".bsls", base + ".json"
+
+    def load_reference(self, room: MonitoredRoom):
+        """저장된 기준 곡선/부밍 대역을 읽는다. 없으면 (None, None)."""
+        spec_path, bands_path = self._reference_paths(room)
+        if not (os.path.exists(spec_path) and os.path.exists(bands_path)):
+            return None, None
+
+        with open(spec_path, "rb") as f:
+            spectrum = LogSpectrum.from_bytes(f.read())
+        with open(bands_path, "r", encoding="utf-8") as f:
+            bands = json.load(f)
+        return spectrum, bands
+
+    def save_reference(self, room: MonitoredRoom, spectrum: LogSpectrum, bands) -> None:
+        spec_path, bands_path = self._reference_paths(room)
+        with open(spec_path, "wb") as f:
+            f.write(spectrum.to_bytes())
+        with open(bands_path, "w", encoding="utf-8") as f:
+            json.dump(bands, f, ensure_ascii=False, indent=2)
+
+    def _emit(self, room: MonitoredRoom, event: MonitorEvent) -> MonitorEvent:
+        details = {k: v for k, v in event.items() if k != "type"}
+        event = {"type": event["type"], "room": room.name, "time": time.time(), **details}
+        self.on_event(event)
+        return event
+
+    def _on_job_error(self, name: str, error: Exception) -> None:
+        """예약 측정 작업에서 잡히지 않은 예외를 해당 방의 error 이벤트로 내보낸다."""
+        self.on_event({"type": "error", "room": name, "time": time.time(), "message": str(error)})
+
+    def measure_room(self, room: MonitoredRoom) -> List[MonitorEvent]:
+        """
+        방 하나를 즉시 측정하고 기준과 비교한다.
+
+        Returns:
+            이번 측정에서 발생한 이벤트 목록 (on_event로도 전달된다)
+        """
+        events: List[MonitorEvent] = []
+
+        try:
+            _, recording, fs, meta = measure_sweep(
+                room.backend,
+                duration=room.duration,
+                f_start=room.f_start,
+                f_end=room.f_end,
+                fs=room.fs,
+            )
+            analysis = analyze_measurement(recording, fs, meta)
+        except Exception as e:
+            events.append({"type": "error", "message": str(e)})
+            analysis = None
+
+        if analysis is not None:
+            spectrum, bands = analysis["spectrum"], analysis["bands"]
+            if self.history is not None:
+                self.history.add(spectrum, bands, room=room.name, meta=meta)
+            ref_spectrum, ref_bands = self.load_reference(room)
+
+            if ref_spectrum is None:
+                self.save_reference(room, spectrum, bands)
+                events.append({"type": "reference_created", "bands": len(bands)})
+            else:
+                distance = spectrum.distance(ref_spectrum)
+                if distance >= self.drift_threshold_db:
+                    events.append({"type": "drift", "distance_db": round(distance, 2)})
+                events.extend(compare_bands(ref_bands, bands))
+        elif not events:
+            events.append({"type": "error", "message": "측정 신호가 너무 짧습니다."})
+
+        return [self._emit(room, event) for event in events]
+
+    def run_forever(self) -> None:
+        """모든 방의 주기 측정을 등록하고 stop()이 호출될 때까지 실행한다."""
+        for room in self.rooms:
+            self.scheduler.every(
+                room.interval,
+                lambda room=room: self.measure_room(room),
+                name=room.name,
+            )
+        self.scheduler.run()
+
+    def stop(self) -> None:
+        self.scheduler.stop()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="BoomingScanner 룸 모니터링 데몬")
+    parser.add_argument("--room", default="room", help="방 이름")
+    parser.add_argument("--interval", type=float, default=3600.0, help="측정 주기(초)")
+    parser.add_argument("--duration", type=float, default=7.0, help="스윕 길이(초)")
+    parser.add_argument("--reference-dir", default="references", help="기준 곡선 저장 폴더")
+    parser.add_argument("--drift-db", type=float, default=1.5, help="drift 이벤트 기준(dB)")
+    parser.add_argument("--history", default=None, help="측정 이력 데이터베이스(SQLite) 경로")
+    parser.add_argument("--simulate", action="store_true", help="실제 장치 대신 시뮬레이션 백엔드 사용")
+    args = parser.parse_args(argv)
+
+    if args.simulate:
+        backend = SimulatedBackend(resonant_ir(48_000, [(45.0, 8.0, 1.0), (110.0, 10.0, 0.6)]))
+    else:
+        backend = SoundDeviceBackend()
+
+    room = MonitoredRoom(args.room, backend, interval=args.interval, duration=args.duration)
+    history = MeasurementHistory(args.history) if args.history else None
+    daemon = MonitorDaemon(
+        [room], args.reference_dir, drift_threshold_db=args.drift_db, history=history
+    )
+
+    print(f"[INFO] '{args.room}' 모니터링 시작 (주기 {args.interval:.0f}초)")
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        daemon.stop()
+        print("[INFO] 모니터링 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional
+
+ErrorCallback = Callable[[str, Exception], None]
+
+
+class _Job:
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.cancelled = False
+
+
+class Scheduler:
+    """
+    주기 작업용 스케줄러.
+
+    다음 실행 시각 순으로 정렬된 힙 하나와 Condition 하나만 사용한다.
+    실행할 작업이 없을 때는 다음 실행 시각까지 Condition.wait로 잠들어 있으므로
+    실행 사이의 CPU 사용량은 사실상 0이다.
+
+    stop()은 run()이 시작되기 전에 호출되어도 유효하다(run()이 바로 반환된다).
+    작업에서 난 예외는 on_error(작업 이름, 예외)로 넘기고 다음 주기에 다시 실행한다.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        on_error: Optional[ErrorCallback] = None,
+    ):
+        self._clock = clock
+        self._on_error = on_error or _print_error
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+
+    def every(
+        self,
+        interval: float,
+        func: Callable[[], None],
+        first_delay: float = 0.0,
+        name: Optional[str] = None,
+    ) -> _Job:
+        """func를 interval초마다 실행하도록 등록한다. 첫 실행은 first_delay초 뒤."""
+        if interval <= 0:
+            raise ValueError("interval은 0보다 커야 합니다.")
+
+        job = _Job(name or getattr(func, "__name__", "job"), float(interval), func)
+        with self._cond:
+            self._push(self._clock() + first_delay, job)
+        return job
+
+    def cancel(self, job: _Job) -> None:
+        with self._cond:
+            job.cancelled = True
+            self._cond.notify()
+
+    def _push(self, due: float, job: _Job) -> None:
+        heapq.heappush(self._heap, (due, next(self._counter), job))
+        self._cond.notify()
+
+    def run(self) -> None:
+        """stop()이 호출될 때까지 현재 스레드에서 작업을 실행한다."""
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopped.is_set():
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+
+                    due, _, head = self._heap[0]
+                    if head.cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+
+                    delay = due - self._clock()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+
+                    heapq.heappop(self._heap)
+                    job = head
+                    break
+
+                if self._stopped.is_set():
+                    return
+
+            try:
+                job.func()
+            except Exception as e:
+                self._on_error(job.name, e)
+
+            with self._cond:
+                if not job.cancelled:
+                    # 작업이 밀렸다면 놓친 실행은 건너뛰고 다음 주기에 맞춘다.
+                    next_due = due + job.interval
+                    now = self._clock()
+                    if next_due <= now:
+                        next_due = now + job.interval
+                    self._push(next_due, job)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped.set()
+            self._cond.notify_all()
+
+
+def _print_error(name: str, error: Exception) -> None:
+    print(f"[WARN] 예약 작업 '{name}' 실행 중 오류: {error}")
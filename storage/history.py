@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from dsp.logspectrum import LogSpectrum
+
+HistoryRecord = Dict[str, Any]
+
+# 근사 이웃 검색용 색인은 1/12 옥타브 해상도로 만든다.
+COARSE_POINTS_PER_OCTAVE = 12
+
+# 한 번의 IN (...) 질의에 넣는 최대 id 수 (SQLite 기본 제한 999 이하)
+_MAX_VARIABLES = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS measurements (
+    id INTEGER PRIMARY KEY,
+    room TEXT,
+    device TEXT,
+    measured_at REAL NOT NULL,
+    meta TEXT,
+    spectrum BLOB NOT NULL,
+    features BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_measurements_room ON measurements (room, measured_at);
+CREATE INDEX IF NOT EXISTS idx_measurements_device ON measurements (device, measured_at);
+CREATE INDEX IF NOT EXISTS idx_measurements_time ON measurements (measured_at);
+
+CREATE TABLE IF NOT EXISTS bands (
+    measurement_id INTEGER NOT NULL REFERENCES measurements (id) ON DELETE CASCADE,
+    f_start REAL NOT NULL,
+    f_end REAL NOT NULL,
+    peak_freq REAL NOT NULL,
+    peak_gain_db REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bands_peak ON bands (peak_freq, peak_gain_db);
+CREATE INDEX IF NOT EXISTS idx_bands_measurement ON bands (measurement_id);
+"""
+
+
+def default_history_path() -> str:
+    """GUI가 측정 결과를 쌓아 두는 기본 데이터베이스 위치."""
+    return os.path.join(os.path.expanduser("~"), ".boomingscanner", "history.sqlite")
+
+
+def coarse_features(spectrum: LogSpectrum) -> np.ndarray:
+    """
+    LogSpectrum을 1/12 옥타브 색인 벡터로 줄인다.
+
+    인접한 (ppo / 12)개 점씩 평균하고, 평균 레벨을 빼서(레벨 정렬) 측정 범위 밖(NaN)은 0으로 둔다.
+    같은 그리드의 곡선은 항상 같은 길이의 벡터가 된다.
+    """
+    step = max(spectrum.points_per_octave // COARSE_POINTS_PER_OCTAVE, 1)
+    values = spectrum.values.astype(np.float64)
+    n_groups = -(-values.size // step)
+    padded = np.full(n_groups * step, np.nan)
+    padded[: values.size] = values
+    groups = padded.reshape(n_groups, step)
+
+    valid = np.isfinite(groups)
+    counts = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        features = np.where(valid, groups, 0.0).sum(axis=1) / counts
+
+    has_value = counts > 0
+    if np.any(has_value):
+        features[has_value] -= features[has_value].mean()
+    features[~has_value] = 0.0
+    return features.astype(np.float32)
+
+
+class MeasurementHistory:
+    """
+    측정 결과(LogSpectrum + 부밍 대역)를 쌓아 두는 로컬 SQLite 저장소.
+
+    - 곡선은 LogSpectrum.to_bytes()를 zlib으로 압축해서 저장하고,
+      부밍 대역은 별도 테이블에 (peak_freq, peak_gain_db) 색인과 함께 저장한다.
+      "45 Hz 근처 +6 dB 이상 부밍이 있었던 방" 같은 질의는 색인만으로 끝난다.
+    - 방/장치/측정 시각에도 색인이 있어 방별 이력 조회가 빠르다.
+    - nearest()는 모든 곡선의 1/12 옥타브 특징 벡터를 메모리 행렬로 들고 있다가
+      행렬 곱 한 번으로 후보를 고른 뒤, 후보만 원본 곡선으로 정확한 거리를 다시 계산한다.
+    - 여러 스레드(GUI, 모니터링 데몬)에서 같은 객체를 써도 되도록 연결은 락으로 보호한다.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+
+        # 근사 검색 색인 (처음 nearest()를 부를 때 만든다)
+        self._index_ids: Optional[np.ndarray] = None
+        self._index_features: Optional[np.ndarray] = None
+        self._index_squares: Optional[np.ndarray] = None
+        self._pending_ids: List[int] = []
+        self._pending_features: List[np.ndarray] = []
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------------------
+    def add(
+        self,
+        spectrum: LogSpectrum,
+        bands: Sequence[Dict[str, Any]] = (),
+        room: Optional[str] = None,
+        device: Optional[str] = None,
+        measured_at: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """측정 하나를 저장하고 id를 반환한다."""
+        return self.add_many([(spectrum, bands, room, device, measured_at, meta)])[0]
+
+    def add_many(self, records: Iterable[tuple]) -> List[int]:
+        """
+        (spectrum, bands, room, device, measured_at, meta) 튜플 여러 개를 한 트랜잭션으로 저장한다.
+        """
+        ids = []
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for spectrum, bands, room, device, measured_at, meta in records:
+                features = coarse_features(spectrum)
+                cursor.execute(
+                    "INSERT INTO measurements (room, device, measured_at, meta, spectrum, features)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        room,
+                        device,
+                        time.time() if measured_at is None else float(measured_at),
+                        json.dumps(meta or {}, ensure_ascii=False, default=str),
+                        zlib.compress(spectrum.to_bytes()),
+                        features.tobytes(),
+                    ),
+                )
+                measurement_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO bands (measurement_id, f_start, f_end, peak_freq, peak_gain_db)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            measurement_id,
+                            float(b["f_start"]),
+                            float(b["f_end"]),
+                            float(b["peak_freq"]),
+                            float(b["peak_gain_db"]),
+                        )
+                        for b in bands
+                    ],
+                )
+                ids.append(measurement_id)
+                self._pending_ids.append(measurement_id)
+                self._pending_features.append(features)
+        return ids
+
+    def delete(self, measurement_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM measurements WHERE id = ?", (measurement_id,))
+            # 색인은 다음 nearest() 때 다시 만든다. 잠금 안에서 비워야
+            # 동시에 도는 nearest()가 삭제 전 행으로 색인을 다시 채우지 않는다.
+            self._index_ids = None
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _bands_for(self, ids: Sequence[int]) -> Dict[int, List[Dict[str, float]]]:
+        result: Dict[int, List[Dict[str, float]]] = {i: [] for i in ids}
+        ids = list(ids)
+        # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 읽는다.
+        for i in range(0, len(ids), _MAX_VARIABLES):
+            chunk = ids[i : i + _MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                "SELECT measurement_id, f_start, f_end, peak_freq, peak_gain_db FROM bands"
+                f" WHERE measurement_id IN ({placeholders}) ORDER BY measurement_id, f_start",
+                chunk,
+            ).fetchall()
+            for mid, f_start, f_end, peak_freq, peak_gain in rows:
+                result[mid].append(
+                    {"f_start": f_start, "f_end": f_end, "peak_freq": peak_freq, "peak_gain_db": peak_gain}
+                )
+        return result
+
+    def _records(self, rows, with_spectrum: bool) -> List[HistoryRecord]:
+        bands = self._bands_for([row[0] for row in rows])
+        records = []
+        for mid, room, device, measured_at, meta, blob in rows:
+            record = {
+                "id": mid,
+                "room": room,
+                "device": device,
+                "measured_at": measured_at,
+                "meta": json.loads(meta) if meta else {},
+                "bands": bands[mid],
+            }
+            if with_spectrum:
+                record["spectrum"] = LogSpectrum.from_bytes(zlib.decompress(blob))
+            records.append(record)
+        return records
+
+    def get(self, measurement_id: int) -> Optional[HistoryRecord]:
+        """id로 측정 하나를 (곡선 포함) 읽는다. 없으면 None."""
+        records = self.get_many([measurement_id])
+        return records[0] if records else None
+
+    def get_many(self, ids: Sequence[int]) -> List[HistoryRecord]:
+        """여러 측정을 곡선과 함께 읽는다 (ids 순서 유지)."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        rows = []
+        with self._lock:
+            for i in range(0, len(ids), _MAX_VARIABLES):
+                chunk = ids[i : i + _MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows += self._conn.execute(
+                    "SELECT id, room, device, measured_at, meta, spectrum FROM measurements"
+                    f" WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            records = {r["id"]: r for r in self._records(rows, with_spectrum=True)}
+        return [records[i] for i in ids if i in records]
+
+    def find(
+        self,
+        room: Optional[str] = None,
+        device: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        peak_min_hz: Optional[float] = None,
+        peak_max_hz: Optional[float] = None,
+        min_gain_db: Optional[float] = None,
+        limit: Optional[int] = None,
+        with_spectrum: bool = False,
+    ) -> List[HistoryRecord]:
+        """
+        조건에 맞는 측정을 최신순으로 찾는다.
+
+        peak_min_hz / peak_max_hz / min_gain_db를 주면 그 조건을 만족하는
+        부밍 대역이 하나라도 있는 측정만 고른다.
+        예) find(peak_min_hz=43, peak_max_hz=47, min_gain_db=6) → 45 Hz 근처 +6 dB 이상
+
+        Returns:
+            [{"id", "room", "device", "measured_at", "meta", "bands"[, "spectrum"]}, ...]
+        """
+        where, params = [], []
+        if room is not None:
+            where.append("m.room = ?")
+            params.append(room)
+        if device is not None:
+            where.append("m.device = ?")
+            params.append(device)
+        if since is not None:
+            where.append("m.measured_at >= ?")
+            params.append(float(since))
+        if until is not None:
+            where.append("m.measured_at < ?")
+            params.append(float(until))
+
+        band_where, band_params = [], []
+        if peak_min_hz is not None:
+            band_where.append("b.peak_freq >= ?")
+            band_params.append(float(peak_min_hz))
+        if peak_max_hz is not None:
+            band_where.append("b.peak_freq <= ?")
+            band_params.append(float(peak_max_hz))
+        if min_gain_db is not None:
+            band_where.append("b.peak_gain_db >= ?")
+            band_params.append(float(min_gain_db))
+        if band_where:
+            where.append(
+                "m.id IN (SELECT b.measurement_id FROM bands b WHERE "
+                + " AND ".join(band_where)
+                + ")"
+            )
+            params.extend(band_params)
+
+        sql = "SELECT m.id, m.room, m.device, m.measured_at, m.meta, {} FROM measurements m".format(
+            "m.spectrum" if with_spectrum else "NULL"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.measured_at DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            return self._records(rows, with_spectrum)
+
+    def history(self, room: str, with_spectrum: bool = True) -> List[HistoryRecord]:
+        """방 하나의 모든 측정을 오래된 순으로 돌려준다 (설치 이후 변화 추적용)."""
+        return self.find(room=room, with_spectrum=with_spectrum)[::-1]
+
+    def _ids_where(self, room: Optional[str], device: Optional[str]) -> List[int]:
+        where, params = [], []
+        if room is not None:
+            where.append("room = ?")
+            params.append(room)
+        if device is not None:
+            where.append("device = ?")
+            params.append(device)
+        sql = "SELECT id FROM measurements"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            return [r[0] for r in self._conn.execute(sql, params).fetchall()]
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM measurements").fetchone()[0])
+
+    # ------------------------------------------------------------------
+    # 유사 곡선 검색
+    # ------------------------------------------------------------------
+    def _load_index(self):
+        """색인을 최신으로 맞추고 (ids, features, squares) 스냅샷을 잠금 안에서 돌려준다."""
+        with self._lock:
+            if self._index_ids is None:
+                rows = self._conn.execute("SELECT id, features FROM measurements ORDER BY id").fetchall()
+                self._pending_ids, self._pending_features = [], []
+                self._index_ids = np.array([r[0] for r in rows], dtype=np.int64)
+                self._index_features = (
+                    np.vstack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+                    if rows
+                    else None
+                )
+            elif self._pending_ids:
+                new = np.vstack(self._pending_features)
+                self._index_ids = np.concatenate([self._index_ids, self._pending_ids])
+                self._index_features = (
+                    new if self._index_features is None else np.vstack([self._index_features, new])
+                )
+                self._pending_ids, self._pending_features = [], []
+            else:
+                return self._index_ids, self._index_features, self._index_squares
+
+            if self._index_features is not None:
+                self._index_squares = self._index_features * self._index_features
+            return self._index_ids, self._index_features, self._index_squares
+
+    def nearest(
+        self,
+        spectrum: LogSpectrum,
+        k: int = 10,
+        room: Optional[str] = None,
+        device: Optional[str] = None,
+        candidates: int = 8,
+    ) -> List[HistoryRecord]:
+        """
+        spectrum과 가장 비슷한 저장 곡선 k개를 찾는다 (레벨을 맞춘 RMS dB 거리 기준).
+
+        1. 메모리 색인(1/12 옥타브 특징 행렬)에서 ||F||² - 2 F·q 로 전체 거리를 한 번에 계산해
+           k * candidates개 후보를 고른다. 곡선의 유효 범위가 달라도 질의 곡선이
+           유효한 구간만 비교한다.
+        2. 후보의 원본 곡선을 읽어 LogSpectrum.distance로 정확한 거리를 구하고 다시 정렬한다.
+
+        Returns:
+            거리 오름차순 레코드 목록. 각 레코드에 "distance_db"가 추가된다.
+        """
+        ids, features, squares = self._load_index()
+        if features is None or ids.size == 0:
+            return []
+
+        query = coarse_features(spectrum)
+        if features.shape[1] != query.size:
+            raise ValueError("저장된 곡선과 그리드가 다릅니다.")
+
+        if room is not None or device is not None:
+            allowed = self._ids_where(room, device)
+            mask = np.isin(ids, allowed)
+            ids, features, squares = ids[mask], features[mask], squares[mask]
+            if ids.size == 0:
+                return []
+
+        # 질의 곡선이 유효한 구간만 비교한다. 열을 잘라 복사하지 않고 0/1 마스크 행렬-벡터 곱으로
+        # 구간 안의 합 Σf, Σf², Σf·q를 구한 뒤, 곡선마다 평균 레벨 차이를 빼고 거리를 계산한다.
+        mask = (query != 0.0).astype(np.float32)
+        if not np.any(mask):
+            mask[:] = 1.0
+        n = float(mask.sum())
+        q = query * mask
+        q_mean = float(q.sum()) / n
+
+        offset = features @ mask / n - q_mean
+        dist2 = squares @ mask - 2.0 * (features @ q) + float(q @ q)
+        dist2 -= n * offset * offset
+
+        n_candidates = min(max(int(k) * max(int(candidates), 1), int(k)), ids.size)
+        top = np.argpartition(dist2, n_candidates - 1)[:n_candidates]
+
+        records = self.get_many(ids[top].tolist())
+        for record in records:
+            record["distance_db"] = spectrum.distance(record["spectrum"])
+        records.sort(key=lambda r: (not np.isfinite(r["distance_db"]), r["distance_db"]))
+        return records[: int(k)]
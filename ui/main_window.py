@@ -50,14 +50,16 @@ class MainWindow(QWidget):
         """
         print(f"[UI] start_requested: mic idx={mic_idx}, speaker idx={spk_idx}")
 
+        self.record_page.set_measurement_info(self.prep_page.measurement_info())
         self.stack.setCurrentWidget(self.record_page)
 
-    def _on_record_next(self, sweep, recording, fs, meta):
+    def _on_record_next(self, sweep, recording, fs, meta, analysis):
         self.result_page.set_measurement_data(
             sweep=sweep,
             recording=recording,
             fs=fs,
             meta=meta,
+            analysis=analysis,
         )
         self.stack.setCurrentWidget(self.result_page)
 
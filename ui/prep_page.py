@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (
     QFormLayout,
     QLabel,
     QComboBox,
+    QLineEdit,
     QCheckBox,
     QPushButton,
 )
@@ -43,6 +44,11 @@ class PrepPage(QWidget):
         device_layout.addRow("마이크 입력 장치", self.mic_combo)
         device_layout.addRow("스피커 출력 장치", self.speaker_combo)
 
+        # 측정 이력을 방별로 모아 보기 위한 이름 (비워 두면 방 구분 없이 저장)
+        self.room_edit = QLineEdit()
+        self.room_edit.setPlaceholderText("예: 거실")
+        device_layout.addRow("측정 위치", self.room_edit)
+
         device_group.setLayout(device_layout)
         root_layout.addWidget(device_group)
         root_layout.addSpacing(16)
@@ -140,4 +146,12 @@ class PrepPage(QWidget):
         spk_idx = self.spk_devices[self.speaker_combo.currentIndex()]["index"]
         set_default_devices(input_index=mic_idx, output_index=spk_idx)
 
-        self.next_requested.emit(mic_idx, spk_idx)
\ No newline at end of file
+        self.next_requested.emit(mic_idx, spk_idx)
+
+    def measurement_info(self) -> dict:
+        """측정 결과 meta에 함께 남길 측정 위치/장치 이름."""
+        return {
+            "room": self.room_edit.text().strip() or None,
+            "device": self.speaker_combo.currentText() or None,
+            "mic": self.mic_combo.currentText() or None,
+        }
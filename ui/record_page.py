@@ -11,7 +11,7 @@ from PySide6.QtCore import Qt, Signal, QThread
 from audio.sweep_measure_worker import SweepMeasureWorker
 
 class RecordPage(QWidget):
-    next_requested = Signal(object, object, int, dict)
+    next_requested = Signal(object, object, int, dict, object)
     back_requested = Signal()
 
     def __init__(self, parent=None):
@@ -27,6 +27,8 @@ class RecordPage(QWidget):
         self._last_recording = None
         self._last_fs = None
         self._last_meta = None
+        self._last_analysis = None
+        self._measurement_info = {}
 
         self._build_ui()
 
@@ -81,7 +83,8 @@ class RecordPage(QWidget):
 
         self._worker_thread = QThread()
         self._worker = SweepMeasureWorker(
-            duration=self.measure_duration
+            duration=self.measure_duration,
+            auto_configure=True,
         )
         self._worker.moveToThread(self._worker_thread)
 
@@ -91,6 +94,8 @@ class RecordPage(QWidget):
         # 결과 처리
         self._worker.finished.connect(self._on_measurement_finished)
         self._worker.error.connect(self._on_measurement_error)
+        self._worker.progress.connect(self._on_measurement_progress)
+        self._worker.configured.connect(self._on_measurement_configured)
 
         # 정리
         self._worker.finished.connect(self._worker_thread.quit)
@@ -99,11 +104,13 @@ class RecordPage(QWidget):
 
         self._worker_thread.start()
 
-    def _on_measurement_finished(self, sweep, recording, fs, meta):
+    def _on_measurement_finished(self, sweep, recording, fs, meta, analysis):
         self._last_sweep = sweep
         self._last_recording = recording
         self._last_fs = fs
-        self._last_meta = meta
+        # 측정 위치/장치 이름을 meta에 붙여 결과 페이지의 이력 저장까지 전달한다.
+        self._last_meta = {**meta, **self._measurement_info}
+        self._last_analysis = analysis
 
         self.set_status_text("녹음이 완료되었습니다.")
         self.set_busy(False)
@@ -111,6 +118,18 @@ class RecordPage(QWidget):
         if self.next_button is not None:
             self.next_button.setEnabled(True)
 
+    def _on_measurement_configured(self, prescan: dict):
+        settings = prescan["settings"]
+        self.set_status_text(
+            "테스트 스윕을 재생하면서 녹음 중입니다... "
+            f"({settings['f_start']:.0f}–{settings['f_end']:.0f} Hz, "
+            f"{settings['duration']:.1f}초, {settings['level_db']:.1f} dBFS)"
+        )
+
+    def _on_measurement_progress(self, fraction: float):
+        self.progress.setRange(0, 100)
+        self.progress.setValue(int(fraction * 100))
+
     def _on_next_clicked(self):
         if self._last_recording is None or self._last_fs is None:
             return
@@ -122,12 +141,17 @@ class RecordPage(QWidget):
             self._last_recording,
             self._last_fs,
             self._last_meta,
+            self._last_analysis,
         )
 
     def _on_measurement_error(self, msg):
         self.set_status_text(f"측정 중 오류 발생: {msg}")
         self.set_busy(False)
 
+    def set_measurement_info(self, info: dict):
+        """다음 측정의 meta에 덧붙일 정보(room/device 등)를 지정한다."""
+        self._measurement_info = dict(info)
+
     def set_status_text(self, text: str):
         self.status_label.setText(text)
 
@@ -6,18 +6,39 @@ from PySide6.QtWidgets import (
     QPushButton,
     QPlainTextEdit,
     QGroupBox,
+    QFileDialog,
+    QSlider,
+    QComboBox,
 )
 from PySide6.QtCore import Qt, Signal
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
-from dsp.analyzer import process_frequency_response, detect_booming_bands
+from dsp.eq import format_filters, parse_eq_text, suggest_peaking_filters
+from storage.history import MeasurementHistory, default_history_path
+
+DEFAULT_THRESHOLD_DB = 5.0
+MIN_BANDWIDTH_HZ = 5.0
+
+# 그래프 오른쪽 축에 겹쳐 그릴 곡선
+OVERLAY_NONE, OVERLAY_THD, OVERLAY_GROUP_DELAY = range(3)
 
 class ResultPage(QWidget):
     back_requested = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
+
+        self.spectrum = None
+        self.distortion = None
+        self.phase = None  # phase_analysis 결과 (군지연 오버레이용)
+        self.preview_player = None
+        self.history = None
+        self.peaks = None  # 임계값 슬라이더용 PeakHierarchy
+        self._freqs = None
+        self._mag_db = None
+        self._bands = []
+
         self._build_ui()
 
     def _build_ui(self):
@@ -36,9 +57,21 @@ class ResultPage(QWidget):
         # 1. Matplotlib 그래프 캔버스
         self.figure = Figure(figsize=(7, 4.5))
         self.ax = self.figure.add_subplot(111)
+        self.ax_thd = self.ax.twinx()  # THD / 군지연 오버레이용 보조 축
         self.canvas = FigureCanvas(self.figure)
 
         graph_layout.addWidget(self.canvas)
+
+        # 오버레이 선택: 이미 계산해 둔 결과만 다시 그리므로 FFT를 다시 하지 않는다.
+        overlay_layout = QHBoxLayout()
+        overlay_layout.addWidget(QLabel("겹쳐 보기"))
+        self.overlay_combo = QComboBox()
+        self.overlay_combo.addItems(["없음", "고조파 왜곡 (THD)", "군지연"])
+        self.overlay_combo.setCurrentIndex(OVERLAY_THD)
+        self.overlay_combo.currentIndexChanged.connect(self._on_overlay_changed)
+        overlay_layout.addWidget(self.overlay_combo)
+        overlay_layout.addStretch(1)
+        graph_layout.addLayout(overlay_layout)
         graph_group.setLayout(graph_layout)
         layout.addWidget(graph_group)
 
@@ -51,6 +84,19 @@ class ResultPage(QWidget):
         self.booming_text.setPlaceholderText("예) 60–80Hz: +7dB (부밍 의심)\n")
         booming_layout.addWidget(self.booming_text)
 
+        # 감지 기준(dB) 슬라이더: 0.5 dB 단위, 피크 계층에서 바로 다시 구하므로 끌어도 가볍다.
+        threshold_layout = QHBoxLayout()
+        self.threshold_label = QLabel()
+        threshold_layout.addWidget(self.threshold_label)
+
+        self.threshold_slider = QSlider(Qt.Horizontal)
+        self.threshold_slider.setRange(2, 20)
+        self.threshold_slider.setValue(int(DEFAULT_THRESHOLD_DB * 2))
+        self.threshold_slider.valueChanged.connect(self._on_threshold_changed)
+        threshold_layout.addWidget(self.threshold_slider, 1)
+        booming_layout.addLayout(threshold_layout)
+        self._update_threshold_label()
+
         booming_group.setLayout(booming_layout)
         layout.addWidget(booming_group)
 
@@ -59,14 +105,36 @@ class ResultPage(QWidget):
         eq_layout = QVBoxLayout()
 
         self.eq_text = QPlainTextEdit()
-        self.eq_text.setReadOnly(True)
         self.eq_text.setPlaceholderText(
             "예)\n"
             "Filter 1: Peaking, 70Hz, -4.0dB, Q=4.0\n"
             "Filter 2: Peaking, 45Hz, -3.0dB, Q=2.5\n"
         )
+        # 미리 듣는 중에 값을 고치면 바로 반영된다.
+        self.eq_text.textChanged.connect(self._on_eq_text_changed)
         eq_layout.addWidget(self.eq_text)
 
+        preview_layout = QHBoxLayout()
+
+        # 미리 듣기 중 EQ 입력 오류(형식 오류, 필터 수 초과 등)를 보여 준다.
+        self.preview_status = QLabel()
+        self.preview_status.setStyleSheet("color: #c0392b;")
+        preview_layout.addWidget(self.preview_status)
+        preview_layout.addStretch(1)
+
+        self.preview_button = QPushButton("EQ 미리 듣기")
+        self.preview_button.setCheckable(True)
+        self.preview_button.toggled.connect(self._on_preview_toggled)
+        preview_layout.addWidget(self.preview_button)
+
+        self.bypass_button = QPushButton("원음으로 비교")
+        self.bypass_button.setCheckable(True)
+        self.bypass_button.setEnabled(False)
+        self.bypass_button.toggled.connect(self._on_bypass_toggled)
+        preview_layout.addWidget(self.bypass_button)
+
+        eq_layout.addLayout(preview_layout)
+
         eq_group.setLayout(eq_layout)
         layout.addWidget(eq_group)
 
@@ -80,6 +148,11 @@ class ResultPage(QWidget):
         self.summary_label.setWordWrap(True)
         summary_layout.addWidget(self.summary_label)
 
+        self.history_status = QLabel()
+        self.history_status.setStyleSheet("color: #c0392b;")
+        self.history_status.setWordWrap(True)
+        summary_layout.addWidget(self.history_status)
+
         summary_group.setLayout(summary_layout)
         layout.addWidget(summary_group)
 
@@ -90,38 +163,116 @@ class ResultPage(QWidget):
         bottom_layout.addStretch(1)
 
         self.back_button = QPushButton("처음으로 돌아가기")
-        self.back_button.clicked.connect(self.back_requested.emit)
+        self.back_button.clicked.connect(self._on_back_clicked)
 
         bottom_layout.addWidget(self.back_button)
         layout.addLayout(bottom_layout)
 
         self.setLayout(layout)
 
-    def set_measurement_data(self, sweep, recording, fs, meta):
-        freqs, mag_db_norm = process_frequency_response(
-            recording,
-            fs,
-            f_min=meta.get("f_start", 20.0),
-            f_max=meta.get("f_end", 1000.0),
-            window_size=24,
-            baseline_method="median",
-        )
-        if freqs is None:
+    def _on_back_clicked(self):
+        self.preview_button.setChecked(False)
+        self.back_requested.emit()
+
+    def _on_preview_toggled(self, checked: bool):
+        from audio.eq_preview import EqPreviewPlayer
+
+        if not checked:
+            self.preview_status.clear()
+            if self.preview_player is not None:
+                self.preview_player.stop()
+                self.preview_player = None
+            self.bypass_button.setChecked(False)
+            self.bypass_button.setEnabled(False)
+            return
+
+        # 음악 파일을 고르지 않으면 테스트 스윕으로 미리 듣는다.
+        path, _ = QFileDialog.getOpenFileName(self, "미리 들을 음악 파일", "", "WAV 파일 (*.wav)")
+
+        try:
+            self.preview_player = EqPreviewPlayer(
+                parse_eq_text(self.eq_text.toPlainText()),
+                source=path or None,
+            )
+            self.preview_player.start()
+        except Exception as e:
+            self.preview_player = None
+            self.summary_label.setText(f"EQ 미리 듣기를 시작할 수 없습니다: {e}")
+            self.preview_button.setChecked(False)
+            return
+
+        self.bypass_button.setEnabled(True)
+
+    def _on_bypass_toggled(self, checked: bool):
+        if self.preview_player is not None:
+            self.preview_player.set_bypass(checked)
+
+    @property
+    def threshold_db(self) -> float:
+        return self.threshold_slider.value() / 2.0
+
+    def _update_threshold_label(self):
+        self.threshold_label.setText(f"감지 기준: +{self.threshold_db:.1f} dB")
+
+    def _on_threshold_changed(self, _value: int):
+        self._update_threshold_label()
+        if self.peaks is not None:
+            self._show_bands(self.peaks.bands(self.threshold_db, MIN_BANDWIDTH_HZ))
+
+    def _on_overlay_changed(self, _index: int):
+        if self._freqs is not None:
+            self._plot(self._bands)
+
+    def _on_eq_text_changed(self):
+        if self.preview_player is None:
+            return
+        # 입력 중인 텍스트는 자주 틀린다. 예외를 슬롯 밖으로 내보내지 않고
+        # 이전 필터를 유지한 채 이유만 표시한다.
+        try:
+            self.preview_player.set_filters(parse_eq_text(self.eq_text.toPlainText()))
+        except ValueError as e:
+            self.preview_status.setText(f"이전 EQ로 재생 중: {e}")
+        else:
+            self.preview_status.clear()
+
+    def set_measurement_data(self, sweep, recording, fs, meta, analysis):
+        """
+        측정 결과를 표시한다. analysis는 워커 스레드에서 미리 계산한
+        analyze_sweep_measurement 결과(너무 짧으면 None)라 여기서는 무거운 계산을 하지 않는다.
+        """
+        if analysis is None:
+            self.peaks = None
             self.summary_label.setText("측정 신호가 너무 짧아서 분석할 수 없습니다.")
             self.booming_text.clear()
             self.eq_text.clear()
             return
 
-        # 1) 부밍 대역 탐지
-        booming_bands = detect_booming_bands(
-            freqs,
-            mag_db_norm,
+        # 1) 표준 로그 그리드 응답 + 부밍 대역 탐지 결과 (현재 임계값으로 다시 고른다)
+        self.spectrum = analysis["spectrum"]
+        self.peaks = analysis["peaks"]
+        self._freqs = analysis["freqs"]
+        self._mag_db = analysis["mag_db"]
+        booming_bands = (
+            self.peaks.bands(self.threshold_db, MIN_BANDWIDTH_HZ) if self.peaks is not None else []
         )
 
-        # 2) 그래프 갱신 (부밍 대역 하이라이트 포함)
-        self.plot_frequency_response(freqs, mag_db_norm, booming_bands=booming_bands)
+        # 2) 고조파 왜곡 분석 결과
+        self.distortion = analysis["distortion"]
+
+        # 3) 위상/군지연 분석 결과
+        self.phase = analysis["phase"]
+
+        # 4) 측정 이력 저장 (실패해도 결과 표시는 계속한다)
+        self._save_to_history(meta, booming_bands)
+
+        self._show_bands(booming_bands)
+
+    def _show_bands(self, booming_bands):
+        """부밍 대역으로 그래프/텍스트/EQ 추천/요약을 갱신한다. (임계값 슬라이더에서도 호출)"""
+        # 1) 그래프 갱신 (부밍 대역 하이라이트 + THD/군지연 오버레이)
+        self._plot(booming_bands)
 
-        # 3) 부밍 텍스트 영역 업데이트
+        # 2) 부밍 텍스트 영역 업데이트
         if booming_bands:
             lines = []
             for band in booming_bands:
@@ -133,28 +284,15 @@ class ResultPage(QWidget):
         else:
             self.booming_text.setPlainText("유의미한 부밍 대역이 감지되지 않았습니다.")
 
-        # 4) 간단한 EQ 추천 생성
-        eq_lines = []
-        for i, band in enumerate(booming_bands, start=1):
-            peak_freq = band["peak_freq"]
-            peak_gain = band["peak_gain_db"]
+        # 3) 간단한 EQ 추천 생성
+        eq_filters = suggest_peaking_filters(booming_bands)
 
-            bandwidth = max(band["f_end"] - band["f_start"], 1.0)
-            Q = peak_freq / (bandwidth * 2.0)
-            Q = max(0.3, min(Q, 10.0))
-
-            gain_cut = -min(peak_gain, 8.0)  # 너무 과하지 않게 최대 -8dB까지
-
-            eq_lines.append(
-                f"Filter {i}: Peaking, {peak_freq:.1f} Hz, {gain_cut:.1f} dB, Q={Q:.1f}"
-            )
-
-        if eq_lines:
-            self.eq_text.setPlainText("\n".join(eq_lines))
+        if eq_filters:
+            self.eq_text.setPlainText(format_filters(eq_filters))
         else:
             self.eq_text.setPlainText("EQ 조정이 꼭 필요해 보이지는 않습니다.")
 
-        # 5) 요약 레이블 업데이트
+        # 4) 요약 레이블 업데이트
         if booming_bands:
             worst = max(booming_bands, key=lambda b: b["peak_gain_db"])
             self.summary_label.setText(
@@ -168,16 +306,48 @@ class ResultPage(QWidget):
                 "현재 스피커/방 세팅은 비교적 균형 잡힌 상태입니다."
             )
     
-    def plot_frequency_response(self, freqs, response_db, booming_bands=None):
+    def _plot(self, booming_bands):
+        self._bands = booming_bands
+        overlay = self.overlay_combo.currentIndex()
+        self.plot_frequency_response(
+            self._freqs,
+            self._mag_db,
+            booming_bands=booming_bands,
+            distortion=self.distortion if overlay == OVERLAY_THD else None,
+            phase=self.phase if overlay == OVERLAY_GROUP_DELAY else None,
+        )
+
+    def _save_to_history(self, meta, booming_bands):
+        self.history_status.clear()
+        try:
+            if self.history is None:
+                self.history = MeasurementHistory(default_history_path())
+            self.history.add(
+                self.spectrum,
+                booming_bands,
+                room=meta.get("room"),
+                device=meta.get("device"),
+                meta=meta,
+            )
+        except Exception as e:
+            self.history_status.setText(f"측정 이력을 저장하지 못했습니다: {e}")
+
+    def plot_frequency_response(
+        self, freqs, response_db, booming_bands=None, distortion=None, phase=None
+    ):
         """
         freqs: 주파수 배열(Hz)
         response_db: 각 주파수에 대한 dB 값 배열
         booming_bands: 선택 사항. [{'f_start': .., 'f_end': ..}, ...] 형태의 리스트.
+        distortion: 선택 사항. harmonic_distortion() 결과 dict. 오른쪽 축에 THD(%)를 겹쳐 그린다.
+        phase: 선택 사항. phase_analysis() 결과 dict. 오른쪽 축에 군지연(ms)을 겹쳐 그린다.
+            (distortion과 함께 주면 군지연을 그린다)
         """
         if freqs is None or response_db is None:
             return
 
         self.ax.clear()
+        self.ax_thd.clear()
 
         # 기본 응답 곡선
         self.ax.plot(freqs, response_db, linewidth=1.2)
@@ -196,5 +366,36 @@ class ResultPage(QWidget):
         self.ax.grid(True, which="both", linestyle="--", alpha=0.3)
         self.ax.plot([0, 1000], [0, 0], color="black", linewidth=0.8, linestyle=":")
 
+        self.ax_thd.set_visible(distortion is not None or phase is not None)
+        if phase is not None:
+            # 초과 군지연이 평평하면 공진의 군지연 돌출은 최소 위상이라 EQ로 함께 줄어든다.
+            self.ax_thd.plot(
+                phase["freqs"],
+                phase["group_delay_ms"],
+                color="tab:green",
+                linewidth=1.0,
+                label="Group delay",
+            )
+            self.ax_thd.plot(
+                phase["freqs"],
+                phase["excess_group_delay_ms"],
+                color="tab:green",
+                linewidth=0.8,
+                linestyle=":",
+                label="Excess group delay",
+            )
+            self.ax_thd.set_ylabel("Group delay (ms)")
+            self.ax_thd.legend(loc="upper right", fontsize="small")
+        elif distortion is not None:
+            self.ax_thd.plot(
+                distortion["freqs"],
+                distortion["thd_percent"],
+                color="tab:orange",
+                linewidth=1.0,
+                linestyle="--",
+            )
+            self.ax_thd.set_ylabel("THD (%)")
+            self.ax_thd.set_ylim(bottom=0)
+
         self.figure.tight_layout()
         self.canvas.draw()
\ No newline at end of file